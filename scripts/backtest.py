@@ -0,0 +1,254 @@
+"""
+Bankroll backtests of the evaluated picks under different staking rules.
+
+Every model's graded picks (data/evaluated/<sport>_bet_picks_evaluated.csv,
+with confidence_pct from <sport>_bet_picks.csv) are laid out as one row per
+model in a padded 2-D array of per-unit returns: the payout multiplier for a
+win, -1 for a loss and 0 for a push. Each staking rule turns that into a
+stake array of the same shape. Bankroll paths for every model x rule
+combination then come out of a single cumsum (fixed-unit rules) or cumprod
+(bankroll-fraction rules) along the bet axis, with no loop over bets.
+
+Staking rules (STRATEGIES):
+
+    flat           1 unit per pick
+    units          the units the model assigned
+    confidence     0 units at 50% confidence up to max_units at 100%
+    kelly_<f>      fraction f of the Kelly stake, using confidence_pct as
+                   the win probability and the pick's odds
+    *_capped       the same rule with total stake per day capped
+
+Risk of ruin is estimated by resampling each model's (stake, return) pairs
+with replacement n_sims times and counting the paths that ever fall below
+ruin_level of the starting bankroll.
+
+Usage:
+    python scripts/backtest.py [sport]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from picks_ledger import LEDGER_KEY, key_frame
+from utils import payout_multiplier
+
+
+EVALUATED_DIR = Path('./data/evaluated')
+
+# 'stake' picks the rule; fixed rules stake units, 'kelly' stakes a fraction of the bankroll
+STRATEGIES = {
+    'flat': {'stake': 'flat'},
+    'units': {'stake': 'units'},
+    'confidence': {'stake': 'confidence', 'max_units': 3},
+    'kelly_0.1': {'stake': 'kelly', 'fraction': 0.1},
+    'kelly_0.25': {'stake': 'kelly', 'fraction': 0.25},
+    'kelly_0.5': {'stake': 'kelly', 'fraction': 0.5},
+    'units_capped': {'stake': 'units', 'daily_cap': 6},
+    'kelly_0.25_capped': {'stake': 'kelly', 'fraction': 0.25, 'daily_cap': 0.2},
+}
+
+
+def load_backtest_picks(sport: str, evaluated_dir: Path = EVALUATED_DIR) -> pd.DataFrame:
+    """
+    The graded picks for a sport with their confidence, in the order they were bet.
+
+    Returns:
+        pd.DataFrame: model, date, rank, odds, units, confidence_pct, bet_result, bet_payout.
+    """
+    evaluated_dir = Path(evaluated_dir)
+    df = pd.read_csv(evaluated_dir / f'{sport}_bet_picks_evaluated.csv')
+    df_picks = pd.read_csv(evaluated_dir / f'{sport}_bet_picks.csv', usecols=LEDGER_KEY + ['confidence_pct'])
+
+    df[LEDGER_KEY] = key_frame(df)
+    df_picks[LEDGER_KEY] = key_frame(df_picks)
+    df = df.drop_duplicates(subset=LEDGER_KEY, keep='last')
+    df = df.merge(df_picks.drop_duplicates(subset=LEDGER_KEY), on=LEDGER_KEY, how='left')
+
+    df['date'] = pd.to_datetime(df['date'])
+    return df.sort_values(['model', 'date', 'rank'], kind='stable').reset_index(drop=True)
+
+
+def _pad(df: pd.DataFrame, column: str, models: list, n_max: int, fill=0.0) -> np.ndarray:
+    """One row per model, bets in order along the columns, padded with fill."""
+    out = np.full((len(models), n_max), fill, dtype=np.float64)
+    for i, (_, values) in enumerate(df.groupby('model', sort=True)[column]):
+        out[i, :len(values)] = values.to_numpy(dtype=np.float64)
+    return out
+
+
+def _day_totals(stakes: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """
+    Total stake of each bet's day, broadcast back to every bet of that day.
+
+    Bets are in date order, so each day is a contiguous run of columns.
+    """
+    cs = np.concatenate([np.zeros(stakes.shape[:-1] + (1,)), np.cumsum(stakes, axis=-1)], axis=-1)
+    n = day.shape[-1]
+    idx = np.arange(n)
+    new_day = np.concatenate([np.ones(day.shape[:-1] + (1,), bool), day[..., 1:] != day[..., :-1]], axis=-1)
+    end_day = np.concatenate([day[..., 1:] != day[..., :-1], np.ones(day.shape[:-1] + (1,), bool)], axis=-1)
+    start = np.maximum.accumulate(np.where(new_day, idx, 0), axis=-1)
+    end = np.minimum.accumulate(np.where(end_day, idx, n - 1)[..., ::-1], axis=-1)[..., ::-1]
+    start = np.broadcast_to(start, stakes.shape)
+    end = np.broadcast_to(end, stakes.shape)
+    return np.take_along_axis(cs, end + 1, axis=-1) - np.take_along_axis(cs, start, axis=-1)
+
+
+def stake_arrays(units, confidence, odds, day, valid, strategies: dict = STRATEGIES):
+    """
+    Per-bet stakes for every strategy.
+
+    Args:
+        units, confidence, odds, day, valid (np.ndarray): (models, bets) arrays;
+            valid marks real bets as opposed to padding.
+        strategies (dict): Strategy name -> rule (see STRATEGIES).
+
+    Returns:
+        tuple: (stakes of shape (strategies, models, bets), proportional flags of shape (strategies,)).
+               Fixed rules hold units; proportional (Kelly) rules hold bankroll fractions.
+    """
+    multiplier = np.nan_to_num(payout_multiplier(odds), nan=0.0)
+    p = np.clip(np.nan_to_num(confidence, nan=50.0) / 100.0, 0, 1)
+
+    stakes, proportional = [], []
+    for rule in strategies.values():
+        kind = rule['stake']
+        if kind == 'flat':
+            s = np.ones_like(units)
+        elif kind == 'units':
+            s = units.copy()
+        elif kind == 'confidence':
+            s = rule.get('max_units', 3) * np.clip((p - 0.5) / 0.5, 0, 1)
+        elif kind == 'kelly':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                kelly = np.where(multiplier > 0, (multiplier * p - (1 - p)) / multiplier, 0.0)
+            s = rule.get('fraction', 1.0) * np.clip(kelly, 0, 1)
+        else:
+            raise ValueError(f"Unknown staking rule '{kind}'")
+
+        s = np.where(valid, s, 0.0)
+        if rule.get('daily_cap'):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s = s * np.minimum(1.0, rule['daily_cap'] / _day_totals(s, day))
+            s = np.nan_to_num(s)
+        stakes.append(s)
+        proportional.append(kind == 'kelly')
+
+    return np.stack(stakes), np.array(proportional)
+
+
+def simulate_paths(returns: np.ndarray, stakes: np.ndarray, proportional: np.ndarray,
+                   bankroll: float = 100.0, ruin_level: float = 0.1):
+    """
+    Bankroll paths for many stake arrays at once.
+
+    Fixed rows add stake * return, proportional rows multiply by
+    1 + stake * return. A path that falls to ruin_level * bankroll stops betting.
+
+    Args:
+        returns (np.ndarray): Per-unit returns, shape (..., bets).
+        stakes (np.ndarray): Stakes broadcastable against returns, shape (strategies, ..., bets).
+        proportional (np.ndarray): Per-strategy flags, shape (strategies,).
+
+    Returns:
+        tuple: (bankroll paths with the starting bankroll prepended, amount staked per bet, ruined mask per bet)
+    """
+    prop = proportional.reshape((-1,) + (1,) * (stakes.ndim - 1))
+    gain = stakes * returns
+    fixed_path = bankroll + np.cumsum(gain, axis=-1)
+    prop_path = bankroll * np.cumprod(1.0 + np.where(prop, gain, 0.0), axis=-1)
+    path = np.where(prop, prop_path, fixed_path)
+
+    ruined = np.maximum.accumulate(path <= ruin_level * bankroll, axis=-1)
+    # Freeze each ruined path at the value it had when it went under
+    first = np.argmax(ruined, axis=-1)[..., None]
+    path = np.where(ruined, np.take_along_axis(path, first, axis=-1), path)
+
+    before = np.concatenate([np.full(path.shape[:-1] + (1,), bankroll), path[..., :-1]], axis=-1)
+    was_ruined = np.concatenate([np.zeros(ruined.shape[:-1] + (1,), bool), ruined[..., :-1]], axis=-1)
+    staked = np.where(was_ruined, 0.0, np.where(prop, stakes * before, stakes * np.ones_like(before)))
+    return np.concatenate([np.full(path.shape[:-1] + (1,), bankroll), path], axis=-1), staked, ruined
+
+
+def max_drawdown(paths: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough drop along the last axis, as a fraction of the peak."""
+    peak = np.maximum.accumulate(paths, axis=-1)
+    return np.max(1.0 - paths / peak, axis=-1)
+
+
+def run_backtest(df: pd.DataFrame, strategies: dict = STRATEGIES, bankroll: float = 100.0,
+                 ruin_level: float = 0.1, n_sims: int = 500, seed: int = 0) -> pd.DataFrame:
+    """
+    Backtests every model under every staking rule.
+
+    Args:
+        df (pd.DataFrame): Output of load_backtest_picks().
+        strategies (dict): Strategy name -> rule.
+        bankroll (float): Starting bankroll in units.
+        ruin_level (float): Fraction of the starting bankroll that counts as ruin.
+        n_sims (int): Resampled paths per model for the risk-of-ruin estimate (0 to skip).
+        seed (int): Seed for the resampling.
+
+    Returns:
+        pd.DataFrame: One row per model and strategy with bets, staked, profit, roi,
+                      final_bankroll, max_drawdown, ruined and risk_of_ruin.
+    """
+    models = sorted(df['model'].unique())
+    counts = df.groupby('model', sort=True).size().to_numpy()
+    n_max = int(counts.max())
+    valid = np.arange(n_max)[None, :] < counts[:, None]
+
+    df = df.assign(
+        _return=np.select([df['bet_result'] == 'win', df['bet_result'] == 'loss'],
+                          [np.nan_to_num(payout_multiplier(df['odds'])), -1.0], 0.0),
+        _day=df['date'].map(pd.Timestamp.toordinal).astype(float),
+    )
+    returns = _pad(df, '_return', models, n_max)
+    day = _pad(df, '_day', models, n_max, fill=-1)
+    stakes, proportional = stake_arrays(
+        _pad(df, 'units', models, n_max), _pad(df, 'confidence_pct', models, n_max, fill=np.nan),
+        _pad(df, 'odds', models, n_max, fill=np.nan), day, valid, strategies,
+    )
+
+    paths, staked, ruined = simulate_paths(returns, stakes, proportional, bankroll, ruin_level)
+    total_staked = staked.sum(axis=-1)
+    profit = paths[..., -1] - bankroll
+
+    if n_sims:
+        # Resample each model's bets with replacement; padding is never drawn
+        rng = np.random.default_rng(seed)
+        draws = (rng.random((len(models), n_sims, n_max)) * counts[:, None, None]).astype(int)
+        sim_valid = valid[:, None, :]
+        sim_returns = np.where(sim_valid, np.take_along_axis(returns[:, None, :], draws, axis=-1), 0.0)
+        sim_stakes = np.where(sim_valid, np.take_along_axis(stakes[:, :, None, :], draws[None], axis=-1), 0.0)
+        _, _, sim_ruined = simulate_paths(sim_returns, sim_stakes, proportional, bankroll, ruin_level)
+        risk_of_ruin = sim_ruined[..., -1].mean(axis=-1)
+    else:
+        risk_of_ruin = np.full(profit.shape, np.nan)
+
+    names = list(strategies)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = profit / total_staked * 100
+    return pd.DataFrame({
+        'model': np.tile(models, len(names)),
+        'strategy': np.repeat(names, len(models)),
+        'bets': np.tile(counts, len(names)),
+        'staked': total_staked.ravel(),
+        'profit': profit.ravel(),
+        'roi': roi.ravel(),
+        'final_bankroll': paths[..., -1].ravel(),
+        'max_drawdown': max_drawdown(paths).ravel(),
+        'ruined': ruined[..., -1].ravel(),
+        'risk_of_ruin': risk_of_ruin.ravel(),
+    })
+
+
+if __name__ == '__main__':
+    sport = sys.argv[1] if len(sys.argv) > 1 else 'nba'
+    df_results = run_backtest(load_backtest_picks(sport))
+    df_results.to_csv(EVALUATED_DIR / f'{sport}_backtest.csv', index=False)
+    print(f"Backtest for {sport} (starting bankroll 100 units):")
+    print(df_results.round(3).to_string(index=False))
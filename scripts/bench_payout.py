@@ -0,0 +1,79 @@
+"""
+Benchmarks the vectorized payout kernel against the old row-wise apply.
+
+Builds a synthetic frame of graded bets (American odds, whole and fractional
+units, wins/losses/pushes), checks that compute_bet_payouts() returns exactly
+what the row-wise version did, then times both at a few history sizes.
+
+Usage:
+    python scripts/bench_payout.py [rows ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import compute_bet_payouts
+
+
+def calculate_payout(units, odds):
+    """The per-row payout evaluate_bets used to apply over the merged frame."""
+    if odds > 0:
+        return units * (odds / 100.0)
+    else:
+        return units * (100.0 / abs(odds))
+
+
+def rowwise_payouts(df: pd.DataFrame) -> np.ndarray:
+    conditions_payout = [
+        df['bet_result'] == 'win',
+        df['bet_result'] == 'push',
+        df['bet_result'] == 'loss'
+    ]
+    choices_payout = [
+        df.apply(lambda row: calculate_payout(row['units'], row['odds']), axis=1),
+        0.0,
+        -df['units']
+    ]
+    return np.select(conditions_payout, choices_payout, default=0.0)
+
+
+def make_bets(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    odds = rng.integers(100, 400, n) * rng.choice([-1, 1], n)
+    return pd.DataFrame({
+        'units': rng.choice([0.5, 1, 1.5, 2, 3], n),
+        'odds': odds,
+        'bet_result': rng.choice(['win', 'loss', 'push'], n, p=[0.48, 0.48, 0.04]),
+    })
+
+
+def best_of(func, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(sizes):
+    df_check = make_bets(10_000, seed=1)
+    np.testing.assert_allclose(
+        compute_bet_payouts(df_check['units'], df_check['odds'], df_check['bet_result']),
+        rowwise_payouts(df_check), rtol=0, atol=1e-12,
+    )
+    print("Vectorized payouts match the row-wise payouts\n")
+
+    print(f"{'rows':>10} {'row-wise (s)':>14} {'vectorized (s)':>16} {'speedup':>9}")
+    for n in sizes:
+        df = make_bets(n)
+        rowwise = best_of(lambda: rowwise_payouts(df), repeat=1 if n > 100_000 else 3)
+        vectorized = best_of(lambda: compute_bet_payouts(df['units'], df['odds'], df['bet_result']))
+        print(f"{n:>10,} {rowwise:>14.4f} {vectorized:>16.5f} {rowwise / vectorized:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000])
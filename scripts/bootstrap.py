@@ -0,0 +1,178 @@
+"""
+Bootstrap confidence intervals for ROI, win rate and units won.
+
+A few hundred picks per model is not enough for the raw ROI to mean much on its
+own, so every slice of the evaluated history is resampled and the 2.5/97.5
+percentiles reported alongside the point estimate. Slices (SLICES) are per
+sport, model, bet type and confidence bucket.
+
+Two resampling schemes are run for every slice:
+
+    iid     picks drawn with replacement
+    block   dates drawn with replacement, taking all of a date's picks;
+            this keeps the correlation between same-day picks (shared
+            games, shared reasoning) in the interval
+
+All three statistics are ratios of sums, so each slice is reduced to per-pick
+(or per-date) arrays of payout, units, wins and decided bets. A batch of
+resamples is then one (batch, n) index draw and one sum along axis 1. Slices
+are spread across a ProcessPoolExecutor.
+
+Usage:
+    python scripts/bootstrap.py [n_resamples]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_backtest_picks
+from picks_parser import classify_pick_type
+from utils import SPORT_INFO
+
+
+EVALUATED_DIR = Path('./data/evaluated')
+
+SLICES = [
+    ['sport'],
+    ['sport', 'model'],
+    ['sport', 'bet_type'],
+    ['sport', 'model', 'bet_type'],
+    ['sport', 'confidence_bucket'],
+    ['sport', 'model', 'confidence_bucket'],
+]
+
+CONFIDENCE_BINS = [0, 70, 80, 90, 100]
+METRICS = ['roi', 'win_rate', 'units_won']
+BATCH_SIZE = 500
+
+
+def load_evaluated_picks(sports: list = None, evaluated_dir: Path = EVALUATED_DIR) -> pd.DataFrame:
+    """
+    The graded picks of every sport, with sport, bet_type and confidence_bucket columns.
+    """
+    frames = []
+    for sport in sports or SPORT_INFO:
+        if not (Path(evaluated_dir) / f'{sport}_bet_picks_evaluated.csv').is_file():
+            continue
+        df = load_backtest_picks(sport, evaluated_dir)
+        df['sport'] = sport
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df['bet_type'] = classify_pick_type(df['pick'])
+    df['confidence_bucket'] = pd.cut(df['confidence_pct'], CONFIDENCE_BINS).astype(str)
+    return df
+
+
+def _stats(payout: np.ndarray, units: np.ndarray, wins: np.ndarray, decided: np.ndarray) -> np.ndarray:
+    """ROI (%), win rate (%) and units won from sums along the last axis."""
+    total_payout = payout.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = total_payout / units.sum(axis=-1) * 100
+        win_rate = wins.sum(axis=-1) / decided.sum(axis=-1) * 100
+    return np.stack([roi, win_rate, total_payout], axis=-1)
+
+
+def _resample(arrays: tuple, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Statistics of n_resamples draws with replacement over the rows of arrays, in batches."""
+    n = len(arrays[0])
+    out = np.empty((n_resamples, len(METRICS)))
+    for start in range(0, n_resamples, BATCH_SIZE):
+        size = min(BATCH_SIZE, n_resamples - start)
+        idx = rng.integers(0, n, size=(size, n))
+        out[start:start + size] = _stats(*(a[idx] for a in arrays))
+    return out
+
+
+def bootstrap_slice(task: tuple) -> list:
+    """
+    Point estimates and percentile intervals for one slice (runs in a worker process).
+
+    Args:
+        task (tuple): (slice key dict, per-pick arrays dict, n_resamples, alpha, seed sequence)
+
+    Returns:
+        list: One dict per method and metric.
+    """
+    key, arrays, n_resamples, alpha, seed = task
+    rng = np.random.default_rng(seed)
+    per_pick = (arrays['payout'], arrays['units'], arrays['win'], arrays['decided'])
+
+    # Per-date sums for the block bootstrap
+    _, date_codes = np.unique(arrays['date'], return_inverse=True)
+    per_date = tuple(np.bincount(date_codes, weights=a) for a in per_pick)
+
+    estimate = _stats(*per_pick)
+    rows = []
+    for method, samples in [('iid', _resample(per_pick, n_resamples, rng)),
+                            ('block', _resample(per_date, n_resamples, rng))]:
+        low, high = np.nanpercentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+        for i, metric in enumerate(METRICS):
+            rows.append({**key, 'method': method, 'metric': metric, 'estimate': estimate[i],
+                         'ci_low': low[i], 'ci_high': high[i], 'picks': len(per_pick[0]),
+                         'dates': len(per_date[0])})
+    return rows
+
+
+def _tasks(df: pd.DataFrame, slices: list, n_resamples: int, alpha: float, seed: int, min_picks: int):
+    arrays = pd.DataFrame({
+        'payout': df['bet_payout'].astype(float),
+        'units': df['units'].astype(float),
+        'win': (df['bet_result'] == 'win').astype(float),
+        'decided': df['bet_result'].isin(['win', 'loss']).astype(float),
+        'date': df['date'].map(pd.Timestamp.toordinal),
+    })
+    keys = []
+    for dims in slices:
+        for values, index in df.groupby(dims, observed=True).indices.items():
+            if len(index) >= min_picks:
+                keys.append((dict(zip(dims, values if isinstance(values, tuple) else (values,))), index))
+
+    seeds = np.random.SeedSequence(seed).spawn(len(keys))
+    for (key, index), child in zip(keys, seeds):
+        yield key, {c: arrays[c].to_numpy()[index] for c in arrays.columns}, n_resamples, alpha, child
+
+
+def bootstrap_ci(df: pd.DataFrame, slices: list = SLICES, n_resamples: int = 2000, alpha: float = 0.05,
+                 seed: int = 0, min_picks: int = 20, max_workers: int = None) -> pd.DataFrame:
+    """
+    Bootstrap and block-bootstrap intervals for every slice, computed in a process pool.
+
+    Args:
+        df (pd.DataFrame): Output of load_evaluated_picks().
+        slices (list): Lists of columns to group by.
+        n_resamples (int): Resamples per slice and method.
+        alpha (float): 0.05 gives 95% intervals.
+        seed (int): Results are reproducible for a given seed, whatever the number of workers.
+        min_picks (int): Slices with fewer picks are skipped.
+        max_workers (int): Process pool size (defaults to the CPU count).
+
+    Returns:
+        pd.DataFrame: One row per slice, method and metric with estimate, ci_low, ci_high, picks and dates.
+    """
+    tasks = list(_tasks(df, slices, n_resamples, alpha, seed, min_picks))
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(tasks) // (4 * workers))
+        rows = [row for result in pool.map(bootstrap_slice, tasks, chunksize=chunksize) for row in result]
+
+    df_ci = pd.DataFrame(rows)
+    dims = [c for c in ['sport', 'model', 'bet_type', 'confidence_bucket'] if c in df_ci.columns]
+    df_ci[dims] = df_ci[dims].fillna('all')
+    return df_ci[dims + ['method', 'metric', 'estimate', 'ci_low', 'ci_high', 'picks', 'dates']]
+
+
+if __name__ == '__main__':
+    n_resamples = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    start = time.perf_counter()
+    df_ci = bootstrap_ci(load_evaluated_picks(), n_resamples=n_resamples)
+    df_ci.to_csv(EVALUATED_DIR / 'bootstrap_ci.csv', index=False)
+    print(f"{len(df_ci)} intervals from {n_resamples} resamples per slice in {time.perf_counter() - start:.1f}s")
+
+    roi = df_ci.loc[(df_ci['metric'] == 'roi') & (df_ci['bet_type'] == 'all') & (df_ci['confidence_bucket'] == 'all')]
+    print(roi.drop(columns=['bet_type', 'confidence_bucket', 'metric']).round(2).to_string(index=False))
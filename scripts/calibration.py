@@ -0,0 +1,220 @@
+"""
+Calibration of the models' confidence_pct against how often their picks win.
+
+Every pick states a confidence and its units follow from it, so a model that
+says 90% should win about 90% of its decided 90% picks. Pushes and picks
+without a confidence are left out.
+
+The graded picks are binned by confidence (CONFIDENCE_BINS) per model and bet
+type. Each bin stores additive sums only: picks, wins, summed confidence,
+summed Brier score and summed log loss. Like the leaderboards, the table is
+kept in data/leaderboards/<sport>_calibration.csv, and each evaluation run
+adds the picks it just graded. The per-model metrics are ratios of those
+sums, so they never need the pick history:
+
+    brier          mean (p - won)^2
+    log_loss       mean -log(p) for wins, -log(1 - p) for losses
+    ece            expected calibration error, the pick-weighted mean of
+                   |win rate - mean confidence| over the bins
+    overconfidence mean confidence - win rate
+
+compact_calibration() renders one model's reliability table in a few lines
+for the prompt history (see prompt_shards.compact_history).
+
+Usage:
+    python scripts/calibration.py [sport ...]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from leaderboards import LEADERBOARD_DIR, leaderboard_file
+from picks_ledger import LEDGER_KEY, key_frame
+from picks_parser import classify_pick_type
+
+
+CONFIDENCE_BINS = list(range(50, 101, 5))
+BIN_LABELS = [f'{lo}-{hi}' for lo, hi in zip(CONFIDENCE_BINS[:-1], CONFIDENCE_BINS[1:])]
+BIN_KEY = ['model', 'bet_type', 'confidence_bin']
+STAT_COLUMNS = ['picks', 'wins', 'sum_confidence', 'sum_brier', 'sum_log_loss']
+
+# Keeps log loss finite for picks stated at 100% (or 0%)
+PROBABILITY_CLIP = (0.01, 0.99)
+
+
+def attach_confidence(df_evaluated: pd.DataFrame, df_picks: pd.DataFrame) -> pd.DataFrame:
+    """
+    Graded picks with the confidence_pct of the matching pick (by ledger key).
+
+    Args:
+        df_evaluated (pd.DataFrame): Graded picks (evaluate_bets output or the evaluated history).
+        df_picks (pd.DataFrame): Picks with confidence_pct (parsed picks or the picks history).
+    """
+    df = df_evaluated.copy()
+    df[LEDGER_KEY] = key_frame(df)
+    confidence = key_frame(df_picks)
+    confidence['confidence_pct'] = pd.to_numeric(df_picks['confidence_pct'], errors='coerce').to_numpy()
+    confidence = confidence.drop_duplicates(subset=LEDGER_KEY)
+    return df.drop(columns='confidence_pct', errors='ignore').merge(confidence, on=LEDGER_KEY, how='left')
+
+
+def bin_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Additive calibration sums per model, bet type and confidence bin.
+
+    Args:
+        df (pd.DataFrame): Graded picks with confidence_pct (see attach_confidence).
+
+    Returns:
+        pd.DataFrame: STAT_COLUMNS indexed by BIN_KEY.
+    """
+    decided = df['bet_result'].isin(['win', 'loss']).to_numpy() & df['confidence_pct'].notna().to_numpy()
+    df = df.loc[decided]
+
+    confidence = df['confidence_pct'].to_numpy(dtype=np.float64)
+    p = np.clip(confidence / 100, *PROBABILITY_CLIP)
+    won = (df['bet_result'] == 'win').to_numpy(dtype=np.float64)
+
+    stats = pd.DataFrame({
+        'model': df['model'].to_numpy(),
+        'bet_type': classify_pick_type(df['pick']).to_numpy(),
+        'confidence_bin': pd.cut(np.clip(confidence, CONFIDENCE_BINS[0], CONFIDENCE_BINS[-1]),
+                                 CONFIDENCE_BINS, labels=BIN_LABELS, include_lowest=True).astype(str),
+        'picks': 1,
+        'wins': won.astype(int),
+        'sum_confidence': p,
+        'sum_brier': (p - won) ** 2,
+        'sum_log_loss': -(won * np.log(p) + (1 - won) * np.log(1 - p)),
+    })
+    return stats.groupby(BIN_KEY)[STAT_COLUMNS].sum()
+
+
+def calibration_file(sport: str, leaderboard_dir: Path = LEADERBOARD_DIR) -> Path:
+    return leaderboard_file(sport, 'calibration', leaderboard_dir)
+
+
+def load_calibration(sport: str, leaderboard_dir: Path = LEADERBOARD_DIR) -> pd.DataFrame:
+    """
+    Reads the stored calibration bins for a sport.
+
+    Raises:
+        FileNotFoundError: If they haven't been built yet.
+    """
+    return pd.read_csv(calibration_file(sport, leaderboard_dir))
+
+
+def update_calibration(sport: str, df_new: pd.DataFrame, picks_hist_file: Path, evaluated_hist_file: Path,
+                       leaderboard_dir: Path = LEADERBOARD_DIR):
+    """
+    Adds newly graded picks to the sport's stored calibration bins.
+
+    Like leaderboards.update_leaderboards(), this must run after df_new has
+    been appended to the history files: if the bins don't exist yet they are
+    built from the history, which then already holds the new picks.
+
+    Args:
+        sport (str): The sport prefix.
+        df_new (pd.DataFrame): The picks graded in this run, with confidence_pct.
+        picks_hist_file (Path): The sport's picks history CSV (for confidence_pct).
+        evaluated_hist_file (Path): The sport's evaluated history CSV.
+        leaderboard_dir (Path): Directory for the calibration file.
+    """
+    path = calibration_file(sport, leaderboard_dir)
+    Path(leaderboard_dir).mkdir(parents=True, exist_ok=True)
+
+    if not path.is_file():
+        try:
+            df_hist = attach_confidence(pd.read_csv(evaluated_hist_file), pd.read_csv(picks_hist_file))
+        except FileNotFoundError:
+            df_hist = df_new
+        print(f"Building calibration bins {path} from the evaluated history")
+        bin_stats(df_hist).reset_index().to_csv(path, index=False)
+        return
+    if df_new.empty:
+        return
+
+    stored = pd.read_csv(path).set_index(BIN_KEY)[STAT_COLUMNS]
+    updated = stored.add(bin_stats(df_new), fill_value=0)
+    updated[['picks', 'wins']] = updated[['picks', 'wins']].astype(int)
+    updated.sort_index().reset_index().to_csv(path, index=False)
+
+
+def reliability_table(df_bins: pd.DataFrame, by: list = ['model']) -> pd.DataFrame:
+    """
+    Win rate against mean stated confidence per confidence bin.
+
+    Args:
+        df_bins (pd.DataFrame): Stored calibration bins (load_calibration).
+        by (list): Columns to keep apart besides the bin; bet types are pooled
+                   unless 'bet_type' is included.
+
+    Returns:
+        pd.DataFrame: by + confidence_bin, picks, confidence, win_rate and gap (all in %).
+    """
+    df = df_bins.groupby(by + ['confidence_bin'])[STAT_COLUMNS].sum().reset_index()
+    df['confidence'] = df['sum_confidence'] / df['picks'] * 100
+    df['win_rate'] = df['wins'] / df['picks'] * 100
+    df['gap'] = df['win_rate'] - df['confidence']
+    return df[by + ['confidence_bin', 'picks', 'confidence', 'win_rate', 'gap']]
+
+
+def calibration_metrics(df_bins: pd.DataFrame, by: list = ['model', 'bet_type']) -> pd.DataFrame:
+    """
+    Brier score, log loss and expected calibration error per group.
+
+    Rows with bet_type 'all' pool every bet type of the model.
+
+    Args:
+        df_bins (pd.DataFrame): Stored calibration bins, optionally with a sport column.
+        by (list): Grouping columns, from BIN_KEY (and sport) minus confidence_bin.
+
+    Returns:
+        pd.DataFrame: by + picks, confidence, win_rate, overconfidence, brier, log_loss, ece.
+    """
+    if 'bet_type' in by:
+        pooled = df_bins.assign(bet_type='all')
+        df_bins = pd.concat([df_bins, pooled], ignore_index=True)
+
+    bins = df_bins.groupby(by + ['confidence_bin'])[STAT_COLUMNS].sum().reset_index()
+    bins['abs_gap'] = (bins['wins'] - bins['sum_confidence']).abs()
+
+    df = bins.groupby(by)[STAT_COLUMNS + ['abs_gap']].sum().reset_index()
+    df['confidence'] = df['sum_confidence'] / df['picks'] * 100
+    df['win_rate'] = df['wins'] / df['picks'] * 100
+    df['overconfidence'] = df['confidence'] - df['win_rate']
+    df['brier'] = df['sum_brier'] / df['picks']
+    df['log_loss'] = df['sum_log_loss'] / df['picks']
+    # sum over bins of (n_b / N) * |wins_b / n_b - conf_b / n_b|
+    df['ece'] = df['abs_gap'] / df['picks']
+    return df[by + ['picks', 'confidence', 'win_rate', 'overconfidence', 'brier', 'log_loss', 'ece']]
+
+
+def compact_calibration(df_bins: pd.DataFrame, model: str) -> str:
+    """
+    One model's reliability table and scores as a short block for prompts.
+    """
+    df_model = df_bins.loc[df_bins['model'] == model]
+    if df_model.empty:
+        return ""
+
+    metrics = calibration_metrics(df_model, by=['model']).iloc[0]
+    table = reliability_table(df_model).drop(columns='model').round(1)
+    return '\n'.join([
+        f"Calibration of your confidence_pct (Brier {metrics['brier']:.3f}, "
+        f"ECE {metrics['ece'] * 100:.1f} pts, stated {metrics['confidence']:.1f}% vs won {metrics['win_rate']:.1f}%):",
+        table.to_csv(index=False),
+    ])
+
+
+if __name__ == '__main__':
+    sports = sys.argv[1:] or sorted(p.name[:-len('_calibration.csv')] for p in LEADERBOARD_DIR.glob('*_calibration.csv'))
+    df_bins = pd.concat([load_calibration(sport).assign(sport=sport) for sport in sports], ignore_index=True)
+
+    print("Calibration by sport, model and bet type:")
+    print(calibration_metrics(df_bins, by=['sport', 'model', 'bet_type']).round(3).to_string(index=False))
+    print()
+    print("Reliability by sport and model:")
+    print(reliability_table(df_bins, by=['sport', 'model']).round(1).to_string(index=False))
@@ -8,6 +8,8 @@ import pandas as pd
 import re
 from pathlib import Path
 
+from picks_parser import clean_pick_columns, normalize_timestamps
+
 def clean_timestamps(file_path):
     """
     Clean timestamp issues in the CSV file:
@@ -23,11 +25,9 @@ def clean_timestamps(file_path):
     print(f"Original columns: {list(df.columns)}")
     print(f"Original shape: {df.shape}")
     
-    # Clean column names - remove invisible Unicode characters
-    df.columns = df.columns.str.strip().str.replace('\u200b', '').str.replace('\ufeff', '')
-    
-    # Remove duplicate columns (keep first occurrence)
-    df = df.loc[:, ~df.columns.duplicated()]
+    # Clean column names - remove invisible Unicode characters and merge the
+    # duplicate columns that leaves behind
+    df = clean_pick_columns(df)
     
     print(f"Cleaned columns: {list(df.columns)}")
     print(f"New shape: {df.shape}")
@@ -47,7 +47,7 @@ def clean_timestamps(file_path):
         
         # Try to standardize timestamps to ISO 8601
         try:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+            df['timestamp'] = normalize_timestamps(df['timestamp'])
             # Convert back to string in standard format
             df['timestamp'] = df['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S%z')
             print("\nSuccessfully standardized timestamps to ISO 8601 format")
@@ -5,84 +5,48 @@ This script:
 1. Reads all CSV files in the data/bets directory
 2. Identifies and fixes inconsistent timestamp formats
 3. Converts all timestamps to ISO 8601 format: YYYY-MM-DDTHH:MM:SS.000Z
-4. Saves the cleaned data back to the original files
+4. Saves the cleaned data back to the original files, only if a value changed
 
 This prevents ValueError exceptions during datetime parsing in evaluation scripts.
 """
 
 import pandas as pd
 from pathlib import Path
-import re
-from datetime import datetime
 
+from llm_response import INVISIBLE_CHARS
+from picks_parser import TIMESTAMP_FORMAT, read_picks_raw, clean_pick_columns
+from picks_checkpoint import drop_checkpoint
 
-def clean_timestamp(timestamp_str):
+
+def standardize_timestamps(values: pd.Series):
     """
-    Convert various timestamp formats to standardized ISO 8601 format.
-    
+    Convert a whole column of timestamps to standardized ISO 8601 format.
+
     Handles formats like:
     - "2025-12-11 00:00:00+00:00" (space separator with timezone)
     - "2025-12-11T00:00:00.000Z" (already correct)
     - "2025-12-11T00:00:00Z" (missing milliseconds)
-    - Other variations
-    
-    Returns: "YYYY-MM-DDTHH:MM:SS.000Z"
-    """
-    if pd.isna(timestamp_str) or timestamp_str == '':
-        return timestamp_str
-    
-    try:
-        # Remove any zero-width or invisible Unicode characters
-        timestamp_str = str(timestamp_str).strip()
-        timestamp_str = re.sub(r'[\u200b\u200c\u200d\ufeff]', '', timestamp_str)
-        
-        # Try to parse the timestamp with pandas (handles multiple formats)
-        dt = pd.to_datetime(timestamp_str, utc=True, errors='coerce')
-        
-        if pd.isna(dt):
-            print(f"  Warning: Could not parse timestamp: {timestamp_str}")
-            return timestamp_str
-        
-        # Convert to standardized ISO 8601 format with milliseconds
-        # Format: YYYY-MM-DDTHH:MM:SS.000Z
-        standardized = dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        
-        return standardized
-    
-    except Exception as e:
-        print(f"  Error processing timestamp '{timestamp_str}': {e}")
-        return timestamp_str
+    - Other variations, with or without invisible Unicode characters
 
+    Invisible characters are stripped with one str.replace, the column is
+    parsed with one pd.to_datetime call and formatted back with one strftime.
+    Empty values stay empty and values that can't be parsed are left as they were.
 
-def clean_start_time(start_time_str):
-    """
-    Convert various start_time formats to standardized ISO 8601 format.
-    
-    Returns: "YYYY-MM-DDTHH:MM:SS.000Z"
+    Returns:
+        tuple: (standardized values as "YYYY-MM-DDTHH:MM:SS.000Z",
+                number of values changed, number of values that couldn't be parsed)
     """
-    if pd.isna(start_time_str) or start_time_str == '':
-        return start_time_str
-    
-    try:
-        # Remove any zero-width or invisible Unicode characters
-        start_time_str = str(start_time_str).strip()
-        start_time_str = re.sub(r'[\u200b\u200c\u200d\ufeff]', '', start_time_str)
-        
-        # Try to parse the start_time with pandas
-        dt = pd.to_datetime(start_time_str, utc=True, errors='coerce')
-        
-        if pd.isna(dt):
-            print(f"  Warning: Could not parse start_time: {start_time_str}")
-            return start_time_str
-        
-        # Convert to standardized ISO 8601 format with milliseconds
-        standardized = dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        
-        return standardized
-    
-    except Exception as e:
-        print(f"  Error processing start_time '{start_time_str}': {e}")
-        return start_time_str
+    original = values.fillna('').astype(str)
+    stripped = original.str.replace(INVISIBLE_CHARS, '', regex=True).str.strip()
+
+    parsed = pd.to_datetime(stripped.where(stripped != ''), format='mixed', utc=True, errors='coerce')
+    formatted = parsed.dt.strftime(TIMESTAMP_FORMAT)
+
+    unparsed = parsed.isna() & (stripped != '')
+    # Unparseable values are kept exactly as they were; blank ones become ''
+    standardized = formatted.where(parsed.notna(), original.where(unparsed, ''))
+
+    return standardized, int((standardized != original).sum()), int(unparsed.sum())
 
 
 def clean_bet_file(file_path):
@@ -93,60 +57,52 @@ def clean_bet_file(file_path):
         file_path: Path to the CSV file to clean
     
     Returns:
-        Number of timestamps cleaned
+        Number of values changed (0 means the file was left untouched)
     """
     print(f"\nProcessing: {file_path.name}")
     
     try:
-        # Read the CSV file
-        # Use on_bad_lines='skip' to handle malformed lines gracefully
-        df = pd.read_csv(file_path, on_bad_lines='skip')
+        # Read every cell as text so untouched values are written back as-is.
+        # Rows split by unquoted commas in the reason are repaired, not dropped.
+        df_raw = read_picks_raw(file_path)
         
-        if df.empty:
+        if df_raw.empty:
             print(f"  File is empty, skipping.")
             return 0
         
-        print(f"  Loaded {len(df)} rows")
+        print(f"  Loaded {len(df_raw)} rows")
         
         # Track changes
         changes_made = 0
-        
-        # Clean timestamp column if it exists
-        if 'timestamp' in df.columns:
-            print(f"  Cleaning 'timestamp' column...")
-            original_timestamps = df['timestamp'].copy()
-            df['timestamp'] = df['timestamp'].apply(clean_timestamp)
-            
-            # Count how many were changed
-            timestamp_changes = (original_timestamps != df['timestamp']).sum()
-            changes_made += timestamp_changes
-            print(f"    Cleaned {timestamp_changes} timestamp values")
-        
-        # Also check for timestamp with zero-width character (common issue)
-        timestamp_cols = [col for col in df.columns if 'timestamp' in col.lower()]
-        for col in timestamp_cols:
-            if col != 'timestamp':
-                print(f"  Found alternate timestamp column: '{col}' - renaming to 'timestamp'")
-                # Rename the column
-                df = df.rename(columns={col: 'timestamp'})
-                # Clean it
-                df['timestamp'] = df['timestamp'].apply(clean_timestamp)
-                changes_made += len(df)
-        
-        # Clean start_time column if it exists
-        if 'start_time' in df.columns:
-            print(f"  Cleaning 'start_time' column...")
-            original_start_times = df['start_time'].copy()
-            df['start_time'] = df['start_time'].apply(clean_start_time)
-            
-            # Count how many were changed
-            start_time_changes = (original_start_times != df['start_time']).sum()
-            changes_made += start_time_changes
-            print(f"    Cleaned {start_time_changes} start_time values")
-        
-        # Save the cleaned data back to the file
+
+        # Clean column names (e.g. 'timestamp\u200b') and merge duplicate columns
+        df = clean_pick_columns(df_raw)
+        if list(df.columns) != list(df_raw.columns):
+            print(f"  Cleaned column names: {list(df_raw.columns.difference(df.columns))}")
+            changes_made += len(df)
+
+        # Drop header rows pasted in the middle of the file
+        header_rows = df['start_time'] == 'start_time' if 'start_time' in df.columns else pd.Series(False, index=df.index)
+        if header_rows.any():
+            df = df.loc[~header_rows]
+            changes_made += int(header_rows.sum())
+            print(f"  Dropped {int(header_rows.sum())} repeated header rows")
+        
+        # Clean the timestamp and start_time columns, one vectorized pass each
+        for col in ['timestamp', 'start_time']:
+            if col not in df.columns:
+                continue
+            print(f"  Cleaning '{col}' column...")
+            df[col], col_changes, col_unparsed = standardize_timestamps(df[col])
+            changes_made += col_changes
+            print(f"    Cleaned {col_changes} {col} values")
+            if col_unparsed:
+                print(f"    Warning: could not parse {col_unparsed} {col} values; left unchanged")
+        
+        # Save the cleaned data back to the file, only if something changed
         if changes_made > 0:
             df.to_csv(file_path, index=False)
+            drop_checkpoint(file_path)
             print(f"  ✓ Saved cleaned file with {changes_made} changes")
         else:
             print(f"  ✓ No changes needed")
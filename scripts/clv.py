@@ -0,0 +1,180 @@
+"""
+Closing line value (CLV) for every pick.
+
+A pick beats the closing line when the number or price it took is better than
+the last one offered before the game started. Over many picks that's a better
+sign of skill than the win/loss record, which is mostly noise at these sample
+sizes.
+
+Each pick is matched to its side of the market by pick_validation, and then
+joined to the line store again with pd.merge_asof on game_id. This time the
+join takes the last snapshot strictly before start_time, which is the closing
+line. Two numbers are computed per pick, in one vectorized pass:
+
+    clv_points  points gained on the line: spreads pick_point - close_point,
+                overs close_total - pick_total, unders pick_total - close_total
+                (NaN for moneylines and draws)
+    clv_prob    closing implied probability - implied probability of the odds
+                taken; positive means the market moved toward the pick
+
+clv_prob compares prices only. On spreads and totals it ignores the number: a
+pick at -3.5 -110 that closes at -5.5 -110 has clv_prob 0 even though it beat
+the close by two points. That movement is in clv_points instead, and
+beat_close looks at clv_points first and at clv_prob only when the number
+didn't move. Turning points into probability needs a per-sport model of how
+much each half point is worth around key numbers, which this module doesn't
+attempt, so clv_prob averages for spreads and totals understate line moves.
+
+Results are appended to data/evaluated/<sport>_clv.csv. Each run only
+processes picks whose games have started since the last run, so a game's CLV
+is computed once.
+
+Usage:
+    python scripts/clv.py [sport]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from picks_ledger import LEDGER_KEY, append_rows, key_frame
+from picks_parser import parse_picks_file
+from pick_validation import SIDE_COLUMNS, SNAPSHOT_COLUMNS, load_line_store, validate_picks
+from timestamps import ensure_epoch, from_epoch_ms
+from utils import implied_probability
+
+
+PICKS_DIR = Path('./data/bets')
+EVALUATED_DIR = Path('./data/evaluated')
+
+CLV_COLUMNS = LEDGER_KEY + ['start_time', 'side', 'odds', 'pick_point', 'close_time', 'close_odds',
+                            'close_point', 'clv_points', 'clv_prob', 'beat_close']
+
+
+def closing_lines(df_picks: pd.DataFrame, df_lines: pd.DataFrame) -> pd.DataFrame:
+    """
+    The last snapshot before each pick's start_time, as '<column>_close' columns.
+
+    Args:
+        df_picks (pd.DataFrame): Picks with game_id and start_time.
+        df_lines (pd.DataFrame): Output of pick_validation.load_line_store().
+
+    Returns:
+        pd.DataFrame: df_picks with close_time and the SNAPSHOT_COLUMNS as '<column>_close'.
+    """
+    df = ensure_epoch(df_picks, 'start_time').copy()
+    df['game_id'] = df['game_id'].astype('Int64')
+    df['_start'] = df['start_time_epoch'].astype('int64')
+
+    closing = df_lines.rename(columns={c: f'{c}_close' for c in SNAPSHOT_COLUMNS})
+    df = pd.merge_asof(
+        df.reset_index().sort_values('_start'),
+        closing,
+        left_on='_start', right_on='date_scraped_epoch', by='game_id',
+        direction='backward', allow_exact_matches=False,
+    ).set_index('index').sort_index()
+    df.index.name = None
+    df['close_time'] = from_epoch_ms(df['date_scraped_epoch'])
+    return df.drop(columns=['_start', 'date_scraped_epoch'])
+
+
+def compute_clv(df_picks: pd.DataFrame, df_lines: pd.DataFrame) -> pd.DataFrame:
+    """
+    CLV in points and implied-probability terms for a batch of picks.
+
+    Args:
+        df_picks (pd.DataFrame): Parsed picks (see picks_parser.parse_picks_file).
+        df_lines (pd.DataFrame): Output of pick_validation.load_line_store().
+
+    Returns:
+        pd.DataFrame: One row per pick in CLV_COLUMNS. Picks without a closing
+                      snapshot have NaN CLV.
+    """
+    df = closing_lines(validate_picks(df_picks, df_lines), df_lines)
+
+    df['close_odds'] = np.nan
+    df['close_point'] = np.nan
+    for side, (odds_col, point_col, _) in SIDE_COLUMNS.items():
+        rows = df['side'] == side
+        df.loc[rows, 'close_odds'] = df.loc[rows, f'{odds_col}_close']
+        if point_col:
+            df.loc[rows, 'close_point'] = df.loc[rows, f'{point_col}_close']
+
+    point_gain = np.select(
+        [df['side'].isin(['home_spread', 'away_spread']), df['side'] == 'over', df['side'] == 'under'],
+        [df['pick_point'] - df['close_point'], df['close_point'] - df['pick_point'],
+         df['pick_point'] - df['close_point']],
+        default=np.nan,
+    )
+    df['clv_points'] = point_gain
+    df['clv_prob'] = implied_probability(df['close_odds']) - implied_probability(df['odds'])
+    # Better number, or the same number at a better price
+    beat_close = (df['clv_points'] > 0) | ((df['clv_points'].fillna(0) == 0) & (df['clv_prob'] > 0))
+    df['beat_close'] = beat_close.astype(float).mask(df['clv_prob'].isna())
+    return df[CLV_COLUMNS]
+
+
+def clv_summary(df_clv: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-model average CLV and the share of picks that beat the close.
+    """
+    return df_clv.dropna(subset=['clv_prob']).groupby('model').agg(
+        picks=('clv_prob', 'size'),
+        avg_clv_prob=('clv_prob', 'mean'),
+        avg_clv_points=('clv_points', 'mean'),
+        beat_close_pct=('beat_close', 'mean'),
+    ).sort_values('avg_clv_prob', ascending=False).reset_index()
+
+
+def update_clv(sport: str, models: list = None, picks_dir: Path = PICKS_DIR, output_dir: Path = EVALUATED_DIR,
+               now=None) -> pd.DataFrame:
+    """
+    Computes CLV for the picks whose games have closed since the last run.
+
+    A game is closed once its start_time has passed; its closing line can't
+    change after that. Picks already in <sport>_clv.csv are skipped.
+
+    Returns:
+        pd.DataFrame: The full CLV table for the sport.
+    """
+    clv_file = Path(output_dir) / f'{sport}_clv.csv'
+    try:
+        df_done = pd.read_csv(clv_file)
+    except FileNotFoundError:
+        df_done = pd.DataFrame(columns=CLV_COLUMNS)
+
+    frames = []
+    for picks_file in sorted(Path(picks_dir).glob(f'{sport}_bets_*.txt')):
+        model_name = picks_file.stem.split('_bets_', 1)[1]
+        if models and model_name not in models:
+            continue
+        frames.append(parse_picks_file(picks_file, model_name)[0])
+    if not frames:
+        return df_done
+    df_picks = pd.concat(frames, ignore_index=True)
+
+    now_ms = int(pd.Timestamp(now or pd.Timestamp.now(tz='UTC')).value // 1_000_000)
+    closed = (df_picks['start_time_epoch'] <= now_ms).to_numpy()
+    keys = key_frame(df_picks)
+    done = (keys.merge(key_frame(df_done).drop_duplicates(), on=LEDGER_KEY, how='left', indicator=True)['_merge'] == 'both').to_numpy()
+    df_new = df_picks.loc[closed & ~done & ~keys.duplicated().to_numpy()]
+
+    if df_new.empty:
+        print(f"No newly closed {sport} picks.")
+        return df_done
+
+    df_clv = compute_clv(df_new, load_line_store(sport))
+    append_rows(df_clv, clv_file)
+    print(f"Computed CLV for {len(df_clv)} newly closed {sport} picks")
+    if df_done.empty:
+        return df_clv
+    return pd.concat([df_done, df_clv], ignore_index=True)
+
+
+if __name__ == '__main__':
+    sport = sys.argv[1] if len(sys.argv) > 1 else 'nba'
+    df_clv = update_clv(sport)
+    print(f"Closing line value for {sport}:")
+    print(clv_summary(df_clv).round(3).to_string(index=False))
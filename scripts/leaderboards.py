@@ -0,0 +1,130 @@
+"""
+Leaderboard tables kept up to date from newly graded picks.
+
+Each view in VIEWS is a table of additive totals (bets, wins, losses, pushes,
+units staked, units won) grouped by its dimensions. It is saved to
+data/leaderboards/<sport>_<view>.csv:
+
+    model             one row per model
+    model_date        per model and game date (Eastern)
+    model_bet_type    per model and bet type (spread / total / moneyline)
+    model_units       per model and units staked on the pick
+
+update_leaderboards() is given only the picks graded in this run (see
+picks_ledger). It adds their totals onto the stored rows and recomputes ROI
+and win rate from the sums, so the cost follows the number of new grades. A
+view that doesn't exist yet is built once from the full evaluated history.
+Dashboards and prompt summaries read these tables with load_leaderboard()
+instead of aggregating the evaluated CSV.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from picks_parser import classify_pick_type
+
+
+LEADERBOARD_DIR = Path('./data/leaderboards')
+
+VIEWS = {
+    'model': ['model'],
+    'model_date': ['model', 'date'],
+    'model_bet_type': ['model', 'bet_type'],
+    'model_units': ['model', 'units'],
+}
+
+SUM_COLUMNS = ['bets', 'wins', 'losses', 'pushes', 'units_staked', 'units_won']
+
+
+def _totals(df_evaluated: pd.DataFrame, dims: list) -> pd.DataFrame:
+    """Additive totals of graded picks grouped by dims."""
+    df = pd.DataFrame({
+        'model': df_evaluated['model'],
+        'date': pd.to_datetime(df_evaluated['date']).dt.strftime('%Y-%m-%d'),
+        'bet_type': classify_pick_type(df_evaluated['pick']),
+        'units': pd.to_numeric(df_evaluated['units'], errors='coerce'),
+        'bets': 1,
+        'wins': (df_evaluated['bet_result'] == 'win').astype(int),
+        'losses': (df_evaluated['bet_result'] == 'loss').astype(int),
+        'pushes': (df_evaluated['bet_result'] == 'push').astype(int),
+        'units_staked': pd.to_numeric(df_evaluated['units'], errors='coerce'),
+        'units_won': pd.to_numeric(df_evaluated['bet_payout'], errors='coerce'),
+    })
+    return df.groupby(dims)[SUM_COLUMNS].sum()
+
+
+def _with_rates(totals: pd.DataFrame) -> pd.DataFrame:
+    out = totals.reset_index()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['roi'] = out['units_won'] / out['units_staked'] * 100
+        out['win_rate'] = out['wins'] / (out['wins'] + out['losses']) * 100
+    return out
+
+
+def leaderboard_view(df_evaluated: pd.DataFrame, view: str) -> pd.DataFrame:
+    """
+    One view computed directly from graded picks, as rebuild_leaderboards() stores it.
+    """
+    return _with_rates(_totals(df_evaluated, VIEWS[view]))
+
+
+def leaderboard_file(sport: str, view: str, leaderboard_dir: Path = LEADERBOARD_DIR) -> Path:
+    return Path(leaderboard_dir) / f'{sport}_{view}.csv'
+
+
+def load_leaderboard(sport: str, view: str = 'model', leaderboard_dir: Path = LEADERBOARD_DIR) -> pd.DataFrame:
+    """
+    Reads a stored leaderboard view.
+
+    Raises:
+        FileNotFoundError: If the view hasn't been built yet.
+    """
+    return pd.read_csv(leaderboard_file(sport, view, leaderboard_dir), dtype={'date': str})
+
+
+def rebuild_leaderboards(sport: str, df_evaluated_hist: pd.DataFrame, leaderboard_dir: Path = LEADERBOARD_DIR):
+    """
+    Builds every view from the full evaluated history, overwriting what's stored.
+    """
+    Path(leaderboard_dir).mkdir(parents=True, exist_ok=True)
+    for view in VIEWS:
+        leaderboard_view(df_evaluated_hist, view).to_csv(leaderboard_file(sport, view, leaderboard_dir), index=False)
+
+
+def update_leaderboards(sport: str, df_new: pd.DataFrame, evaluated_hist_file: Path,
+                        leaderboard_dir: Path = LEADERBOARD_DIR):
+    """
+    Adds newly graded picks to every stored view.
+
+    Must be called after df_new has been appended to evaluated_hist_file: views
+    that don't exist yet are built from that file, which then already holds
+    the new picks, and aren't given the delta a second time.
+
+    Args:
+        sport (str): The sport prefix.
+        df_new (pd.DataFrame): The picks graded in this run (evaluate_bets output).
+        evaluated_hist_file (Path): The sport's evaluated history CSV.
+        leaderboard_dir (Path): Directory for the view files.
+    """
+    Path(leaderboard_dir).mkdir(parents=True, exist_ok=True)
+    df_hist = None
+    for view, dims in VIEWS.items():
+        path = leaderboard_file(sport, view, leaderboard_dir)
+        if not path.is_file():
+            if df_hist is None:
+                try:
+                    df_hist = pd.read_csv(evaluated_hist_file)
+                except FileNotFoundError:
+                    df_hist = df_new
+            print(f"Building leaderboard {path} from the evaluated history")
+            _with_rates(_totals(df_hist, dims)).to_csv(path, index=False)
+            continue
+        if df_new.empty:
+            continue
+
+        stored = pd.read_csv(path, dtype={'date': str}).set_index(dims)[SUM_COLUMNS]
+        updated = stored.add(_totals(df_new, dims), fill_value=0)
+        updated[['bets', 'wins', 'losses', 'pushes']] = updated[['bets', 'wins', 'losses', 'pushes']].astype(int)
+        _with_rates(updated.sort_index()).to_csv(path, index=False)
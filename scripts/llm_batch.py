@@ -0,0 +1,386 @@
+"""
+Batch-job packaging of prompts for provider batch endpoints.
+
+export_batch() collects every pending prompt (prompts/<sport>_prompt_<model>.txt
+and prompts/shards/<sport>_prompt_<model>_<NN>.txt) and writes one JSONL file
+per model under data/llm_batches/<run_id>/, one request per line with a
+custom id, the provider model id and generation parameters. A prompt is
+pending until a response for its current content has been imported, so
+unchanged prompts (see prompt_manifest) are never paid for twice, while a
+batch that was exported but never submitted or imported is retried by the
+next export.
+
+import_batch_results() reads a provider's result JSONL, saves each raw
+response next to the batch and appends the extracted CSV pick blocks to
+data/bets/<sport>_bets_<model>.txt. Shard responses for the same sport/model
+are merged with merge_shard_responses(). Only then are the prompts recorded
+in the export log, using the content hashes the run's requests.json saved
+at export time; a response whose prompt was already imported from another
+run is skipped so its picks aren't appended twice.
+
+fake_batch_results() is a local stand-in for a provider: it turns a request
+JSONL into a result JSONL in that provider's format using any responder
+function, so the whole export -> import loop can be exercised offline.
+
+Usage:
+    python scripts/llm_batch.py export [run_id]
+    python scripts/llm_batch.py import <results.jsonl> [run_id]
+"""
+
+import datetime
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from llm_providers import get_model_config, parse_prompt_name, request_id
+from llm_response import PICK_HEADER, parse_pick_block, append_picks_csv
+from prompt_shards import merge_shard_responses
+
+
+PROMPTS_DIR = Path('./prompts')
+BATCH_DIR = Path('./data/llm_batches')
+PICKS_DIR = Path('./data/bets')
+EXPORT_LOG = BATCH_DIR / 'exported.json'
+RUN_MANIFEST = 'requests.json'
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_export_log(export_log: Path) -> dict:
+    if not Path(export_log).is_file():
+        return {}
+    with open(export_log, 'r') as f:
+        return json.load(f)
+
+
+def find_pending_prompts(prompts_dir: Path = PROMPTS_DIR, export_log: Path = EXPORT_LOG) -> list:
+    """
+    Lists prompts whose content changed since a response for them was last imported.
+
+    Args:
+        prompts_dir (Path): Directory holding the prompt files (and a shards/ subdirectory).
+        export_log (Path): JSON file mapping request ids to the last imported content hash.
+
+    Returns:
+        list: Dicts with request_id, sport, model, shard, path, prompt and hash.
+    """
+    exported = _load_export_log(export_log)
+    prompts_dir = Path(prompts_dir)
+
+    pending = []
+    for path in sorted(list(prompts_dir.glob('*_prompt_*.txt')) + list((prompts_dir / 'shards').glob('*_prompt_*.txt'))):
+        parsed = parse_prompt_name(path.stem)
+        if parsed is None:
+            continue
+        sport, model, shard = parsed
+        prompt = path.read_text(encoding='utf-8')
+        rid = request_id(sport, model, shard)
+        content_hash = _content_hash(prompt)
+        if exported.get(rid) == content_hash:
+            continue
+        pending.append({
+            'request_id': rid, 'sport': sport, 'model': model, 'shard': shard,
+            'path': str(path), 'prompt': prompt, 'hash': content_hash,
+        })
+
+    return pending
+
+
+def mark_exported(items: list, export_log: Path = EXPORT_LOG) -> None:
+    """Records the content hash of each sent prompt so it isn't picked up as pending again."""
+    exported = _load_export_log(export_log)
+    exported.update({item['request_id']: item['hash'] for item in items})
+    Path(export_log).parent.mkdir(parents=True, exist_ok=True)
+    with open(export_log, 'w') as f:
+        json.dump(exported, f, indent=2, sort_keys=True)
+
+
+def build_batch_request(custom_id: str, prompt: str, config: dict) -> dict:
+    """
+    Builds one batch request line in the wire format of the model's API.
+
+    Args:
+        custom_id (str): Our request id, echoed back in the results.
+        prompt (str): The prompt text.
+        config (dict): Output of get_model_config().
+
+    Returns:
+        dict: The request, ready to be written as a JSONL line.
+    """
+    params = config['params']
+    if config['api'] == 'anthropic':
+        return {
+            'custom_id': custom_id,
+            'params': {
+                'model': config['model'],
+                'max_tokens': params['max_tokens'],
+                'temperature': params['temperature'],
+                'messages': [{'role': 'user', 'content': prompt}],
+            },
+        }
+    if config['api'] == 'gemini':
+        return {
+            'key': custom_id,
+            'request': {
+                'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+                'generationConfig': {
+                    'maxOutputTokens': params['max_tokens'],
+                    'temperature': params['temperature'],
+                },
+            },
+        }
+    return {
+        'custom_id': custom_id,
+        'method': 'POST',
+        'url': '/v1/chat/completions',
+        'body': {
+            'model': config['model'],
+            'max_tokens': params['max_tokens'],
+            'temperature': params['temperature'],
+            'messages': [{'role': 'user', 'content': prompt}],
+        },
+    }
+
+
+def export_batch(run_id: str = None, prompts_dir: Path = PROMPTS_DIR,
+                 batch_dir: Path = BATCH_DIR, export_log: Path = EXPORT_LOG) -> dict:
+    """
+    Packages all pending prompts into per-provider batch JSONL files.
+
+    Files are written to <batch_dir>/<run_id>/<model>.jsonl, one file per
+    model since each provider batch only accepts a single model's endpoint,
+    plus <run_id>/requests.json with the content hash of every request. The
+    export log is left alone until the results are imported.
+
+    Args:
+        run_id (str, optional): Name of the run directory; defaults to a UTC timestamp.
+        prompts_dir (Path): Directory holding the prompt files.
+        batch_dir (Path): Root directory for batch runs.
+        export_log (Path): JSON file tracking the last imported hash per request id.
+
+    Returns:
+        dict: Mapping of model name to the JSONL file written for it.
+    """
+    run_id = run_id or datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    run_dir = Path(batch_dir) / run_id
+
+    pending = find_pending_prompts(prompts_dir, export_log)
+    if not pending:
+        print("No pending prompts to export.")
+        return {}
+
+    requests_by_model = {}
+    skipped = []
+    for item in pending:
+        try:
+            config = get_model_config(item['model'])
+        except ValueError as e:
+            skipped.append(item['request_id'])
+            print(f"Skipping {item['request_id']}: {e}")
+            continue
+        requests_by_model.setdefault(item['model'], []).append(
+            build_batch_request(item['request_id'], item['prompt'], config)
+        )
+
+    run_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for model, requests_list in requests_by_model.items():
+        path = run_dir / f'{model}.jsonl'
+        with open(path, 'w', encoding='utf-8') as f:
+            for request in requests_list:
+                f.write(json.dumps(request) + '\n')
+        written[model] = path
+        print(f"Wrote {len(requests_list)} requests for {model} to {path}")
+
+    with open(run_dir / RUN_MANIFEST, 'w') as f:
+        json.dump({item['request_id']: item['hash'] for item in pending if item['request_id'] not in skipped},
+                  f, indent=2, sort_keys=True)
+    return written
+
+
+def parse_batch_result(line: dict):
+    """
+    Reads one result line from any supported provider format.
+
+    Returns:
+        tuple: (custom_id, response_text, error). response_text is None when
+               the request failed, and error describes why.
+    """
+    # Anthropic Message Batches
+    if 'result' in line:
+        result = line['result']
+        if result.get('type') != 'succeeded':
+            return line.get('custom_id'), None, str(result.get('error') or result.get('type'))
+        text = ''.join(block.get('text', '') for block in result['message'].get('content', []))
+        return line.get('custom_id'), text, None
+
+    # Gemini batch (keyed requests)
+    if 'key' in line:
+        if line.get('error'):
+            return line['key'], None, str(line['error'])
+        candidates = line.get('response', {}).get('candidates', [])
+        parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+        return line['key'], ''.join(p.get('text', '') for p in parts), None
+
+    # OpenAI-compatible batch
+    response = line.get('response') or {}
+    if line.get('error') or response.get('status_code', 200) != 200:
+        return line.get('custom_id'), None, str(line.get('error') or response.get('body'))
+    choices = response.get('body', {}).get('choices', [])
+    text = choices[0].get('message', {}).get('content', '') if choices else ''
+    return line.get('custom_id'), text, None
+
+
+def apply_responses(responses: dict, response_dir: Path = None, picks_dir: Path = PICKS_DIR) -> pd.DataFrame:
+    """
+    Appends the picks from a set of model responses to the picks files.
+
+    Args:
+        responses (dict): Mapping of request id (e.g. 'nba__claude__03') to the
+                          response text, or to None if the request failed.
+        response_dir (Path, optional): If set, each raw response is saved there as <request_id>.txt.
+        picks_dir (Path): Directory holding the picks files.
+
+    Returns:
+        pd.DataFrame: One row per response with request_id, status and picks appended.
+    """
+    if response_dir is not None:
+        response_dir = Path(response_dir)
+        response_dir.mkdir(parents=True, exist_ok=True)
+
+    report = []
+    shard_responses = {}
+    for custom_id, text in responses.items():
+        parsed = parse_prompt_name(custom_id or '')
+        if parsed is None:
+            report.append({'request_id': custom_id, 'status': 'unknown id', 'picks': 0})
+            continue
+        if text is None:
+            report.append({'request_id': custom_id, 'status': 'error', 'picks': 0})
+            continue
+
+        if response_dir is not None:
+            (response_dir / f'{custom_id}.txt').write_text(text, encoding='utf-8')
+        sport, model, shard = parsed
+
+        if shard is not None:
+            shard_responses.setdefault((sport, model), []).append(text)
+            report.append({'request_id': custom_id, 'status': 'merged with shards', 'picks': None})
+            continue
+
+        df_picks = parse_pick_block(text)
+        if df_picks is None:
+            report.append({'request_id': custom_id, 'status': 'no CSV block', 'picks': 0})
+            continue
+        append_picks_csv(df_picks, Path(picks_dir) / f'{sport}_bets_{model}.txt')
+        report.append({'request_id': custom_id, 'status': 'ok', 'picks': len(df_picks)})
+
+    for (sport, model), texts in shard_responses.items():
+        merge_shard_responses(sport, model, texts, picks_dir)
+
+    return pd.DataFrame(report, columns=['request_id', 'status', 'picks'])
+
+
+def import_batch_results(results_file, run_id: str = None, batch_dir: Path = BATCH_DIR,
+                         picks_dir: Path = PICKS_DIR, export_log: Path = EXPORT_LOG) -> pd.DataFrame:
+    """
+    Maps a provider's batch results back to data/bets/<sport>_bets_<model>.txt.
+
+    Successful requests are then recorded in the export log so their prompts
+    are no longer pending.
+
+    Args:
+        results_file (str or Path): Result JSONL downloaded from the provider.
+        run_id (str, optional): Run directory to save raw responses under;
+                                defaults to the results file's directory name.
+        batch_dir (Path): Root directory for batch runs.
+        picks_dir (Path): Directory holding the picks files.
+        export_log (Path): JSON file tracking the last imported hash per request id.
+
+    Returns:
+        pd.DataFrame: One row per result with request_id, status and picks appended.
+    """
+    results_file = Path(results_file)
+    run_dir = Path(batch_dir) / (run_id or results_file.parent.name)
+    run_hashes = _load_export_log(run_dir / RUN_MANIFEST)
+    imported = _load_export_log(export_log)
+
+    responses = {}
+    with open(results_file, 'r', encoding='utf-8') as f:
+        for raw_line in f:
+            if not raw_line.strip():
+                continue
+            custom_id, text, error = parse_batch_result(json.loads(raw_line))
+            if text is None:
+                print(f"Batch request {custom_id} failed: {error}")
+            elif custom_id in run_hashes and imported.get(custom_id) == run_hashes[custom_id]:
+                print(f"Batch request {custom_id} was already imported. Skipping it.")
+                continue
+            responses[custom_id] = text
+
+    df_report = apply_responses(responses, run_dir / 'responses', picks_dir)
+    mark_exported([{'request_id': rid, 'hash': run_hashes[rid]} for rid, text in responses.items()
+                   if text is not None and rid in run_hashes], export_log)
+    print(f"Imported {len(df_report)} batch results from {results_file}")
+    print(df_report.to_string(index=False))
+    return df_report
+
+
+def fake_batch_results(requests_file, results_file, responder=None) -> Path:
+    """
+    Local stand-in for a provider batch endpoint.
+
+    Reads a request JSONL written by export_batch() and writes the matching
+    result JSONL in the same provider's format, answering every request with
+    responder(prompt). The default responder returns a reply with an empty
+    pick block (header only).
+
+    Args:
+        requests_file (str or Path): A <model>.jsonl written by export_batch().
+        results_file (str or Path): Where to write the fake results.
+        responder (callable, optional): Takes the prompt text and returns the reply text.
+
+    Returns:
+        Path: The results file.
+    """
+    responder = responder or (lambda prompt: f"No picks.\n\n```\n{PICK_HEADER}\n```\n")
+    results_file = Path(results_file)
+
+    with open(requests_file, 'r', encoding='utf-8') as f_in, open(results_file, 'w', encoding='utf-8') as f_out:
+        for raw_line in f_in:
+            request = json.loads(raw_line)
+            if 'params' in request:
+                text = responder(request['params']['messages'][0]['content'])
+                result = {'custom_id': request['custom_id'], 'result': {
+                    'type': 'succeeded',
+                    'message': {'role': 'assistant', 'content': [{'type': 'text', 'text': text}]},
+                }}
+            elif 'key' in request:
+                text = responder(request['request']['contents'][0]['parts'][0]['text'])
+                result = {'key': request['key'], 'response': {
+                    'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}}],
+                }}
+            else:
+                text = responder(request['body']['messages'][0]['content'])
+                result = {'custom_id': request['custom_id'], 'error': None, 'response': {
+                    'status_code': 200,
+                    'body': {'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}}]},
+                }}
+            f_out.write(json.dumps(result) + '\n')
+
+    return results_file
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    if command == 'export':
+        export_batch(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif command == 'import' and len(sys.argv) > 2:
+        import_batch_results(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        print(__doc__)
@@ -0,0 +1,142 @@
+"""
+On-disk cache of LLM responses, keyed by what was asked.
+
+The key is a hash of (provider, model id, prompt hash, generation parameters),
+so re-running a build with identical inputs, retrying after a downstream
+failure or replaying a backtest returns the stored completion instead of
+paying for it again. Entries are gzip-compressed files under data/llm_cache/
+with an index.json that tracks their size and last access; once the cache is
+over its size cap the least recently used entries are evicted.
+
+Set LLM_CACHE_BYPASS=1 (or pass bypass=True) to skip lookups. Fresh responses
+are still stored, so a bypassed run also refreshes the cache.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+CACHE_DIR = Path('./data/llm_cache')
+MAX_CACHE_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+def cache_key(provider: str, model: str, prompt: str, params: dict = None) -> str:
+    """
+    Builds the cache key for one completion request.
+
+    Args:
+        provider (str): The provider API and endpoint, e.g. 'anthropic:https://api.anthropic.com'.
+        model (str): The provider's model id.
+        prompt (str): The prompt text.
+        params (dict, optional): Generation parameters (max_tokens, temperature, ...).
+
+    Returns:
+        str: A hex digest identifying the request.
+    """
+    payload = json.dumps({
+        'provider': provider,
+        'model': model,
+        'prompt': prompt_hash(prompt),
+        'params': params or {},
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Gzip-compressed response store with LRU eviction under a size cap.
+
+    Args:
+        cache_dir (Path): Directory holding the entries and index.json.
+        max_bytes (int): Size cap for the compressed entries.
+        bypass (bool): Skip lookups (puts still happen). Defaults to the
+                       LLM_CACHE_BYPASS environment variable.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES, bypass: bool = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        if bypass is None:
+            bypass = os.environ.get('LLM_CACHE_BYPASS', '').lower() in ('1', 'true', 'yes')
+        self.bypass = bypass
+        self.index_path = self.cache_dir / 'index.json'
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        if not self.index_path.is_file():
+            return {}
+        with open(self.index_path, 'r') as f:
+            index = json.load(f)
+        # Drop entries whose files were removed by hand
+        return {k: v for k, v in index.items() if self._entry_path(k).is_file()}
+
+    def _save_index(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        tmp_path.replace(self.index_path)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f'{key}.txt.gz'
+
+    def get(self, key: str):
+        """Returns the cached response text, or None on a miss or when bypassed."""
+        if self.bypass:
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+            path = self._entry_path(key)
+            if entry is None or not path.is_file():
+                self.misses += 1
+                return None
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                text = f.read()
+            entry['last_access'] = time.time()
+            self.hits += 1
+            self._save_index()
+            return text
+
+    def put(self, key: str, text: str, **meta) -> None:
+        """Stores a response, then evicts least recently used entries if over the size cap."""
+        with self._lock:
+            path = self._entry_path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                f.write(text)
+            now = time.time()
+            self._index[key] = {'size': path.stat().st_size, 'created': now, 'last_access': now, **meta}
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)['size']
+            self._entry_path(key).unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        return sum(entry['size'] for entry in self._index.values())
+
+    def __len__(self):
+        return len(self._index)
+
+    def summary(self) -> str:
+        return (f"LLM cache: {len(self)} entries, {self.size_bytes() / 1024:.0f} KB, "
+                f"{self.hits} hits, {self.misses} misses{' (bypassed)' if self.bypass else ''}")
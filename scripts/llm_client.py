@@ -0,0 +1,397 @@
+"""
+Concurrent submission of prompts to the model APIs.
+
+Each provider API has a small adapter that builds the streaming request and
+pulls text out of its server-sent events:
+
+    anthropic  POST <base_url>/v1/messages                   (claude)
+    openai     POST <base_url>/chat/completions              (chatgpt, perplexity, grok, deepseek)
+    gemini     POST <base_url>/v1beta/models/<model>:streamGenerateContent?alt=sse
+
+submit_prompts() fans the requests out with asyncio. Every model gets its own
+semaphore (max requests in flight) and rate limiter (min seconds between
+request starts), set in PROVIDER_LIMITS. The blocking HTTP calls run in worker
+threads, and each response is streamed straight to
+data/llm_responses/<run_id>/<request_id>.txt as it arrives, so a dropped
+connection still leaves the partial text on disk.
+
+run_pending() is the full prompt -> picks loop: send every pending prompt
+(see llm_batch.find_pending_prompts) and append the returned pick blocks to
+data/bets/<sport>_bets_<model>.txt. Each stream is fed through a
+PickBlockExtractor as it arrives, so a prompt's picks are appended as soon as
+its stream ends; shard responses are merged once all of them are in.
+
+Completed responses go into the llm_cache response cache, so a prompt that was
+already answered with the same model and parameters returns instantly without
+touching the provider's limits. Pass --refresh (or set LLM_CACHE_BYPASS=1)
+to ignore cached responses.
+
+API keys are read from the environment variables named in llm_providers.
+Set LLM_BASE_URL to point every model at llm_mock_server.py for local runs.
+
+Usage:
+    python scripts/llm_client.py [run_id] [--refresh]
+"""
+
+import asyncio
+import datetime
+import email.utils
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+from llm_providers import get_model_config
+from llm_cache import ResponseCache, cache_key
+from llm_response import PickBlockExtractor, append_picks_csv
+from llm_batch import PROMPTS_DIR, PICKS_DIR, find_pending_prompts, mark_exported, apply_responses
+
+
+RESPONSE_DIR = Path('./data/llm_responses')
+SUBMIT_LOG = RESPONSE_DIR / 'submitted.json'
+
+# Per-model limits: requests in flight and minimum seconds between request starts
+PROVIDER_LIMITS = {
+    'claude': {'concurrency': 4, 'min_interval': 1.0},
+    'chatgpt': {'concurrency': 4, 'min_interval': 1.0},
+    'gemini': {'concurrency': 2, 'min_interval': 2.0},
+    'perplexity': {'concurrency': 2, 'min_interval': 2.0},
+    'grok': {'concurrency': 2, 'min_interval': 1.0},
+    'deepseek': {'concurrency': 2, 'min_interval': 1.0},
+}
+DEFAULT_LIMITS = {'concurrency': 1, 'min_interval': 2.0}
+
+RETRY_STATUS = {429, 500, 502, 503, 504, 529}
+
+
+def _anthropic_request(prompt: str, config: dict, api_key: str):
+    url = f"{config['base_url']}/v1/messages"
+    headers = {
+        'x-api-key': api_key,
+        'anthropic-version': '2023-06-01',
+        'content-type': 'application/json',
+    }
+    body = {
+        'model': config['model'],
+        'max_tokens': config['params']['max_tokens'],
+        'temperature': config['params']['temperature'],
+        'stream': True,
+        'messages': [{'role': 'user', 'content': prompt}],
+    }
+    return url, headers, body
+
+
+def _anthropic_text(event: dict) -> str:
+    if event.get('type') == 'content_block_delta':
+        return event.get('delta', {}).get('text', '')
+    return ''
+
+
+def _openai_request(prompt: str, config: dict, api_key: str):
+    url = f"{config['base_url']}/chat/completions"
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'content-type': 'application/json',
+    }
+    body = {
+        'model': config['model'],
+        'max_tokens': config['params']['max_tokens'],
+        'temperature': config['params']['temperature'],
+        'stream': True,
+        'messages': [{'role': 'user', 'content': prompt}],
+    }
+    return url, headers, body
+
+
+def _openai_text(event: dict) -> str:
+    choices = event.get('choices') or [{}]
+    return choices[0].get('delta', {}).get('content') or ''
+
+
+def _gemini_request(prompt: str, config: dict, api_key: str):
+    url = f"{config['base_url']}/v1beta/models/{config['model']}:streamGenerateContent?alt=sse"
+    headers = {
+        'x-goog-api-key': api_key,
+        'content-type': 'application/json',
+    }
+    body = {
+        'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+        'generationConfig': {
+            'maxOutputTokens': config['params']['max_tokens'],
+            'temperature': config['params']['temperature'],
+        },
+    }
+    return url, headers, body
+
+
+def _gemini_text(event: dict) -> str:
+    candidates = event.get('candidates') or [{}]
+    parts = candidates[0].get('content', {}).get('parts', [])
+    return ''.join(p.get('text', '') for p in parts)
+
+
+ADAPTERS = {
+    'anthropic': (_anthropic_request, _anthropic_text),
+    'openai': (_openai_request, _openai_text),
+    'gemini': (_gemini_request, _gemini_text),
+}
+
+
+def iter_sse_data(response):
+    """Yields the decoded JSON payload of every 'data:' line in a server-sent event stream."""
+    for raw_line in response.iter_lines(decode_unicode=True):
+        if not raw_line or not raw_line.startswith('data:'):
+            continue
+        data = raw_line[len('data:'):].strip()
+        if data == '[DONE]':
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+def completion_cache_key(model_name: str, prompt: str) -> str:
+    """Cache key for sending this prompt to one of our models with its current settings."""
+    config = get_model_config(model_name)
+    return cache_key(f"{config['api']}:{config['base_url']}", config['model'], prompt, config['params'])
+
+
+def retry_delay(retry_after: str, default: float) -> float:
+    """
+    Seconds to wait before retrying, from a Retry-After header value.
+
+    The header is either a number of seconds or an HTTP-date; a missing or
+    unparseable value falls back to the default backoff.
+    """
+    if retry_after is None:
+        return default
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def stream_completion(model_name: str, prompt: str, on_text=None, session=None,
+                      timeout: float = 600, retries: int = 2, cache: ResponseCache = None) -> str:
+    """
+    Sends one prompt to a model and streams back the response text.
+
+    Args:
+        model_name (str): One of our model names, e.g. 'claude'.
+        prompt (str): The prompt text.
+        on_text (callable, optional): Called with each text chunk as it arrives.
+        session (requests.Session, optional): Session to reuse connections with.
+        timeout (float): Seconds to wait for the connection and between chunks.
+        retries (int): Extra attempts after a rate-limit or server error.
+        cache (ResponseCache, optional): Return a cached response if there is one,
+                                         and store the new response otherwise.
+
+    Returns:
+        str: The full response text.
+
+    Raises:
+        ValueError: If the model isn't configured or its API key is not set.
+        requests.HTTPError: If the request still fails after the retries.
+    """
+    config = get_model_config(model_name)
+    key = completion_cache_key(model_name, prompt) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            if on_text is not None:
+                on_text(cached)
+            return cached
+
+    api_key = os.environ.get(config['api_key_env'])
+    if not api_key:
+        raise ValueError(f"{config['api_key_env']} is not set; cannot call {model_name}.")
+
+    build_request, extract_text = ADAPTERS[config['api']]
+    url, headers, body = build_request(prompt, config, api_key)
+    session = session or requests.Session()
+
+    for attempt in range(retries + 1):
+        with session.post(url, headers=headers, json=body, stream=True, timeout=timeout) as response:
+            if response.status_code in RETRY_STATUS and attempt < retries:
+                wait = retry_delay(response.headers.get('retry-after'), 2 ** (attempt + 1))
+                print(f"{model_name}: HTTP {response.status_code}, retrying in {wait:.0f}s")
+                time.sleep(wait)
+                continue
+            response.raise_for_status()
+
+            chunks = []
+            for event in iter_sse_data(response):
+                text = extract_text(event)
+                if text:
+                    chunks.append(text)
+                    if on_text is not None:
+                        on_text(text)
+            text = ''.join(chunks)
+            break
+
+    if cache is not None and text:
+        cache.put(key, text, model_name=model_name)
+    return text
+
+
+class RateLimiter:
+    """Spaces out request starts so they are at least min_interval seconds apart."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = max(now, self._next_start) + self.min_interval
+
+
+def _append_streamed_picks(job: dict, extractor: PickBlockExtractor, picks_dir: Path):
+    extractor.close()
+    for line, reason in extractor.rejected:
+        print(f"{job['request_id']}: rejected pick row ({reason}): {line[:80]}")
+    if extractor.header is None:
+        print(f"{job['request_id']}: no CSV pick block in the response")
+        return
+    picks_file = Path(picks_dir) / f"{job['sport']}_bets_{job['model']}.txt"
+    append_picks_csv(extractor.to_frame(), picks_file)
+    print(f"{job['request_id']}: appended {len(extractor.rows)} picks to {picks_file}")
+
+
+async def submit_prompts(jobs: list, response_dir: Path, limits: dict = None,
+                         cache: ResponseCache = None, picks_dir: Path = None) -> dict:
+    """
+    Sends many prompts concurrently, respecting each model's limits.
+
+    Args:
+        jobs (list): Dicts with 'request_id', 'model' and 'prompt'.
+        response_dir (Path): Directory the responses are streamed into.
+        limits (dict, optional): Per-model limits; defaults to PROVIDER_LIMITS.
+        cache (ResponseCache, optional): Response cache; hits skip the limits entirely.
+        picks_dir (Path, optional): If set, the picks from every non-shard job
+                                    (jobs with 'sport' and shard None) are appended
+                                    to the picks files as soon as its stream ends.
+
+    Returns:
+        dict: Mapping of request_id to response text (None if the request failed).
+    """
+    limits = limits or PROVIDER_LIMITS
+    response_dir = Path(response_dir)
+    response_dir.mkdir(parents=True, exist_ok=True)
+
+    models = {job['model'] for job in jobs}
+    semaphores = {m: asyncio.Semaphore(limits.get(m, DEFAULT_LIMITS)['concurrency']) for m in models}
+    limiters = {m: RateLimiter(limits.get(m, DEFAULT_LIMITS)['min_interval']) for m in models}
+    sessions = {m: requests.Session() for m in models}
+
+    async def run_job(job):
+        path = response_dir / f"{job['request_id']}.txt"
+        extractor = PickBlockExtractor()
+        stream_picks = picks_dir is not None and job.get('shard') is None
+        if cache is not None:
+            cached = cache.get(completion_cache_key(job['model'], job['prompt']))
+            if cached is not None:
+                path.write_text(cached, encoding='utf-8')
+                print(f"{job['request_id']}: cached")
+                if stream_picks:
+                    extractor.feed(cached)
+                    _append_streamed_picks(job, extractor, picks_dir)
+                return job['request_id'], cached
+
+        async with semaphores[job['model']]:
+            await limiters[job['model']].wait()
+            start = time.perf_counter()
+            try:
+                with open(path, 'w', encoding='utf-8') as f:
+                    def on_text(chunk):
+                        f.write(chunk)
+                        f.flush()
+                        extractor.feed(chunk)
+                    text = await asyncio.to_thread(
+                        stream_completion, job['model'], job['prompt'], on_text, sessions[job['model']]
+                    )
+            except (requests.RequestException, ValueError) as e:
+                if path.stat().st_size == 0:
+                    path.unlink()
+                print(f"{job['request_id']}: failed after {time.perf_counter() - start:.1f}s: {e}")
+                return job['request_id'], None
+            if cache is not None and text:
+                cache.put(completion_cache_key(job['model'], job['prompt']), text, model_name=job['model'])
+            print(f"{job['request_id']}: {len(text)} chars in {time.perf_counter() - start:.1f}s")
+            if stream_picks:
+                _append_streamed_picks(job, extractor, picks_dir)
+            return job['request_id'], text
+
+    results = await asyncio.gather(*(run_job(job) for job in jobs))
+    for session in sessions.values():
+        session.close()
+    return dict(results)
+
+
+def run_pending(run_id: str = None, models: list = None, prompts_dir: Path = PROMPTS_DIR,
+                response_root: Path = RESPONSE_DIR, picks_dir: Path = PICKS_DIR,
+                submit_log: Path = SUBMIT_LOG, use_cache: bool = True, bypass_cache: bool = None):
+    """
+    Sends every pending prompt to its model and appends the returned picks.
+
+    Prompts whose content hasn't changed since they were last sent successfully
+    are skipped. Failed requests stay pending and are retried on the next run.
+
+    Args:
+        run_id (str, optional): Name of the response directory; defaults to a UTC timestamp.
+        models (list, optional): Only send prompts for these model names.
+        prompts_dir (Path): Directory holding the prompt files.
+        response_root (Path): Root directory for streamed responses.
+        picks_dir (Path): Directory holding the picks files.
+        submit_log (Path): JSON file tracking the last sent hash per request id.
+        use_cache (bool): Look up and store responses in the response cache.
+        bypass_cache (bool, optional): Ignore cached responses but still store new ones;
+                                       defaults to LLM_CACHE_BYPASS.
+
+    Returns:
+        dict: Mapping of request_id to response text (None if the request failed),
+              or None if nothing was pending.
+    """
+    run_id = run_id or datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    pending = find_pending_prompts(prompts_dir, submit_log)
+    if models:
+        pending = [item for item in pending if item['model'] in models]
+    if not pending:
+        print("No pending prompts to submit.")
+        return None
+
+    print(f"Submitting {len(pending)} prompts for run {run_id}...")
+    cache = ResponseCache(bypass=bypass_cache) if use_cache else None
+    responses = asyncio.run(submit_prompts(pending, Path(response_root) / run_id, cache=cache, picks_dir=picks_dir))
+    if cache is not None:
+        print(cache.summary())
+
+    mark_exported([item for item in pending if responses.get(item['request_id']) is not None], submit_log)
+
+    # Single-prompt picks were appended as their streams ended; shards are merged here
+    shard_ids = {item['request_id'] for item in pending if item['shard'] is not None}
+    df_report = apply_responses({k: v for k, v in responses.items() if k in shard_ids}, None, picks_dir)
+    if not df_report.empty:
+        print(df_report.to_string(index=False))
+    return responses
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    run_pending(args[0] if args else None, bypass_cache=True if '--refresh' in sys.argv else None)
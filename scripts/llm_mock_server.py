@@ -0,0 +1,131 @@
+"""
+Local stand-in for the model APIs, for exercising llm_client without keys or cost.
+
+Serves the three streaming endpoints llm_client talks to (Anthropic messages,
+OpenAI-style chat completions, Gemini streamGenerateContent) and answers every
+request with a server-sent event stream in that API's format. The reply text
+comes from a responder function; the default one returns a short table and an
+empty pick CSV block. Responses are streamed in small chunks with an optional
+delay so concurrency and streaming capture can be observed, and the first
+rate_limited requests can be answered with HTTP 429 and a Retry-After header
+to exercise the client's retries.
+
+Usage:
+    python scripts/llm_mock_server.py [port]
+    LLM_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=x ... python scripts/llm_client.py
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_response import PICK_HEADER
+
+
+def default_responder(prompt: str) -> str:
+    return f"Mock response for a {len(prompt)} character prompt.\n\n```\n{PICK_HEADER}\n```\n"
+
+
+def _prompt_from_body(body: dict) -> str:
+    if 'contents' in body:
+        return ''.join(p.get('text', '') for p in body['contents'][0]['parts'])
+    return body['messages'][-1]['content']
+
+
+def _sse_events(path: str, text: str, chunk_size: int):
+    """Splits the reply into the event payloads the given endpoint would stream."""
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or ['']
+
+    if path.endswith('/v1/messages'):
+        yield {'type': 'message_start', 'message': {'role': 'assistant', 'content': []}}
+        yield {'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}}
+        for chunk in chunks:
+            yield {'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': chunk}}
+        yield {'type': 'content_block_stop', 'index': 0}
+        yield {'type': 'message_stop'}
+    elif 'streamGenerateContent' in path:
+        for chunk in chunks:
+            yield {'candidates': [{'content': {'role': 'model', 'parts': [{'text': chunk}]}}]}
+    else:
+        for chunk in chunks:
+            yield {'choices': [{'index': 0, 'delta': {'content': chunk}}]}
+        yield '[DONE]'
+
+
+def make_handler(responder=None, chunk_size: int = 64, chunk_delay: float = 0.0,
+                 rate_limited: int = 0, retry_after: str = '0'):
+    responder = responder or default_responder
+    lock = threading.Lock()
+    throttled = [0]
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('content-length', 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+                text = responder(_prompt_from_body(body))
+            except (ValueError, KeyError, IndexError):
+                self.send_response(400)
+                self.send_header('content-length', '0')
+                self.end_headers()
+                return
+
+            with lock:
+                throttle = throttled[0] < rate_limited
+                throttled[0] += throttle
+            if throttle:
+                self.send_response(429)
+                self.send_header('retry-after', retry_after)
+                self.send_header('content-length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('content-type', 'text/event-stream')
+            self.send_header('connection', 'close')
+            self.end_headers()
+            for event in _sse_events(self.path.split('?')[0], text, chunk_size):
+                data = event if isinstance(event, str) else json.dumps(event)
+                self.wfile.write(f'data: {data}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+                if chunk_delay:
+                    time.sleep(chunk_delay)
+            self.close_connection = True
+
+    return MockHandler
+
+
+def start_mock_server(port: int = 0, responder=None, chunk_size: int = 64, chunk_delay: float = 0.0,
+                      rate_limited: int = 0, retry_after: str = '0'):
+    """
+    Starts the mock server in a background thread.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one.
+        responder (callable, optional): Takes the prompt text and returns the reply text.
+        chunk_size (int): Characters per streamed event.
+        chunk_delay (float): Seconds to sleep between events.
+        rate_limited (int): Answer this many requests with HTTP 429 first.
+        retry_after (str): Retry-After header of those responses (seconds or an HTTP-date).
+
+    Returns:
+        tuple: (server, base_url). Call server.shutdown() to stop it.
+    """
+    handler = make_handler(responder, chunk_size, chunk_delay, rate_limited, retry_after)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(chunk_delay=0.01))
+    print(f"Mock LLM server listening on http://127.0.0.1:{port}")
+    server.serve_forever()
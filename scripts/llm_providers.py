@@ -0,0 +1,122 @@
+"""
+Provider settings for every model we generate prompts for.
+
+MODEL_CONFIG maps our model names (the suffix in prompts/<sport>_prompt_<model>.txt
+and data/bets/<sport>_bets_<model>.txt) to the provider API that serves it,
+the provider's model id, the environment variable holding the API key and
+default generation parameters. Model ids can be overridden with
+LLM_MODEL_<NAME> environment variables (e.g. LLM_MODEL_CLAUDE), and base URLs
+with LLM_BASE_URL_<NAME> or LLM_BASE_URL for every model at once (e.g. to
+point everything at llm_mock_server.py).
+
+For 'openai' models base_url already includes the version prefix, so the chat
+endpoint is always <base_url>/chat/completions.
+"""
+
+import os
+
+
+# API wire formats: 'anthropic' (Messages API), 'openai' (Chat Completions,
+# also used by xAI, DeepSeek and Perplexity) and 'gemini' (generateContent).
+MODEL_CONFIG = {
+    'claude': {
+        'api': 'anthropic',
+        'model': 'claude-sonnet-4-5',
+        'base_url': 'https://api.anthropic.com',
+        'api_key_env': 'ANTHROPIC_API_KEY',
+    },
+    'chatgpt': {
+        'api': 'openai',
+        'model': 'gpt-4.1',
+        'base_url': 'https://api.openai.com/v1',
+        'api_key_env': 'OPENAI_API_KEY',
+    },
+    'gemini': {
+        'api': 'gemini',
+        'model': 'gemini-2.5-pro',
+        'base_url': 'https://generativelanguage.googleapis.com',
+        'api_key_env': 'GEMINI_API_KEY',
+    },
+    'perplexity': {
+        'api': 'openai',
+        'model': 'sonar-pro',
+        'base_url': 'https://api.perplexity.ai',
+        'api_key_env': 'PERPLEXITY_API_KEY',
+    },
+    'grok': {
+        'api': 'openai',
+        'model': 'grok-4',
+        'base_url': 'https://api.x.ai/v1',
+        'api_key_env': 'XAI_API_KEY',
+    },
+    'deepseek': {
+        'api': 'openai',
+        'model': 'deepseek-chat',
+        'base_url': 'https://api.deepseek.com',
+        'api_key_env': 'DEEPSEEK_API_KEY',
+    },
+}
+
+DEFAULT_PARAMS = {
+    'max_tokens': 8000,
+    'temperature': 0.2,
+}
+
+
+def get_model_config(model_name: str) -> dict:
+    """
+    Returns the provider settings for one of our model names.
+
+    Args:
+        model_name (str): e.g. 'claude', 'chatgpt', 'gemini'.
+
+    Returns:
+        dict: A copy of MODEL_CONFIG[model_name] with the model id and base URL
+              overrides applied and the default parameters filled in under 'params'.
+
+    Raises:
+        ValueError: If the model name is not configured.
+    """
+    if model_name not in MODEL_CONFIG:
+        raise ValueError(f"Model '{model_name}' is not configured. Available: {sorted(MODEL_CONFIG)}")
+
+    config = dict(MODEL_CONFIG[model_name])
+    config['model'] = os.environ.get(f'LLM_MODEL_{model_name.upper()}', config['model'])
+    config['base_url'] = os.environ.get(
+        f'LLM_BASE_URL_{model_name.upper()}', os.environ.get('LLM_BASE_URL', config['base_url'])
+    ).rstrip('/')
+    config['params'] = dict(DEFAULT_PARAMS)
+    return config
+
+
+def parse_prompt_name(name: str):
+    """
+    Splits a prompt file stem or request id into (sport, model, shard).
+
+    'nba_prompt_claude' -> ('nba', 'claude', None)
+    'nba_prompt_claude_03' -> ('nba', 'claude', 3)
+    'nba__claude__03' -> ('nba', 'claude', 3)
+
+    Returns:
+        tuple: (sport, model, shard) or None if the name doesn't match either form.
+    """
+    if '__' in name:
+        parts = name.split('__')
+    elif '_prompt_' in name:
+        sport, rest = name.split('_prompt_', 1)
+        parts = [sport] + rest.split('_')
+    else:
+        return None
+
+    if len(parts) == 2:
+        return parts[0], parts[1], None
+    if len(parts) == 3 and parts[2].isdigit():
+        return parts[0], parts[1], int(parts[2])
+    return None
+
+
+def request_id(sport: str, model: str, shard: int = None) -> str:
+    """Builds the request id used in batch files and caches, e.g. 'nba__claude__03'."""
+    if shard is None:
+        return f'{sport}__{model}'
+    return f'{sport}__{model}__{shard:02d}'
@@ -0,0 +1,245 @@
+"""
+Helpers for pulling the CSV pick block out of a raw LLM response.
+
+Every prompt asks the model for a human-readable table followed by a CSV
+block with the PICK_COLUMNS header. PickBlockExtractor consumes a response
+incrementally (chunk by chunk as it streams in), finds that block, fenced or
+not, and turns each line into a clean row: invisible characters and curly
+quotes are removed, a reason with unquoted commas is stitched back together,
+and rows whose rank, odds or units aren't numbers are rejected.
+extract_csv_block() and parse_pick_block() run it over a complete response.
+"""
+
+import csv
+import io
+import re
+from pathlib import Path
+
+import pandas as pd
+
+
+PICK_COLUMNS = [
+    'rank', 'game_id', 'start_time', 'match', 'pick', 'odds', 'units', 'confidence_pct',
+    'reason', 'predicted_score', 'bet_home_spread', 'bet_home_ml', 'bet_away_spread',
+    'bet_away_ml', 'bet_over', 'bet_under', 'home_money_line', 'away_money_line',
+    'tie_money_line', 'total_score', 'over_odds', 'under_odds', 'home_spread',
+    'home_spread_odds', 'away_spread', 'away_spread_odds', 'timestamp',
+]
+
+PICK_HEADER = ','.join(PICK_COLUMNS)
+
+# Zero-width spaces/joiners and byte-order marks that models sometimes emit
+INVISIBLE_CHARS = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+
+# Curly quotes break CSV quoting, so map them to plain ones
+QUOTE_TRANSLATION = str.maketrans({'\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'"})
+
+# Rows missing a number in these columns are rejected
+REQUIRED_NUMERIC_COLUMNS = ['rank', 'odds', 'units']
+
+NUMERIC_COLUMNS = [
+    'rank', 'odds', 'units', 'confidence_pct', 'home_money_line', 'away_money_line',
+    'tie_money_line', 'total_score', 'over_odds', 'under_odds', 'home_spread',
+    'home_spread_odds', 'away_spread', 'away_spread_odds',
+]
+
+FLAG_COLUMNS = ['bet_home_spread', 'bet_home_ml', 'bet_away_spread', 'bet_away_ml', 'bet_over', 'bet_under']
+
+
+def _normalize_header(line: str) -> str:
+    return INVISIBLE_CHARS.sub('', line).strip().strip('`').replace(' ', '').lower()
+
+
+def is_pick_header(line: str) -> bool:
+    """Returns True if the line is the pick CSV header (ignoring spaces and invisible characters)."""
+    return _normalize_header(line).startswith('rank,game_id,')
+
+
+def _clean_line(line: str) -> str:
+    return INVISIBLE_CHARS.sub('', line).translate(QUOTE_TRANSLATION).strip()
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def rejoin_reason(fields: list, header: list) -> list:
+    """
+    Folds the extra fields of a row split by unquoted commas in the free-text
+    reason back into the reason, joined with ', '.
+
+    Returns:
+        list: The repaired fields, or fields unchanged if the row isn't too
+              long or the header has no reason column.
+    """
+    if 'reason' not in header or len(fields) <= len(header):
+        return fields
+    i = header.index('reason')
+    extra = len(fields) - len(header)
+    reason = ', '.join(f.strip() for f in fields[i:i + extra + 1])
+    return fields[:i] + [reason] + fields[i + extra + 1:]
+
+
+class PickBlockExtractor:
+    """
+    Incremental parser for the pick CSV block in a streamed LLM response.
+
+    Call feed() with each chunk of text as it arrives and close() at the end of
+    the stream. The block starts at the first header line that begins with
+    'rank,game_id,' and runs until a code fence, a blank line or a line
+    without commas; a later header starts a new block and repeated header
+    lines are dropped.
+
+    Attributes:
+        header (list): The column names from the model's header line, or None.
+        rows (list): Accepted rows, each a list of strings aligned to header.
+        rejected (list): (line, reason) pairs for rows that were dropped.
+    """
+
+    def __init__(self):
+        self.header = None
+        self.rows = []
+        self.rejected = []
+        self._buffer = ''
+        self._in_block = False
+
+    def feed(self, chunk: str) -> int:
+        """Consumes a chunk of the response. Returns the number of rows accepted from it."""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        before = len(self.rows)
+        for line in lines:
+            self._process_line(line)
+        return len(self.rows) - before
+
+    def close(self) -> 'PickBlockExtractor':
+        """Processes any text left after the last newline. Returns self."""
+        if self._buffer:
+            self._process_line(self._buffer)
+            self._buffer = ''
+        self._in_block = False
+        return self
+
+    def _process_line(self, line: str):
+        if is_pick_header(line):
+            if self.header is None:
+                self.header = [c.strip() for c in next(csv.reader([_clean_line(line).strip('`')]))]
+            self._in_block = True
+            return
+        if not self._in_block:
+            return
+        stripped = _clean_line(line)
+        if not stripped or stripped.startswith('```') or ',' not in stripped:
+            self._in_block = False
+            return
+        self._add_row(stripped)
+
+    def _add_row(self, line: str):
+        fields = [f.strip() for f in next(csv.reader([line], skipinitialspace=True))]
+        n_cols = len(self.header)
+
+        fields = rejoin_reason(fields, self.header)
+        if len(fields) > n_cols:
+            self.rejected.append((line, f'{len(fields)} fields for {n_cols} columns'))
+            return
+        fields += [''] * (n_cols - len(fields))
+
+        row = dict(zip(self.header, fields))
+        for col in NUMERIC_COLUMNS:
+            if col in row:
+                row[col] = row[col].lstrip('+')
+        bad = [c for c in REQUIRED_NUMERIC_COLUMNS if c in row and not _is_number(row[c])]
+        if bad:
+            self.rejected.append((line, f"non-numeric {', '.join(bad)}"))
+            return
+        self.rows.append([row[c] for c in self.header])
+
+    def csv_text(self) -> str:
+        """Returns the accepted rows as CSV text with the header, or '' if no block was found."""
+        if self.header is None:
+            return ''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(self.header)
+        writer.writerows(self.rows)
+        return buffer.getvalue()
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the accepted rows as a DataFrame with the PICK_COLUMNS columns.
+
+        Values stay strings so they are written back exactly as the model gave
+        them, but numeric columns are checked and flag columns are normalized
+        to '0'/'1'.
+        """
+        df = pd.DataFrame(self.rows, columns=self.header or PICK_COLUMNS, dtype=str)
+        df = df.reindex(columns=PICK_COLUMNS, fill_value='')
+        for col in FLAG_COLUMNS:
+            df[col] = df[col].str.lower().map({'1': '1', 'true': '1', 'yes': '1',
+                                               '0': '0', 'false': '0', 'no': '0', '': ''}).fillna(df[col])
+        return df
+
+
+def extract_csv_block(text: str) -> str:
+    """
+    Extracts the pick CSV block from a full LLM response.
+
+    Args:
+        text (str): The raw response text.
+
+    Returns:
+        str: The CSV text (header plus rows), or '' if no block was found.
+    """
+    extractor = PickBlockExtractor()
+    extractor.feed(text)
+    return extractor.close().csv_text()
+
+
+def parse_pick_block(text: str):
+    """
+    Parses the pick CSV block from a full LLM response into a DataFrame.
+
+    Rejected rows are reported with a warning.
+
+    Args:
+        text (str): The raw response text.
+
+    Returns:
+        pd.DataFrame: The picks with the PICK_COLUMNS columns, or None if no block was found.
+    """
+    extractor = PickBlockExtractor()
+    extractor.feed(text)
+    extractor.close()
+    for line, reason in extractor.rejected:
+        print(f"Warning: rejected pick row ({reason}): {line[:80]}")
+    if extractor.header is None:
+        return None
+    return extractor.to_frame()
+
+
+def append_picks_csv(df_picks: pd.DataFrame, picks_file) -> None:
+    """
+    Appends picks to a data/bets/<sport>_bets_<model>.txt file.
+
+    The header is written only when the file is new, and a missing trailing
+    newline in an existing file is fixed first so rows never run together.
+
+    Args:
+        df_picks (pd.DataFrame): Picks with the PICK_COLUMNS columns.
+        picks_file (str or Path): The picks file to append to.
+    """
+    picks_file = Path(picks_file)
+    picks_file.parent.mkdir(parents=True, exist_ok=True)
+    file_exists = picks_file.is_file() and picks_file.stat().st_size > 0
+
+    if file_exists:
+        with open(picks_file, 'rb+') as f:
+            f.seek(-1, 2)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    df_picks.reindex(columns=PICK_COLUMNS).to_csv(picks_file, mode='a', header=not file_exists, index=False)
@@ -1,7 +1,5 @@
 import pandas as pd
 import datetime
-from pathlib import Path
-import os
 
 ## only  need these to reload utils
 # import importlib
@@ -11,7 +9,7 @@ import os
 # importlib.reload(utils)
 
 
-from utils import get_todays_games, filter_data_on_change, aggregate_betting_data, get_complete_game_results, process_and_save_evaluated_bets
+from utils import get_todays_games, filter_data_on_change, aggregate_betting_data, evaluate_sport_bets
 
 HEADERS = {
     'Authority': 'api.actionnetwork',
@@ -357,141 +355,7 @@ Here is the historical dataset of your betting advice and results:
 
 
 
-def process_results(model_name: str, picks_dir: Path, results_csv_path: Path, sport: str):
-    """
-    Processes betting picks for a given model against a game results CSV.
-    
-    It finds missing game results, fetches them from an API, appends them
-    to the main results CSV, and then evaluates all picks.
-    """
-    # sport = 'ncaab'
-    
-    # === 1. Load Picks File ===
-    picks_file = picks_dir / f'{sport}_bets_{model_name}.txt'
-    try:
-        df_picks = pd.read_csv(picks_file)
-    except FileNotFoundError:
-        print(f"Error: Picks file not found at {picks_file}")
-        return None # Exit function
-
-    # Clean column names to remove invisible Unicode characters (e.g., zero-width spaces)
-    df_picks.columns = df_picks.columns.str.strip().str.replace('\u200b', '').str.replace('\ufeff', '')
-    
-    print('Picks file loaded: a total of ', len(df_picks), 'picks')
-    # === 2. Filter duplicate header rows ===
-    # Remove rows where 'start_time' column contains the literal string 'start_time'
-    if 'start_time' in df_picks.columns:
-        df_picks = df_picks[df_picks['start_time'] != 'start_time'].reset_index(drop=True)
-    
-    # === 3. Convert numeric columns to proper types ===
-    numeric_columns = [
-        'game_id', 'rank', 'odds', 'units', 'confidence_pct',
-        'bet_home_spread', 'bet_home_ml', 'bet_away_spread', 'bet_away_ml', 
-        'bet_over', 'bet_under',
-        'home_money_line', 'away_money_line', 'total_score',
-        'over_odds', 'under_odds', 'home_spread', 'home_spread_odds',
-        'away_spread', 'away_spread_odds'
-    ]
-    
-    for col in numeric_columns:
-        if col in df_picks.columns:
-            df_picks[col] = pd.to_numeric(df_picks[col], errors='coerce')
-    
-    # Ensure game_id is Int64 for merging
-    if 'game_id' in df_picks.columns:
-        df_picks['game_id'] = df_picks['game_id'].astype('Int64')
-
-    # === 4. Process Pick Timestamps ===
-    df_picks = df_picks.rename(columns={'timestamp\u200b': 'timestamp'})
-    df_picks['timestamp'] = df_picks['timestamp'].str.replace('\u200b', '')
-    df_picks['timestamp'] = pd.to_datetime(df_picks['timestamp'], format='mixed', errors='coerce')
-    df_picks['start_time_pt'] = (
-        pd.to_datetime(df_picks['start_time'], format='mixed', utc=True, errors='coerce')
-        .dt.tz_convert('America/Los_Angeles')
-    )
-    df_picks['date'] = df_picks['start_time_pt'].dt.date
-    df_picks['model'] = model_name
-
-    # === 3. Load Existing Game Results ===
-    # Check if the file exists *before* trying to read it.
-    # This is key for knowing whether to write the header later.
-    results_file_exists = results_csv_path.is_file()
-    
-    try:
-        df_old_results = pd.read_csv(results_csv_path)
-    except FileNotFoundError:
-        print(f"Results file {results_csv_path} not found. A new one will be created.")
-        df_old_results = pd.DataFrame() # Start with an empty DataFrame
-        df_old_results['game_id'] = []
-        df_old_results['status'] = []
-
-    # === 4. Find Missing Results ===
-    # display(df_picks.sample(3))
-
-    df_merge = pd.merge(
-        df_picks[['rank', 'game_id', 'match', 'date', 'start_time', 'pick']],
-        df_old_results,
-        on='game_id',
-        how='left',
-        suffixes=('_pick', '_result')
-    )
-    missing_games = df_merge.loc[df_merge['status'] != 'complete']
-
-    # === 5. Fetch and Append New Results (if any) ===
-    df_new_results = pd.DataFrame() # Initialize as empty
-
-    if not missing_games.empty:
-        date_str_list = missing_games['date'].astype(str).str.replace('-', '').unique().tolist()
-        
-        if date_str_list:
-            print(f"Found missing results for {len(date_str_list)} dates. Fetching...")
-            df_new_results = get_complete_game_results(sport, date_str_list, HEADERS)
-            
-            if not df_new_results.empty:
-                print(f"Appending {len(df_new_results)} new results to {results_csv_path}")
-                # Append new data
-                df_new_results.to_csv(
-                    results_csv_path,
-                    mode='a',
-                    # Write header ONLY if the file didn't exist before
-                    header=not results_file_exists, 
-                    index=False
-                )
-            else:
-                print("API call returned no new results.")
-    else:
-        print("No missing game results found. All picks are up-to-date.")
-
-    # === 6. Combine All Results for Final Processing ===
-    # *** THIS IS THE MAIN LOGIC FIX ***
-    # Combine the old results and the brand-newly fetched results
-    df_all_results = pd.concat([df_old_results, df_new_results], ignore_index=True)
-
-    # Drop duplicates in case the API sent a game we already had
-    if 'game_id' in df_all_results.columns and not df_all_results.empty:
-        df_all_results = df_all_results.drop_duplicates(subset='game_id', keep='last')
-
-    # === 7. Process and Save Evaluations ===
-    # Pass the *complete* set of results (old + new)
-    df_evaluated, df_evaluated_hist = process_and_save_evaluated_bets(
-        df_picks, 
-        df_all_results, 
-        sport
-    )
-
-    if 'date' in df_evaluated_hist.columns:
-        df_evaluated_hist['date'] = pd.to_datetime(df_evaluated_hist['date'])
-    else:
-        print("Warning: 'df_evaluated_hist' has no 'date' column to convert.")
-
-    return df_evaluated_hist
-
-
 model_list = ['claude','perplexity','gemini','chatgpt']
 
-for model_name in model_list:
-    sport = 'nba'
-    base_dir = Path('./data/bets')
-    results_file = Path('./data/evaluated/nba_game_results.csv')
-    print('Processing results for model: ', model_name)
-    df_evaluated_hist = process_results(model_name, base_dir, results_file, sport)
\ No newline at end of file
+# All models are evaluated together: one results fetch, one write per table
+df_leaderboard = evaluate_sport_bets('nba', model_list, HEADERS)
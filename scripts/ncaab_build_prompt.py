@@ -1,5 +1,6 @@
 import pandas as pd
 import datetime
+import time
 from pathlib import Path
 import os
 
@@ -10,149 +11,21 @@ import os
 # # After making changes to your_module_name.py, run this cell
 # importlib.reload(utils)
 
-from utils import get_todays_games, filter_data_on_change, aggregate_betting_data, get_complete_game_results, process_and_save_evaluated_bets
+from utils import get_todays_games, filter_data_on_change, aggregate_betting_data
+from prompt_manifest import record_prompt_manifest, record_prompt_unchanged, check_prompt_fingerprint, prompt_fingerprint, lines_fingerprint, frame_fingerprint, file_fingerprint, text_fingerprint
+from calibration import calibration_file, compact_calibration, load_calibration
+from prompt_format import compact_dataset_csv
+from prompt_shards import write_prompt_shards, remove_shard_prompts
+from pricing import add_fair_prices
+from signals import add_signals, game_signals, update_signals
 
 
     
-def build_ncaa_prompt(model_version, hours_ahead = 2):
-    try:
-        df_all = pd.read_csv('./data/bets_db/ncaab_bets_db.csv')
-    except:
-        df_all = pd.DataFrame()
-
-
-    # Example usage:
-    HEADERS = {
-        'Authority': 'api.actionnetwork',
-        'Accept': 'application/json',
-        'Origin': 'https://www.actionnetwork.com',
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36'
-    }
-
-
-    # Example usage:
-    sport='ncaab'
-
-
-    # Get today's date object
-    today = datetime.date.today()
-
-    # Define the desired string format
-    date_format = '%Y%m%d'
-
-    # Create the list using strftime() to format the dates
-    date_str_list = [
-        (today + datetime.timedelta(days=-1)).strftime(date_format),
-        (today + datetime.timedelta(days=0)).strftime(date_format), # Today
-        (today + datetime.timedelta(days=1)).strftime(date_format), # Tomorrow
-        (today + datetime.timedelta(days=2)).strftime(date_format), # The next day
-        (today + datetime.timedelta(days=3)).strftime(date_format)  # The day after
-    ]
-
-    df = get_todays_games(sport,date_str_list,HEADERS)
-    
-    if df.empty or 'status' not in df.columns:
-        print(f"No {sport} games found or status column missing. Returning empty.")
-        return pd.DataFrame()
-
-    df['date_scraped'] = datetime.datetime.now()
-
-    df = df.loc[df['status'] == 'scheduled']
-
-    df_all = pd.concat([df_all,df])
-    df_all['date_scraped'] = pd.to_datetime(df_all['date_scraped'])
-
-    dimension_cols = ['game_id', 'home_team', 'away_team']
-    metric_cols = ['home_money_line', 'away_money_line','total_score','home_money_line','away_money_line']
-    filtered_df = filter_data_on_change(df_all, dimension_cols, metric_cols)
-    print(df_all.index.size)
-    print(filtered_df.index.size)
-
-    filtered_df.to_csv('./data/bets_db/ncaab_bets_db.csv', index=False)
-
-    filtered_df['start_time_pt'] = pd.to_datetime(filtered_df['start_time_pt'])
-
-
-    group_by_columns = ['game_id', 'home_team', 'away_team','start_time']
-    metric_columns = [
-        'num_bets', 'home_money_line', 'home_ml_ticket_pct', 'home_ml_money_pct',
-        'away_money_line', 'away_ml_ticket_pct', 'away_ml_money_pct', 'total_score',
-        'over_odds', 'under_odds', 'over_ticket_pct', 'over_money_pct',
-        'under_ticket_pct', 'under_money_pct', 'home_spread', 'home_spread_odds',
-        'home_spread_ticket_pct', 'home_spread_money_pct', 'away_spread',
-        'away_spread_odds', 'away_spread_ticket_pct', 'away_spread_money_pct'
-    ]
-
-    next_games_list = df['game_id'].unique().tolist()
-
-    # display(filtered_df.sample(4))
-
-    games_list = filtered_df.loc[filtered_df['game_id'].isin(next_games_list)].groupby(['game_id','home_team','away_team','start_time_pt']).agg(
-        rec_count=('date_scraped','size'),
-        num_bets=('num_bets','last')
-    
-    
-    
-    ).sort_values('num_bets', ascending=False).head(30).reset_index()['game_id'].tolist()
-
-
-    for col in metric_columns:
-        if col in filtered_df.columns:
-            # This converts the column to a numeric type.
-            # Any string like 'N/A' will become NaN.
-            filtered_df[col] = pd.to_numeric(filtered_df[col], errors='coerce')
-
-    df_agg = aggregate_betting_data(filtered_df.loc[filtered_df['game_id'].isin(games_list)], group_by_columns, metric_columns)
-
-    df_agg = df_agg.sort_values('start_time',ascending=True)
-
-    # Create the home_team_spread column
-    df_agg['home_team_spread'] = df_agg['home_team'] + " " + df_agg['home_spread_last'].apply(lambda x: f"{x:+.1f}")
-
-    # Create the away_team_spread column (assuming this is the second column you wanted)
-    df_agg['away_team_spread'] = df_agg['away_team'] + " " + df_agg['away_spread_last'].apply(lambda x: f"{x:+.1f}")
-
-    # display(df_agg[['home_team','away_team','home_spread_first','home_spread_last','home_team_spread','away_team_spread']])
-
-    # display(df_agg[['home_team','away_team','home_spread_first','home_spread_last','home_spread_ticket_pct_first','home_spread_ticket_pct_last']])
-
-
-    df_hist = pd.read_csv('./data/evaluated/ncaab_bet_picks_evaluated.csv')
-    df_hist = df_hist.loc[df_hist['model'] == model_version]
-
-    # df_hist = pd.DataFrame()
-
-    # Filter df_agg to only include games starting within the next 2 hours
-    current_time = pd.Timestamp.now(tz='America/Los_Angeles')
-    n_hours_from_now = current_time + pd.Timedelta(hours=hours_ahead)
-    
-    # Convert start_time to datetime if not already
-    df_agg['start_time'] = pd.to_datetime(df_agg['start_time'])
-    df_agg['start_time_pt'] = df_agg['start_time'].dt.tz_convert('America/Los_Angeles')
-    
-    # Filter for games starting within next n hours
-    df_agg_filtered = df_agg[df_agg['start_time_pt'] <= n_hours_from_now].copy()
-    
-    print(f"Total games in df_agg: {len(df_agg)}")
-    print(f"Games starting within next {hours_ahead} hours: {len(df_agg_filtered)}")
-
-    # Define the prompt file path
-    prompt_file_path = f"./prompts/ncaab_prompt_{model_version}.txt"
-    
-    # If no games in the next 2 hours, delete the prompt file if it exists and return
-    if len(df_agg_filtered) == 0:
-        print(f"No games starting within {hours_ahead} hours for {model_version}. Skipping prompt generation.")
-        if os.path.exists(prompt_file_path):
-            os.remove(prompt_file_path)
-            print(f"Removed existing prompt file: {prompt_file_path}")
-        return df_agg
-
-    df1_string = df_agg_filtered.to_csv(index=False)
-    df2_string = df_hist.to_csv(index=False)
-
-    timestamp_str = datetime.datetime.now()
-
-    prompt = f"""
+def render_ncaab_prompt(df1_string, df2_string, timestamp_str):
+    """
+    Renders the college basketball prompt around Dataset 1 (upcoming games) and Dataset 2 (historical results).
+    """
+    return f"""
     You are my expert college basketball betting adviser.
     I will provide you with two datasets:
 
@@ -202,6 +75,18 @@ def build_ncaa_prompt(model_version, hours_ahead = 2):
     - `away_spread_last` and `away_spread_odds_last` for away team spread
     - `total_score_last`, `over_odds_last`, `under_odds_last` for totals
 
+    **Market pricing (already computed, don't redo the vig math):**
+    - `<side>_fair_prob_last`: no-vig win probability (%) for each side, e.g. `home_ml_fair_prob_last`, `over_fair_prob_last`
+    - `<side>_fair_odds_last`: the same probability as fair American odds
+    - `ml_hold_last`, `spread_hold_last`, `total_hold_last`: the book's margin (%) on each market
+    - Compare your own win probability to the fair probability to find value, but always copy the actual odds from the columns above
+
+    **Market signals (already computed from the line history, home side / over point of view):**
+    - `<market>_money_vs_tickets`: money % minus ticket % on the home side / over; positive = bigger bets than the ticket count suggests
+    - `<market>_line_move`: line movement toward the home side / over since the first snapshot
+    - `<market>_rlm`: 1 when the line moved against the ticket majority (reverse line movement)
+    - `<market>_steam` and `<market>_steam_mins`: net sharp line jumps (positive = toward home / over) and minutes before start of the latest one
+
     **NEVER:**
     - Invent odds
     - Approximate odds
@@ -385,126 +270,219 @@ Here are the upcoming games and their odds:
 Here is the historical dataset of your betting advice and results:
 {df2_string}
         """
-    print('-------')
-    print('-------')
-    print('-------')
-    print('-------')
 
-    # Now you can print the full prompt
-    print(prompt)
 
-    ## write prompt to a text file
-    with open(prompt_file_path, "w") as f:
-        f.write(prompt) 
+def build_ncaa_prompt(model_version, hours_ahead = 2, compact_dataset = True, shard_size = None, shard_window_minutes = None):
+    try:
+        df_all = pd.read_csv('./data/bets_db/ncaab_bets_db.csv')
+    except:
+        df_all = pd.DataFrame()
+
+
+    # Example usage:
+    HEADERS = {
+        'Authority': 'api.actionnetwork',
+        'Accept': 'application/json',
+        'Origin': 'https://www.actionnetwork.com',
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36'
+    }
+
+
+    # Example usage:
+    sport='ncaab'
+
+
+    # Get today's date object
+    today = datetime.date.today()
+
+    # Define the desired string format
+    date_format = '%Y%m%d'
+
+    # Create the list using strftime() to format the dates
+    date_str_list = [
+        (today + datetime.timedelta(days=-1)).strftime(date_format),
+        (today + datetime.timedelta(days=0)).strftime(date_format), # Today
+        (today + datetime.timedelta(days=1)).strftime(date_format), # Tomorrow
+        (today + datetime.timedelta(days=2)).strftime(date_format), # The next day
+        (today + datetime.timedelta(days=3)).strftime(date_format)  # The day after
+    ]
+
+    df = get_todays_games(sport,date_str_list,HEADERS)
     
-    print(f"Prompt file created: {prompt_file_path}") 
+    if df.empty or 'status' not in df.columns:
+        print(f"No {sport} games found or status column missing. Returning empty.")
+        return pd.DataFrame()
 
-    return df_agg
+    df['date_scraped'] = datetime.datetime.now()
 
-HEADERS = {
-    'Authority': 'api.actionnetwork',
-    'Accept': 'application/json',
-    'Origin': 'https://www.actionnetwork.com',
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36'
-}
+    df = df.loc[df['status'] == 'scheduled']
 
-def process_results(model_name: str, picks_dir: Path, results_csv_path: Path):
-    """
-    Processes betting picks for a given model against a game results CSV.
+    df_all = pd.concat([df_all,df])
+    df_all['date_scraped'] = pd.to_datetime(df_all['date_scraped'])
+
+    dimension_cols = ['game_id', 'home_team', 'away_team']
+    metric_cols = ['home_money_line', 'away_money_line','total_score','home_money_line','away_money_line']
+    filtered_df = filter_data_on_change(df_all, dimension_cols, metric_cols)
+    print(df_all.index.size)
+    print(filtered_df.index.size)
+
+    filtered_df.to_csv('./data/bets_db/ncaab_bets_db.csv', index=False)
+
+    filtered_df['start_time_pt'] = pd.to_datetime(filtered_df['start_time_pt'])
+
+
+    group_by_columns = ['game_id', 'home_team', 'away_team','start_time']
+    metric_columns = [
+        'num_bets', 'home_money_line', 'home_ml_ticket_pct', 'home_ml_money_pct',
+        'away_money_line', 'away_ml_ticket_pct', 'away_ml_money_pct', 'total_score',
+        'over_odds', 'under_odds', 'over_ticket_pct', 'over_money_pct',
+        'under_ticket_pct', 'under_money_pct', 'home_spread', 'home_spread_odds',
+        'home_spread_ticket_pct', 'home_spread_money_pct', 'away_spread',
+        'away_spread_odds', 'away_spread_ticket_pct', 'away_spread_money_pct'
+    ]
+
+    next_games_list = df['game_id'].unique().tolist()
+
+    # display(filtered_df.sample(4))
+
+    games_list = filtered_df.loc[filtered_df['game_id'].isin(next_games_list)].groupby(['game_id','home_team','away_team','start_time_pt']).agg(
+        rec_count=('date_scraped','size'),
+        num_bets=('num_bets','last')
     
-    It finds missing game results, fetches them from an API, appends them
-    to the main results CSV, and then evaluates all picks.
-    """
-    sport = 'ncaab'
     
-    # === 1. Load Picks File ===
-    picks_file = picks_dir / f'cbb_bets_{model_name}.txt'
-    try:
-        df_picks = pd.read_csv(picks_file)
-    except FileNotFoundError:
-        print(f"Error: Picks file not found at {picks_file}")
-        return None # Exit function
     
-    # display(df_picks.sample(3))
+    ).sort_values('num_bets', ascending=False).head(30).reset_index()['game_id'].tolist()
 
-    # === 2. Process Pick Timestamps ===
-    df_picks['timestamp'] = pd.to_datetime(df_picks['timestamp'], format='ISO8601')
-    df_picks['start_time_pt'] = (
-        pd.to_datetime(df_picks['start_time'], utc=True)
-        .dt.tz_convert('America/Los_Angeles')
-    )
-    df_picks['date'] = df_picks['start_time_pt'].dt.date
-    df_picks['model'] = model_name
 
-    # === 3. Load Existing Game Results ===
-    # Check if the file exists *before* trying to read it.
-    # This is key for knowing whether to write the header later.
-    results_file_exists = results_csv_path.is_file()
+    for col in metric_columns:
+        if col in filtered_df.columns:
+            # This converts the column to a numeric type.
+            # Any string like 'N/A' will become NaN.
+            filtered_df[col] = pd.to_numeric(filtered_df[col], errors='coerce')
+
+    df_agg = aggregate_betting_data(filtered_df.loc[filtered_df['game_id'].isin(games_list)], group_by_columns, metric_columns)
+
+    df_agg = df_agg.sort_values('start_time',ascending=True)
+
+    # Create the home_team_spread column
+    df_agg['home_team_spread'] = df_agg['home_team'] + " " + df_agg['home_spread_last'].apply(lambda x: f"{x:+.1f}")
+
+    # Create the away_team_spread column (assuming this is the second column you wanted)
+    df_agg['away_team_spread'] = df_agg['away_team'] + " " + df_agg['away_spread_last'].apply(lambda x: f"{x:+.1f}")
+    # No-vig probabilities, fair odds and hold for every market
+    df_agg = add_fair_prices(df_agg)
+    # Sharp money, reverse line movement and steam per game (cached per snapshot)
+    df_agg = add_signals(df_agg, game_signals(update_signals('ncaab', filtered_df)))
+
+    # display(df_agg[['home_team','away_team','home_spread_first','home_spread_last','home_team_spread','away_team_spread']])
+
+    # display(df_agg[['home_team','away_team','home_spread_first','home_spread_last','home_spread_ticket_pct_first','home_spread_ticket_pct_last']])
+
+
+    df_hist = pd.read_csv('./data/evaluated/ncaab_bet_picks_evaluated.csv')
+    df_hist = df_hist.loc[df_hist['model'] == model_version]
+
+    # Stored confidence calibration (see calibration), once an evaluation run has built it
+    df_calibration = load_calibration('ncaab') if calibration_file('ncaab').is_file() else None
+    calibration_string = compact_calibration(df_calibration, model_version) if df_calibration is not None else ""
+
+    # df_hist = pd.DataFrame()
+
+    # Filter df_agg to only include games starting within the next 2 hours
+    current_time = pd.Timestamp.now(tz='America/Los_Angeles')
+    n_hours_from_now = current_time + pd.Timedelta(hours=hours_ahead)
     
-    try:
-        df_old_results = pd.read_csv(results_csv_path)
-    except FileNotFoundError:
-        print(f"Results file {results_csv_path} not found. A new one will be created.")
-        df_old_results = pd.DataFrame() # Start with an empty DataFrame
-
-    # === 4. Find Missing Results ===
-    df_merge = pd.merge(
-        df_picks[['rank', 'game_id', 'match', 'date', 'start_time', 'pick']],
-        df_old_results,
-        on='game_id',
-        how='left',
-        suffixes=('_pick', '_result')
-    )
-    missing_games = df_merge.loc[df_merge['status'] != 'complete']
-
-    # === 5. Fetch and Append New Results (if any) ===
-    df_new_results = pd.DataFrame() # Initialize as empty
-
-    if not missing_games.empty:
-        date_str_list = missing_games['date'].astype(str).str.replace('-', '').unique().tolist()
-        
-        if date_str_list:
-            print(f"Found missing results for {len(date_str_list)} dates. Fetching...")
-            df_new_results = get_complete_game_results(sport, date_str_list, HEADERS)
-            
-            if not df_new_results.empty:
-                print(f"Appending {len(df_new_results)} new results to {results_csv_path}")
-                # Append new data
-                df_new_results.to_csv(
-                    results_csv_path,
-                    mode='a',
-                    # Write header ONLY if the file didn't exist before
-                    header=not results_file_exists, 
-                    index=False
-                )
-            else:
-                print("API call returned no new results.")
-    else:
-        print("No missing game results found. All picks are up-to-date.")
-
-    # === 6. Combine All Results for Final Processing ===
-    # *** THIS IS THE MAIN LOGIC FIX ***
-    # Combine the old results and the brand-newly fetched results
-    df_all_results = pd.concat([df_old_results, df_new_results], ignore_index=True)
-
-    # Drop duplicates in case the API sent a game we already had
-    if 'game_id' in df_all_results.columns and not df_all_results.empty:
-        df_all_results = df_all_results.drop_duplicates(subset='game_id', keep='last')
-
-    # === 7. Process and Save Evaluations ===
-    # Pass the *complete* set of results (old + new)
-    df_evaluated, df_evaluated_hist = process_and_save_evaluated_bets(
-        df_picks, 
-        df_all_results, 
-        sport
+    # Convert start_time to datetime if not already
+    df_agg['start_time'] = pd.to_datetime(df_agg['start_time'])
+    df_agg['start_time_pt'] = df_agg['start_time'].dt.tz_convert('America/Los_Angeles')
+    
+    # Filter for games starting within next n hours
+    df_agg_filtered = df_agg[df_agg['start_time_pt'] <= n_hours_from_now].copy()
+    
+    print(f"Total games in df_agg: {len(df_agg)}")
+    print(f"Games starting within next {hours_ahead} hours: {len(df_agg_filtered)}")
+
+    # Define the prompt file path
+    prompt_file_path = f"./prompts/ncaab_prompt_{model_version}.txt"
+    
+    # If no games in the next 2 hours, delete the prompt file if it exists and return
+    if len(df_agg_filtered) == 0:
+        print(f"No games starting within {hours_ahead} hours for {model_version}. Skipping prompt generation.")
+        if os.path.exists(prompt_file_path):
+            os.remove(prompt_file_path)
+            print(f"Removed existing prompt file: {prompt_file_path}")
+        remove_shard_prompts('ncaab', model_version)
+        return df_agg
+
+    # Sharded mode: several small prompts that can be sent in parallel instead of one for the whole slate
+    if shard_size or shard_window_minutes:
+        write_prompt_shards(
+            'ncaab', model_version, df_agg_filtered, df_hist,
+            lambda d1, d2: render_ncaab_prompt(d1, d2, datetime.datetime.now()),
+            games_per_shard=shard_size or len(df_agg_filtered),
+            window_minutes=shard_window_minutes,
+            compact_dataset=compact_dataset,
+            df_calibration=df_calibration,
+            prompt_file=prompt_file_path,
+            template_version=file_fingerprint(__file__)
+        )
+        return df_agg
+
+    # Single prompt: shards from an earlier sharded build would otherwise be sent too
+    remove_shard_prompts('ncaab', model_version)
+
+    # Skip rendering when the lines, history and template are the same as last time
+    fingerprint = prompt_fingerprint(
+        lines_fingerprint(df_agg_filtered, compact_dataset),
+        f"{frame_fingerprint(df_hist)}:{text_fingerprint(calibration_string)}",
+        f"{file_fingerprint(__file__)}:{'compact' if compact_dataset else 'csv'}"
     )
+    prompt_changed, change_reason = check_prompt_fingerprint('ncaab', model_version, fingerprint, prompt_file_path)
+    if not prompt_changed:
+        record_prompt_unchanged('ncaab', model_version, change_reason)
+        return df_agg
+
+    render_start = time.perf_counter()
 
-    if 'date' in df_evaluated_hist.columns:
-        df_evaluated_hist['date'] = pd.to_datetime(df_evaluated_hist['date'])
+    if compact_dataset:
+        df1_string = compact_dataset_csv(df_agg_filtered)
     else:
-        print("Warning: 'df_evaluated_hist' has no 'date' column to convert.")
+        df1_string = df_agg_filtered.to_csv(index=False)
+    df2_string = df_hist.to_csv(index=False)
+    if calibration_string:
+        df2_string += '\n' + calibration_string
+
+    timestamp_str = datetime.datetime.now()
+
+    prompt = render_ncaab_prompt(df1_string, df2_string, timestamp_str)
+    render_seconds = time.perf_counter() - render_start
+
+    print('-------')
+    print('-------')
+    print('-------')
+    print('-------')
+
+    # Now you can print the full prompt
+    print(prompt)
 
-    return df_evaluated_hist
+    ## write prompt to a text file
+    with open(prompt_file_path, "w") as f:
+        f.write(prompt) 
+    
+    print(f"Prompt file created: {prompt_file_path}") 
+
+    record_prompt_manifest(
+        'ncaab', model_version, prompt,
+        sections={'dataset_1': df1_string, 'dataset_2': df2_string},
+        dataset_1_rows=len(df_agg_filtered),
+        dataset_2_rows=len(df_hist),
+        render_seconds=render_seconds,
+        prompt_file=prompt_file_path,
+        fingerprint=fingerprint,
+        change_reason=change_reason
+    )
+
+    return df_agg
 
 model_list = ['perplexity', 'claude', 'gemini']
 
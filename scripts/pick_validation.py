@@ -0,0 +1,247 @@
+"""
+Checks every LLM pick against the line snapshot the model was working from.
+
+Each pick is joined to the line store (data/bets_db/<sport>_bets_db.csv) on
+game_id. The timestamp a model writes on its picks is often hours off (a
+local time labelled UTC, or simply made up), so the last scraped row before
+it is frequently not the one the prompt showed. Instead every snapshot of the
+game scraped within SNAPSHOT_TOLERANCE of the pick's timestamp (and before
+the game started) is a candidate, along with the last row at or before the
+timestamp (pd.merge_asof). The checks run as one vectorized pass over all
+candidates, and each pick keeps the candidate that agrees with it best, then
+the nearest one in time:
+
+    no_snapshot         no line was scraped for the game before the pick
+    odds_mismatch       odds differ from the snapshot odds for the picked side
+    line_mismatch       the spread/total in the pick text differs from the snapshot
+    side_mismatch       the bet_* indicator disagrees with the team or side named in the pick
+    indicator_mismatch  not exactly one bet_* indicator is set
+    order_mismatch      match isn't "home_team vs away_team"
+
+hallucination_rates() summarizes the flags per model.
+
+Usage:
+    python scripts/pick_validation.py [sport]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from picks_parser import parse_picks_file
+from timestamps import to_epoch_ms, from_epoch_ms, ensure_epoch
+
+
+LINES_DIR = Path('./data/bets_db')
+PICKS_DIR = Path('./data/bets')
+EVALUATED_DIR = Path('./data/evaluated')
+
+# How far from the pick's timestamp a snapshot can be and still be the one the model saw
+SNAPSHOT_TOLERANCE = pd.Timedelta(hours=12)
+
+FLAG_COLUMNS = ['no_snapshot', 'odds_mismatch', 'line_mismatch', 'side_mismatch',
+                'indicator_mismatch', 'order_mismatch']
+
+# Side -> (snapshot odds column, snapshot point column, bet indicator)
+SIDE_COLUMNS = {
+    'home_ml': ('home_money_line', None, 'bet_home_ml'),
+    'away_ml': ('away_money_line', None, 'bet_away_ml'),
+    'home_spread': ('home_spread_odds', 'home_spread', 'bet_home_spread'),
+    'away_spread': ('away_spread_odds', 'away_spread', 'bet_away_spread'),
+    'over': ('over_odds', 'total_score', 'bet_over'),
+    'under': ('under_odds', 'total_score', 'bet_under'),
+    'draw': ('tie_money_line', None, None),
+}
+
+SNAPSHOT_COLUMNS = ['home_team', 'away_team', 'home_money_line', 'away_money_line', 'tie_money_line',
+                    'total_score', 'over_odds', 'under_odds', 'home_spread', 'home_spread_odds',
+                    'away_spread', 'away_spread_odds']
+
+
+def load_line_store(sport: str, lines_dir: Path = LINES_DIR, scraped_tz: str = 'UTC') -> pd.DataFrame:
+    """
+    Loads the scraped line history for a sport, ready for an as-of join.
+
+    Args:
+        sport (str): The sport prefix.
+        lines_dir (Path): Directory holding <sport>_bets_db.csv.
+        scraped_tz (str): Time zone the naive date_scraped values were recorded in.
+
+    Returns:
+        pd.DataFrame: game_id, date_scraped_epoch (int64 ms, see timestamps) and the
+                      SNAPSHOT_COLUMNS, sorted by date_scraped_epoch.
+    """
+    df = pd.read_csv(Path(lines_dir) / f'{sport}_bets_db.csv',
+                     usecols=lambda c: c in ['game_id', 'date_scraped'] + SNAPSHOT_COLUMNS)
+    df['date_scraped_epoch'] = to_epoch_ms(df['date_scraped'], naive_tz=scraped_tz)
+    df['game_id'] = pd.to_numeric(df['game_id'], errors='coerce').astype('Int64')
+    for col in SNAPSHOT_COLUMNS[2:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=['game_id', 'date_scraped_epoch']).drop(columns='date_scraped')
+    df['date_scraped_epoch'] = df['date_scraped_epoch'].astype('int64')
+    return df.sort_values('date_scraped_epoch')
+
+
+def _pick_parts(picks: pd.Series):
+    """Splits pick text like 'Kings +10.5', 'Under 239.5' or 'Celtics ML' into (subject, point)."""
+    text = picks.fillna('').astype(str).str.strip()
+    point = pd.to_numeric(text.str.extract(r'\s([+-]?\d+(?:\.\d+)?)\s*$')[0], errors='coerce')
+    subject = (text.str.replace(r'\s+(?:[+-]?\d+(?:\.\d+)?|ML|Moneyline)\s*$', '', regex=True, case=False)
+               .str.strip().str.lower())
+    return subject, point
+
+
+def validate_picks(df_picks: pd.DataFrame, df_lines: pd.DataFrame, odds_tolerance: float = 0,
+                   line_tolerance: float = 0, snapshot_tolerance: pd.Timedelta = SNAPSHOT_TOLERANCE) -> pd.DataFrame:
+    """
+    Joins picks to the snapshot they were made from and flags mismatches.
+
+    Picks without a timestamp are matched around start_time instead.
+
+    Args:
+        df_picks (pd.DataFrame): Parsed picks (see picks_parser.parse_picks_file).
+        df_lines (pd.DataFrame): Output of load_line_store().
+        odds_tolerance (float): Largest odds difference that still counts as a match.
+        line_tolerance (float): Largest spread/total difference that still counts as a match.
+        snapshot_tolerance (pd.Timedelta): Snapshots scraped this close to the pick's
+                                           timestamp are candidates for the one it was made from.
+
+    Returns:
+        pd.DataFrame: The picks with snapshot_time, side, snapshot_odds, snapshot_point,
+                      pick_point, the FLAG_COLUMNS and a combined 'hallucinated' flag.
+    """
+    df = df_picks.copy()
+    df['game_id'] = df['game_id'].astype('Int64')
+    df = ensure_epoch(ensure_epoch(df, 'timestamp'), 'start_time')
+    df['as_of'] = df['timestamp_epoch'].fillna(df['start_time_epoch']).astype('int64')
+    df = df.reset_index()
+
+    snapshot = df_lines.rename(columns={c: f'{c}_snap' for c in SNAPSHOT_COLUMNS})
+    latest = pd.merge_asof(
+        df.sort_values('as_of'), snapshot,
+        left_on='as_of', right_on='date_scraped_epoch', by='game_id', direction='backward',
+    )
+    nearby = df.merge(snapshot, on='game_id')
+    gap = (nearby['date_scraped_epoch'] - nearby['as_of']).abs()
+    nearby = nearby.loc[(gap <= snapshot_tolerance // pd.Timedelta(milliseconds=1))
+                        & (nearby['date_scraped_epoch'] < nearby['start_time_epoch'])]
+    df = pd.concat([latest, nearby], ignore_index=True).drop_duplicates(['index', 'date_scraped_epoch'])
+
+    df = _flag_mismatches(df, odds_tolerance, line_tolerance)
+
+    # One snapshot per pick: a match over a mismatch, then the nearest in time
+    misses = df['odds_mismatch'].astype(int) + df['line_mismatch'].astype(int)
+    df = df.assign(_misses=misses, _gap=(df['date_scraped_epoch'] - df['as_of']).abs())
+    df = (df.sort_values(['index', 'no_snapshot', '_misses', '_gap'], kind='stable')
+          .drop_duplicates('index').set_index('index').sort_index())
+    df.index.name = None
+
+    return df.drop(columns=[c for c in df.columns if c.endswith('_snap') and c not in
+                            ('home_team_snap', 'away_team_snap')]
+                   + ['as_of', 'date_scraped_epoch', '_misses', '_gap'])
+
+
+def _flag_mismatches(df: pd.DataFrame, odds_tolerance: float, line_tolerance: float) -> pd.DataFrame:
+    """Sets side, snapshot_odds/point, pick_point and the FLAG_COLUMNS on picks joined to a snapshot."""
+    df = df.copy()
+    df['snapshot_time'] = from_epoch_ms(df['date_scraped_epoch'])
+
+    subject, df['pick_point'] = _pick_parts(df['pick'])
+    home = df['home_team_snap'].fillna('').str.lower()
+    away = df['away_team_snap'].fillna('').str.lower()
+    is_total = subject.isin(['over', 'under'])
+    is_draw = subject.isin(['draw', 'tie'])
+    has_point = df['pick_point'].notna() & ~is_total
+
+    # Side according to the pick text
+    text_side = pd.Series(np.select(
+        [subject == 'over', subject == 'under', is_draw,
+         (subject == home) & has_point, (subject == home),
+         (subject == away) & has_point, (subject == away)],
+        ['over', 'under', 'draw', 'home_spread', 'home_ml', 'away_spread', 'away_ml'],
+        default='',
+    ), index=df.index)
+
+    # Side according to the bet_* indicators
+    indicators = {side: cols[2] for side, cols in SIDE_COLUMNS.items() if cols[2]}
+    flags = pd.DataFrame({side: pd.to_numeric(df[col], errors='coerce').fillna(0) == 1
+                          for side, col in indicators.items()}, index=df.index)
+    n_flags = flags.sum(axis=1)
+    flag_side = flags.idxmax(axis=1).where(n_flags == 1, '')
+
+    # The pick text is the most specific statement of the bet, so odds and line
+    # are judged against the side it names and the indicators are checked against it
+    df['side'] = text_side.where(text_side != '', flag_side)
+    df['snapshot_odds'] = np.nan
+    df['snapshot_point'] = np.nan
+    for side, (odds_col, point_col, _) in SIDE_COLUMNS.items():
+        rows = df['side'] == side
+        df.loc[rows, 'snapshot_odds'] = df.loc[rows, f'{odds_col}_snap']
+        if point_col:
+            df.loc[rows, 'snapshot_point'] = df.loc[rows, f'{point_col}_snap']
+
+    matched = df['snapshot_time'].notna()
+    df['no_snapshot'] = ~matched
+    df['odds_mismatch'] = matched & ((df['odds'] - df['snapshot_odds']).abs() > odds_tolerance).fillna(True)
+    df['line_mismatch'] = (matched & df['snapshot_point'].notna()
+                           & ((df['pick_point'] - df['snapshot_point']).abs() > line_tolerance).fillna(True))
+    df['side_mismatch'] = matched & (text_side != '') & (flag_side != '') & (text_side != flag_side)
+    df['indicator_mismatch'] = (n_flags != 1) & ~is_draw
+    df['order_mismatch'] = matched & (
+        df['match'].fillna('').str.strip().str.lower() != home + ' vs ' + away
+    )
+    df['hallucinated'] = df[FLAG_COLUMNS].any(axis=1)
+    return df
+
+
+def hallucination_rates(df_validated: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-model share of picks with each kind of mismatch.
+
+    Returns:
+        pd.DataFrame: One row per model with the pick count and a rate (0-1) per flag.
+    """
+    rates = df_validated.groupby('model')[FLAG_COLUMNS + ['hallucinated']].mean()
+    rates.insert(0, 'picks', df_validated.groupby('model').size())
+    return rates.sort_values('hallucinated').reset_index()
+
+
+def validate_sport(sport: str, models: list = None, picks_dir: Path = PICKS_DIR,
+                   lines_dir: Path = LINES_DIR, output_dir: Path = EVALUATED_DIR) -> pd.DataFrame:
+    """
+    Validates every model's picks for a sport and saves the flagged picks and rates.
+
+    Writes <sport>_pick_validation.csv and <sport>_hallucination_rates.csv to output_dir.
+
+    Returns:
+        pd.DataFrame: The hallucination rates per model.
+    """
+    df_lines = load_line_store(sport, lines_dir)
+    picks_files = sorted(Path(picks_dir).glob(f'{sport}_bets_*.txt'))
+    frames = []
+    for picks_file in picks_files:
+        model_name = picks_file.stem.split('_bets_', 1)[1]
+        if models and model_name not in models:
+            continue
+        df_picks, _ = parse_picks_file(picks_file, model_name)
+        frames.append(df_picks)
+
+    df_validated = validate_picks(pd.concat(frames, ignore_index=True), df_lines)
+    df_rates = hallucination_rates(df_validated)
+
+    output_dir = Path(output_dir)
+    df_validated.loc[df_validated['hallucinated'], [
+        'model', 'game_id', 'match', 'pick', 'odds', 'side', 'snapshot_time', 'snapshot_odds',
+        'snapshot_point', 'pick_point'] + FLAG_COLUMNS
+    ].to_csv(output_dir / f'{sport}_pick_validation.csv', index=False)
+    df_rates.to_csv(output_dir / f'{sport}_hallucination_rates.csv', index=False)
+
+    print(f"Hallucination rates for {sport}:")
+    print(df_rates.round(3).to_string(index=False))
+    return df_rates
+
+
+if __name__ == '__main__':
+    validate_sport(sys.argv[1] if len(sys.argv) > 1 else 'nba')
@@ -0,0 +1,221 @@
+"""
+Incremental reading of the append-only data/bets/<sport>_bets_<model>.txt files.
+
+read_picks_checkpointed() remembers, per picks file, the byte offset it has
+parsed up to, the header line and a hash of every byte before the offset. On
+the next run it hashes that prefix again, streaming it in HASH_CHUNK blocks,
+which costs a fraction of parsing it. If the hash still matches, the file has
+only grown by appending, so only the bytes after the offset are parsed and
+concatenated onto the cached rows from last time. If the file shrank or the
+hash changed, it falls back to a full read. cleanup_bet_timestamps also drops
+the checkpoint of every file it rewrites (drop_checkpoint).
+
+An optional transform (e.g. picks_parser.parse_picks) is applied to each
+newly read chunk and its output is what gets cached, so a run only pays for
+parsing and normalizing the bytes appended since the last one.
+
+Offsets and hashes live in data/checkpoints/picks_offsets.json and the parsed
+rows in data/checkpoints/<file>_<path hash>.pkl, keyed by the resolved path
+so same-named files in different directories don't share a cache. Both are
+local caches (git-ignored) and are rebuilt from a full read whenever they're
+missing.
+"""
+
+import hashlib
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+
+
+CHECKPOINT_DIR = Path('./data/checkpoints')
+HASH_CHUNK = 1 << 20
+STATE_FILE = 'picks_offsets.json'
+
+
+def _load_state(state_file: Path) -> dict:
+    if not state_file.is_file():
+        return {}
+    with open(state_file, 'r') as f:
+        return json.load(f)
+
+
+def _save_state(state: dict, state_file: Path):
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_file, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def _prefix_hash(f, offset: int):
+    """sha256 of the first offset bytes, left open so the bytes after them can be added."""
+    h = hashlib.sha256()
+    f.seek(0)
+    remaining = offset
+    while remaining > 0:
+        chunk = f.read(min(HASH_CHUNK, remaining))
+        if not chunk:
+            break
+        h.update(chunk)
+        remaining -= len(chunk)
+    return h
+
+
+def _digest(h) -> str:
+    return h.hexdigest()[:16]
+
+
+def _cache_paths(picks_file: Path, checkpoint_dir: Path):
+    """The state key and the .pkl cache file of a picks file, both from its resolved path."""
+    key = picks_file.resolve().as_posix()
+    path_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]
+    return key, checkpoint_dir / f'{picks_file.stem}_{path_hash}.pkl'
+
+
+def _read_signature(read_csv_kwargs: dict, transform=None) -> str:
+    # Cached rows are only reusable if they were parsed with the same options
+    options = sorted((k, getattr(v, '__name__', v)) for k, v in read_csv_kwargs.items())
+    if transform is not None:
+        options.append(('transform', f'{transform.__module__}.{transform.__qualname__}'))
+    return repr(options)
+
+
+def _parse(header: str, text: str, **read_csv_kwargs) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(header + '\n' + text), **read_csv_kwargs)
+
+
+def _concat(parts: list):
+    """Concatenates chunk results, element-wise when the transform returns a tuple of frames."""
+    if isinstance(parts[0], tuple):
+        return tuple(_concat([part[i] for part in parts]) for i in range(len(parts[0])))
+    frames = [df for df in parts if not df.empty] or parts[:1]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _rows(result) -> int:
+    return len(result[0] if isinstance(result, tuple) else result)
+
+
+def read_picks_checkpointed(picks_file, checkpoint_dir: Path = CHECKPOINT_DIR, transform=None,
+                            **read_csv_kwargs):
+    """
+    Reads a picks file, parsing only what was appended since the last call.
+
+    A trailing line without a newline is parsed on every call but never cached,
+    since it may still be mid-append.
+
+    Args:
+        picks_file (str or Path): The data/bets/<sport>_bets_<model>.txt file.
+        checkpoint_dir (Path): Directory for the offsets file and cached rows.
+        transform (callable, optional): Applied to every chunk pd.read_csv
+            returns, before it is cached. It must work row by row, so that
+            transforming chunks and concatenating them equals transforming
+            the whole file. It may return a DataFrame or a tuple of them.
+        **read_csv_kwargs: Passed to pd.read_csv (e.g. on_bad_lines='warn').
+
+    Returns:
+        pd.DataFrame: All picks in the file, as pd.read_csv would return them,
+                      or as transform returns them when one is given.
+
+    Raises:
+        FileNotFoundError: If the picks file doesn't exist.
+    """
+    picks_file = Path(picks_file)
+    checkpoint_dir = Path(checkpoint_dir)
+    state_file = checkpoint_dir / STATE_FILE
+    key, cache_file = _cache_paths(picks_file, checkpoint_dir)
+    signature = _read_signature(read_csv_kwargs, transform)
+
+    def parse(header, text):
+        df = _parse(header, text, **read_csv_kwargs)
+        return transform(df) if transform is not None else df
+
+    state = _load_state(state_file)
+    entry = state.get(key)
+    size = picks_file.stat().st_size
+
+    with open(picks_file, 'rb') as f:
+        df_cached = None
+        offset = 0
+        prefix = hashlib.sha256()
+        reason = 'no checkpoint'
+        if entry is not None and cache_file.is_file():
+            if entry.get('read_args') != signature:
+                reason = 'read options changed'
+            elif size < entry['offset']:
+                reason = 'file shrank'
+            else:
+                prefix = _prefix_hash(f, entry['offset'])
+                if _digest(prefix) != entry.get('prefix_hash'):
+                    prefix = hashlib.sha256()
+                    reason = 'file rewritten'
+                else:
+                    df_cached = pd.read_pickle(cache_file)
+                    offset = entry['offset']
+                    reason = None
+
+        f.seek(offset)
+        data = f.read()
+
+    if df_cached is None:
+        # Full read: the header is the first line
+        header_bytes, _, data = data.partition(b'\n')
+        header = header_bytes.decode('utf-8').rstrip('\r')
+        offset = len(header_bytes) + 1
+        prefix.update(header_bytes + b'\n')
+    else:
+        header = entry['header']
+
+    # Only complete lines go into the cache
+    complete, _, partial = data.rpartition(b'\n')
+    if complete or data.endswith(b'\n'):
+        complete += b'\n'
+    new_offset = offset + len(complete)
+    prefix.update(complete)
+
+    df_new = parse(header, complete.decode('utf-8')) if complete.strip() else None
+    parts = [df for df in (df_cached, df_new) if df is not None]
+    df_complete = _concat(parts) if parts else parse(header, '')
+
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle(df_complete, cache_file)
+    state[key] = {
+        'offset': new_offset,
+        'header': header,
+        'prefix_hash': _digest(prefix),
+        'rows': _rows(df_complete),
+        'read_args': signature,
+    }
+    _save_state(state, state_file)
+
+    n_new = 0 if df_new is None else _rows(df_new)
+    if reason:
+        print(f"{picks_file.name}: full read ({reason}), {_rows(df_complete)} rows")
+    else:
+        print(f"{picks_file.name}: {_rows(df_cached)} cached rows + {n_new} new rows")
+
+    if partial.strip():
+        return _concat([df_complete, parse(header, partial.decode('utf-8'))])
+    return df_complete
+
+
+def drop_checkpoint(picks_file, checkpoint_dir: Path = CHECKPOINT_DIR) -> bool:
+    """
+    Forgets a picks file's offset and cached rows, e.g. after rewriting the file.
+
+    Returns:
+        bool: True if there was a checkpoint to drop.
+    """
+    picks_file = Path(picks_file)
+    checkpoint_dir = Path(checkpoint_dir)
+    state_file = checkpoint_dir / STATE_FILE
+    key, cache_file = _cache_paths(picks_file, checkpoint_dir)
+
+    state = _load_state(state_file)
+    dropped = state.pop(key, None) is not None
+    if dropped:
+        _save_state(state, state_file)
+    if cache_file.is_file():
+        cache_file.unlink()
+        dropped = True
+    return dropped
@@ -0,0 +1,167 @@
+"""
+Pick ledger that tracks every pick from pending to graded.
+
+data/evaluated/<sport>_pick_ledger.csv holds one row per pick, keyed like the
+history files (rank, game_id, model, pick), with its state:
+
+    pending   saved to <sport>_bet_picks.csv, game not complete yet
+    graded    result appended to <sport>_bet_picks_evaluated.csv
+
+Each evaluation run registers the picks it hasn't seen before, grades only the
+pending picks whose games now have a complete result, and appends those
+rows to the history files. Nothing already graded is evaluated, deduplicated
+or rewritten again, so the work per run follows the number of new
+completions instead of the size of the history.
+
+The ledger is created from the existing history files the first time it is
+needed: picks in the evaluated history count as graded, all others as pending.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+
+LEDGER_KEY = ['rank', 'game_id', 'model', 'pick']
+LEDGER_COLUMNS = LEDGER_KEY + ['start_time', 'state', 'graded_at']
+
+PENDING = 'pending'
+GRADED = 'graded'
+
+
+def key_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The ledger key columns with consistent types, so keys from any file compare equal."""
+    keys = df.reindex(columns=LEDGER_KEY).copy()
+    for col in ['rank', 'game_id']:
+        keys[col] = pd.to_numeric(keys[col], errors='coerce').round().astype('Int64')
+    for col in ['model', 'pick']:
+        keys[col] = keys[col].astype(str).str.strip()
+    return keys
+
+
+def _read_csv_or_empty(path: Path) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame()
+
+
+def build_ledger(picks_hist_file: Path, evaluated_hist_file: Path) -> pd.DataFrame:
+    """
+    Creates a ledger from the existing picks and evaluated history files.
+
+    Returns:
+        pd.DataFrame: One row per pick in LEDGER_COLUMNS.
+    """
+    df_picks_hist = _read_csv_or_empty(picks_hist_file)
+    df_evaluated_hist = _read_csv_or_empty(evaluated_hist_file)
+    if df_picks_hist.empty and df_evaluated_hist.empty:
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+
+    graded = key_frame(df_evaluated_hist).drop_duplicates() if not df_evaluated_hist.empty else key_frame(pd.DataFrame())
+    graded['state'] = GRADED
+
+    ledger = key_frame(df_picks_hist)
+    ledger['start_time'] = df_picks_hist.get('start_time')
+    ledger = pd.concat([ledger, graded.drop(columns='state')], ignore_index=True)
+    ledger = ledger.drop_duplicates(subset=LEDGER_KEY, keep='first')
+    ledger = ledger.merge(graded, on=LEDGER_KEY, how='left')
+    ledger['state'] = ledger['state'].fillna(PENDING)
+    ledger['graded_at'] = None
+    return ledger[LEDGER_COLUMNS].reset_index(drop=True)
+
+
+def load_ledger(ledger_file: Path, picks_hist_file: Path, evaluated_hist_file: Path) -> pd.DataFrame:
+    """
+    Reads the ledger, building it from the history files if it doesn't exist yet.
+    """
+    if Path(ledger_file).is_file():
+        ledger = pd.read_csv(ledger_file)
+        keys = key_frame(ledger)
+        ledger[LEDGER_KEY] = keys
+        return ledger.reindex(columns=LEDGER_COLUMNS)
+
+    print(f"Pick ledger {ledger_file} not found. Building it from the history files.")
+    return build_ledger(picks_hist_file, evaluated_hist_file)
+
+
+def save_ledger(ledger: pd.DataFrame, ledger_file: Path):
+    ledger[LEDGER_COLUMNS].to_csv(ledger_file, index=False)
+
+
+def register_picks(ledger: pd.DataFrame, df_picks: pd.DataFrame):
+    """
+    Adds the picks the ledger hasn't seen yet as pending.
+
+    Returns:
+        tuple: (updated ledger, the rows of df_picks that were new).
+    """
+    keys = key_frame(df_picks)
+    seen = keys.merge(ledger[LEDGER_KEY].drop_duplicates(), on=LEDGER_KEY, how='left', indicator=True)['_merge'] == 'both'
+    # The same pick can appear twice within a picks file; register it once
+    new = ~seen.to_numpy() & ~keys.duplicated().to_numpy()
+    df_new_picks = df_picks.loc[new]
+
+    if df_new_picks.empty:
+        return ledger, df_new_picks
+
+    new_rows = keys.loc[new].copy()
+    new_rows['start_time'] = df_new_picks['start_time'].to_numpy()
+    new_rows['state'] = PENDING
+    new_rows['graded_at'] = None
+    new_rows = new_rows[LEDGER_COLUMNS].reset_index(drop=True)
+    if ledger.empty:
+        return new_rows, df_new_picks
+
+    # Columns with nothing in them yet (graded_at) take the ledger's dtype, so the concat is well defined
+    all_na = [col for col in LEDGER_COLUMNS if new_rows[col].isna().all()]
+    new_rows = new_rows.astype({col: ledger[col].dtype for col in all_na})
+    ledger = pd.concat([ledger, new_rows], ignore_index=True)
+    return ledger, df_new_picks
+
+
+def gradable_picks(ledger: pd.DataFrame, df_picks: pd.DataFrame, df_result: pd.DataFrame) -> pd.DataFrame:
+    """
+    The rows of df_picks that are pending in the ledger and whose game is now complete.
+    """
+    if df_result.empty or 'status' not in df_result.columns:
+        return df_picks.iloc[0:0]
+    completed = pd.to_numeric(df_result.loc[df_result['status'] == 'complete', 'game_id'], errors='coerce')
+
+    pending = ledger.loc[ledger['state'] == PENDING, LEDGER_KEY]
+    keys = key_frame(df_picks)
+    is_pending = (keys.merge(pending.drop_duplicates(), on=LEDGER_KEY, how='left', indicator=True)['_merge'] == 'both').to_numpy()
+    is_complete = keys['game_id'].isin(completed.dropna().astype('int64')).to_numpy()
+    return df_picks.loc[is_pending & is_complete & ~keys.duplicated().to_numpy()]
+
+
+def mark_graded(ledger: pd.DataFrame, df_graded: pd.DataFrame, graded_at=None) -> pd.DataFrame:
+    """
+    Moves the given picks from pending to graded.
+    """
+    if df_graded.empty:
+        return ledger
+    graded_at = graded_at or pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%dT%H:%M:%SZ')
+    keys = key_frame(df_graded).drop_duplicates()
+    hit = (ledger[LEDGER_KEY].merge(keys, on=LEDGER_KEY, how='left', indicator=True)['_merge'] == 'both').to_numpy()
+    ledger = ledger.copy()
+    ledger.loc[hit, 'state'] = GRADED
+    ledger.loc[hit, 'graded_at'] = graded_at
+    return ledger
+
+
+def append_rows(df: pd.DataFrame, path: Path):
+    """
+    Appends rows to a history CSV, lined up with the columns already in the file.
+
+    Columns the file doesn't have are dropped and missing ones are left blank.
+    The header is only written when the file is new.
+    """
+    path = Path(path)
+    if df.empty:
+        return
+    if path.is_file() and path.stat().st_size > 0:
+        columns = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=columns).to_csv(path, mode='a', header=False, index=False)
+    else:
+        df.to_csv(path, index=False)
@@ -0,0 +1,255 @@
+"""
+One ingestion path for the LLM pick files in data/bets/.
+
+The pick files are CSV pasted or streamed out of model responses, so they
+carry the same handful of defects: zero-width spaces and BOMs in names and
+values, repeated header rows, reasons with unquoted commas, '+150' style
+odds, 'true'/'false' flags and timestamps in several formats. This module
+declares the expected schema once (PICK_SCHEMA) and normalizes a whole file
+in a single vectorized pass:
+
+    read_picks_raw()      every cell as text, over-long rows repaired
+    clean_pick_columns()  column names cleaned, duplicate columns coalesced
+    parse_picks()         header rows dropped, values typed per PICK_SCHEMA,
+                          bad rows split off into a rejected-rows report
+    parse_picks_file()    all of the above plus the start_time_pt/date/model
+                          columns the evaluators need
+
+The evaluate scripts for every sport load picks through parse_picks_file().
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from llm_response import INVISIBLE_CHARS, rejoin_reason
+from picks_checkpoint import read_picks_checkpointed
+from timestamps import EPOCH_SUFFIX, PACIFIC, to_epoch_ms, from_epoch_ms, local_dates
+
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+
+# Column kinds: 'int' and 'float' are numeric, 'flag' is a 0/1 bet indicator,
+# 'time' is an ISO timestamp and 'text' is kept as-is.
+PICK_SCHEMA = {
+    'rank': 'int',
+    'game_id': 'int',
+    'start_time': 'time',
+    'match': 'text',
+    'pick': 'text',
+    'odds': 'float',
+    'units': 'float',
+    'confidence_pct': 'float',
+    'reason': 'text',
+    'predicted_score': 'text',
+    'bet_home_spread': 'flag',
+    'bet_home_ml': 'flag',
+    'bet_away_spread': 'flag',
+    'bet_away_ml': 'flag',
+    'bet_over': 'flag',
+    'bet_under': 'flag',
+    'home_money_line': 'float',
+    'away_money_line': 'float',
+    'tie_money_line': 'float',
+    'total_score': 'float',
+    'over_odds': 'float',
+    'under_odds': 'float',
+    'home_spread': 'float',
+    'home_spread_odds': 'float',
+    'away_spread': 'float',
+    'away_spread_odds': 'float',
+    'timestamp': 'time',
+}
+
+# A row missing any of these can't be evaluated and is rejected
+REQUIRED_COLUMNS = ['game_id', 'start_time', 'pick', 'odds', 'units']
+
+FLAG_VALUES = {'1': 1, '1.0': 1, 'true': 1, 'yes': 1, '0': 0, '0.0': 0, 'false': 0, 'no': 0}
+
+
+def _repair_row(fields: list, header: list):
+    """Re-joins a reason that was split by unquoted commas; drops rows that can't be repaired."""
+    if 'reason' not in header or len(fields) <= len(header):
+        return None
+    return rejoin_reason(fields, header)
+
+
+def _raw_read_args(picks_file: Path) -> dict:
+    """pd.read_csv options that read every cell as text and repair over-long rows."""
+    with open(picks_file, 'r', encoding='utf-8') as f:
+        header = [c.strip() for c in INVISIBLE_CHARS.sub('', f.readline()).strip().split(',')]
+
+    def on_bad_line(fields):
+        repaired = _repair_row(fields, header)
+        if repaired is None:
+            print(f"Warning: skipping malformed row in {picks_file.name}: {','.join(fields)[:80]}")
+        return repaired
+
+    return dict(dtype=str, keep_default_na=False, engine='python', on_bad_lines=on_bad_line)
+
+
+def read_picks_raw(picks_file) -> pd.DataFrame:
+    """
+    Reads a pick file with every cell as text.
+
+    Rows with too many fields are repaired by folding the extras back into
+    the reason column. Rows that still don't fit are skipped with a warning.
+
+    Args:
+        picks_file (str or Path): The data/bets/<sport>_bets_<model>.txt file.
+
+    Returns:
+        pd.DataFrame: The raw rows; empty cells are ''.
+    """
+    picks_file = Path(picks_file)
+    return pd.read_csv(picks_file, **_raw_read_args(picks_file))
+
+
+def clean_pick_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Strips invisible characters and whitespace from column names.
+
+    Columns that end up with the same name (e.g. 'timestamp' and
+    'timestamp\\u200b') are coalesced into one, taking the first non-empty value.
+    """
+    df = df.copy()
+    df.columns = df.columns.astype(str).str.replace(INVISIBLE_CHARS, '', regex=True).str.strip()
+    if not df.columns.duplicated().any():
+        return df
+
+    merged = {}
+    for col in df.columns.unique():
+        block = df.loc[:, df.columns == col]
+        if block.shape[1] == 1:
+            merged[col] = block.iloc[:, 0]
+        else:
+            merged[col] = block.replace('', np.nan).bfill(axis=1).iloc[:, 0].fillna('')
+    return pd.DataFrame(merged, index=df.index)
+
+
+def normalize_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Parses timestamps in any of the formats the models produce, in one call.
+
+    Args:
+        values (pd.Series): Timestamp strings (may contain invisible characters).
+
+    Returns:
+        pd.Series: UTC datetimes; NaT where the value couldn't be parsed.
+    """
+    cleaned = values.astype(str).str.replace(INVISIBLE_CHARS, '', regex=True).str.strip()
+    return pd.to_datetime(cleaned.replace({'': None, 'nan': None, 'NaT': None}),
+                          format='mixed', utc=True, errors='coerce')
+
+
+def parse_picks(df_raw: pd.DataFrame, schema: dict = PICK_SCHEMA):
+    """
+    Normalizes raw pick rows against the schema in one vectorized pass.
+
+    - invisible characters are stripped from every cell
+    - repeated header rows are dropped
+    - 'int'/'float' columns become numbers ('+150' -> 150), 'flag' columns 0/1,
+      'time' columns UTC datetimes plus an int64 '<column>_epoch' column
+      (see timestamps); start_time is also kept as a canonical ISO string
+    - rows missing a REQUIRED_COLUMNS value are moved to the rejected report
+
+    Args:
+        df_raw (pd.DataFrame): Raw text rows, e.g. from read_picks_raw().
+        schema (dict): Column name -> kind.
+
+    Returns:
+        tuple: (df_picks, df_rejected). df_rejected holds the raw values of the
+               rejected rows plus a 'reject_reason' column.
+    """
+    df = clean_pick_columns(df_raw)
+    df = df.reindex(columns=list(dict.fromkeys(list(schema) + list(df.columns))), fill_value='')
+
+    text_cols = df.columns[df.dtypes == object]
+    df[text_cols] = df[text_cols].apply(lambda col: col.astype(str).str.replace(INVISIBLE_CHARS, '', regex=True).str.strip())
+
+    df = df.loc[df['start_time'] != 'start_time']
+    df_text = df.copy()
+
+    for col, kind in schema.items():
+        if kind in ('int', 'float'):
+            df[col] = pd.to_numeric(df[col].str.lstrip('+').replace({'': None, 'N/A': None}), errors='coerce')
+            if kind == 'int':
+                df[col] = df[col].round().astype('Int64')
+        elif kind == 'flag':
+            df[col] = df[col].str.lower().map(FLAG_VALUES).fillna(0).astype(int)
+        elif kind == 'time':
+            df[col] = normalize_timestamps(df[col])
+
+    missing = df[REQUIRED_COLUMNS].isna() | (df[REQUIRED_COLUMNS] == '')
+    bad = missing.any(axis=1)
+    df_rejected = df_text.loc[bad].copy()
+    df_rejected['reject_reason'] = missing.loc[bad].apply(
+        lambda row: 'missing or invalid ' + ', '.join(row.index[row]), axis=1
+    ) if bad.any() else pd.Series(dtype=str)
+
+    df = df.loc[~bad].reset_index(drop=True)
+    # Parsed once here; joins and date grouping downstream use the epoch columns
+    for col, kind in schema.items():
+        if kind == 'time':
+            df[col + EPOCH_SUFFIX] = to_epoch_ms(df[col])
+    df['start_time'] = df['start_time'].dt.strftime(TIMESTAMP_FORMAT)
+    return df, df_rejected.reset_index(drop=True)
+
+
+def parse_picks_file(picks_file, model_name: str = None, checkpoint: bool = True):
+    """
+    Loads and normalizes one data/bets pick file for evaluation.
+
+    Adds start_time_pt (Pacific time), date (Pacific date) and, when a model
+    name is given, model, all derived from start_time_epoch without parsing
+    start_time again. Rejected rows are summarized on stdout.
+
+    Args:
+        picks_file (str or Path): The data/bets/<sport>_bets_<model>.txt file.
+        model_name (str, optional): Value for the model column.
+        checkpoint (bool): Read and normalize only newly appended rows; the
+                           normalized rows are cached (see picks_checkpoint).
+
+    Returns:
+        tuple: (df_picks, df_rejected).
+
+    Raises:
+        FileNotFoundError: If the picks file doesn't exist.
+    """
+    picks_file = Path(picks_file)
+    if checkpoint:
+        df_picks, df_rejected = read_picks_checkpointed(
+            picks_file, transform=parse_picks, **_raw_read_args(picks_file))
+    else:
+        df_picks, df_rejected = parse_picks(read_picks_raw(picks_file))
+
+    df_picks['start_time_pt'] = from_epoch_ms(df_picks['start_time_epoch'], PACIFIC)
+    df_picks['date'] = local_dates(df_picks['start_time_epoch'], PACIFIC)
+    if model_name is not None:
+        df_picks['model'] = model_name
+
+    if not df_rejected.empty:
+        print(f"Warning: rejected {len(df_rejected)} rows in {Path(picks_file).name}:")
+        print(df_rejected['reject_reason'].value_counts().to_string())
+
+    return df_picks, df_rejected
+
+
+def classify_pick_type(picks: pd.Series) -> pd.Series:
+    """
+    Classifies pick strings into 'total', 'moneyline' or 'spread'.
+
+    Picks look like "Over 231.5", "Thunder ML" or "Thunder -15.5"; anything
+    that isn't an over/under or a moneyline is treated as a spread.
+
+    Args:
+        picks (pd.Series): The 'pick' column of a picks or evaluated DataFrame.
+
+    Returns:
+        pd.Series: The bet type for each pick.
+    """
+    picks = picks.astype(str).str.strip()
+    is_total = picks.str.match(r'(?i)(?:over|under)\b')
+    is_ml = picks.str.contains(r'(?i)\b(?:ml|moneyline)$', regex=True)
+    return pd.Series(np.select([is_total, is_ml], ['total', 'moneyline'], default='spread'), index=picks.index)
@@ -0,0 +1,100 @@
+"""
+No-vig probabilities, fair odds and hold for the upcoming-games dataset.
+
+Dataset 1 only carries the book's American odds, so a model that wants the
+market's view of a game has to strip the vig itself. add_fair_prices() does
+that for every game at once and adds the results to df_agg:
+
+    <leg>_fair_prob_last   win probability with the overround removed (%)
+    <leg>_fair_odds_last   the same probability as American odds
+    <market>_hold_last     the book's margin on the market (%)
+
+Each market's implied probabilities (utils.implied_probability) are stacked
+into one (games, legs) array and divided by their row sum, which is the
+proportional method of removing the vig. The moneyline is three-way wherever
+tie_money_line is quoted (soccer) and two-way elsewhere. A market missing
+a leg, or whose probabilities add up to less than 100%, gets NaN throughout.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import implied_probability
+
+
+# market -> [(leg, odds column)]
+MARKETS = {
+    'ml': [('home_ml', 'home_money_line'), ('away_ml', 'away_money_line'), ('tie_ml', 'tie_money_line')],
+    'spread': [('home_spread', 'home_spread_odds'), ('away_spread', 'away_spread_odds')],
+    'total': [('over', 'over_odds'), ('under', 'under_odds')],
+}
+# Legs that are only part of the market when they are quoted
+OPTIONAL_LEGS = {'tie_ml'}
+
+
+def fair_american_odds(probability) -> np.ndarray:
+    """
+    American odds with no margin for an array of win probabilities (0 to 1).
+
+    Returns:
+        np.ndarray: float64 odds; NaN for probabilities outside (0, 1).
+    """
+    p = np.asarray(probability, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        odds = np.where(p >= 0.5, -100.0 * p / (1.0 - p), 100.0 * (1.0 - p) / p)
+    odds[~((p > 0) & (p < 1))] = np.nan
+    return odds
+
+
+def remove_vig(implied: np.ndarray, required: np.ndarray):
+    """
+    Normalizes each row of implied probabilities to sum to 1.
+
+    Args:
+        implied (np.ndarray): (rows, legs) implied probabilities; NaN where a leg isn't quoted.
+        required (np.ndarray): (legs,) bool, legs that must be quoted for the row to be priced.
+
+    Returns:
+        tuple: ((rows, legs) fair probabilities, (rows,) hold as a fraction).
+    """
+    quoted = np.isfinite(implied)
+    priced = quoted[:, required].all(axis=1)
+    overround = np.where(quoted, implied, 0.0).sum(axis=1)
+    # Below 100% a leg is missing (a soccer moneyline quoted without its draw)
+    overround[~priced | (overround < 1)] = np.nan
+
+    fair = implied / overround[:, None]
+    fair[~quoted] = np.nan
+    return fair, 1.0 - 1.0 / overround
+
+
+def add_fair_prices(df_agg: pd.DataFrame, suffix: str = '_last', decimals: int = 1) -> pd.DataFrame:
+    """
+    Adds no-vig probabilities, fair odds and hold for every market in df_agg.
+
+    Args:
+        df_agg (pd.DataFrame): Aggregated upcoming games (aggregate_betting_data output).
+        suffix (str): Which aggregate to price; the model bets the '_last' odds.
+        decimals (int): Decimals kept for probabilities and hold (percent).
+
+    Returns:
+        pd.DataFrame: A copy of df_agg with the pricing columns added. Markets
+                      without odds columns in df_agg are skipped.
+    """
+    df = df_agg.copy()
+    for market, legs in MARKETS.items():
+        legs = [(leg, col + suffix) for leg, col in legs if col + suffix in df.columns]
+        required = np.array([leg not in OPTIONAL_LEGS for leg, _ in legs])
+        if not required.any() or len(legs) < 2:
+            continue
+
+        odds = np.column_stack([pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+                                for _, col in legs])
+        fair, hold = remove_vig(implied_probability(odds), required)
+        fair_odds = fair_american_odds(fair)
+
+        for i, (leg, _) in enumerate(legs):
+            df[f'{leg}_fair_prob{suffix}'] = np.round(fair[:, i] * 100, decimals)
+            df[f'{leg}_fair_odds{suffix}'] = np.round(fair_odds[:, i])
+        df[f'{market}_hold{suffix}'] = np.round(hold * 100, decimals)
+    return df
@@ -0,0 +1,255 @@
+"""
+Compact, token-efficient serialization of the upcoming-games dataset (Dataset 1).
+
+df_agg.to_csv() repeats long column names, prints averages to 15 decimal
+places, carries display-only columns (home_team_spread, start_time_pt) and
+columns that are empty or identical for every game. compact_dataset_csv()
+writes the same information in far fewer tokens:
+
+- a column legend that maps short aliases back to the dataset column names
+  the prompt instructions refer to (e.g. hml_l = home_money_line_last)
+- `_avg` values rounded, `_first` and `_last` values kept exact
+- ticket/money shares and money_vs_tickets rounded to SHARE_STEP points,
+  since they move by a point or two on nearly every scrape
+- all-null columns dropped and constant columns hoisted into a single line
+- games grouped under their start_time instead of repeating it on every row
+
+dataset_frame() is the formatting step on its own: the exact values that get
+rendered. prompt_manifest.lines_fingerprint() hashes it, so a prompt is
+re-rendered exactly when its Dataset 1 would change.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+METRIC_ALIASES = {
+    'num_bets': 'bets',
+    'home_money_line': 'hml',
+    'home_ml_ticket_pct': 'hml_tk',
+    'home_ml_money_pct': 'hml_mn',
+    'away_money_line': 'aml',
+    'away_ml_ticket_pct': 'aml_tk',
+    'away_ml_money_pct': 'aml_mn',
+    'tie_money_line': 'tml',
+    'tie_ml_ticket_pct': 'tml_tk',
+    'tie_ml_money_pct': 'tml_mn',
+    'total_score': 'tot',
+    'over_odds': 'ov_o',
+    'under_odds': 'un_o',
+    'over_ticket_pct': 'ov_tk',
+    'over_money_pct': 'ov_mn',
+    'under_ticket_pct': 'un_tk',
+    'under_money_pct': 'un_mn',
+    'home_spread': 'hsp',
+    'home_spread_odds': 'hsp_o',
+    'home_spread_ticket_pct': 'hsp_tk',
+    'home_spread_money_pct': 'hsp_mn',
+    'away_spread': 'asp',
+    'away_spread_odds': 'asp_o',
+    'away_spread_ticket_pct': 'asp_tk',
+    'away_spread_money_pct': 'asp_mn',
+    # Added by pricing.add_fair_prices()
+    'home_ml_fair_prob': 'hml_fp',
+    'home_ml_fair_odds': 'hml_fo',
+    'away_ml_fair_prob': 'aml_fp',
+    'away_ml_fair_odds': 'aml_fo',
+    'tie_ml_fair_prob': 'tml_fp',
+    'tie_ml_fair_odds': 'tml_fo',
+    'ml_hold': 'ml_hold',
+    'home_spread_fair_prob': 'hsp_fp',
+    'home_spread_fair_odds': 'hsp_fo',
+    'away_spread_fair_prob': 'asp_fp',
+    'away_spread_fair_odds': 'asp_fo',
+    'spread_hold': 'sp_hold',
+    'over_fair_prob': 'ov_fp',
+    'over_fair_odds': 'ov_fo',
+    'under_fair_prob': 'un_fp',
+    'under_fair_odds': 'un_fo',
+    'total_hold': 'tot_hold',
+    # Added by signals.add_signals()
+    'ml_money_vs_tickets': 'ml_mvt',
+    'ml_line_move': 'ml_mv',
+    'ml_rlm': 'ml_rlm',
+    'ml_steam': 'ml_stm',
+    'ml_steam_mins': 'ml_stm_min',
+    'spread_money_vs_tickets': 'sp_mvt',
+    'spread_line_move': 'sp_mv',
+    'spread_rlm': 'sp_rlm',
+    'spread_steam': 'sp_stm',
+    'spread_steam_mins': 'sp_stm_min',
+    'total_money_vs_tickets': 'tot_mvt',
+    'total_line_move': 'tot_mv',
+    'total_rlm': 'tot_rlm',
+    'total_steam': 'tot_stm',
+    'total_steam_mins': 'tot_stm_min',
+}
+
+SUFFIX_ALIASES = {'_first': '_f', '_avg': '_a', '_last': '_l'}
+
+# Columns that only restate other columns in a friendlier form
+REDUNDANT_COLUMNS = ['home_team_spread', 'away_team_spread', 'start_time_pt']
+
+ID_COLUMNS = ['game_id', 'home_team', 'away_team']
+
+# Metric stems that are shares of tickets or money, in percentage points
+SHARE_STEMS = ('_ticket_pct', '_money_pct', '_money_vs_tickets')
+SHARE_STEP = 5
+
+
+def column_alias(col: str, metric_aliases: dict = METRIC_ALIASES) -> str:
+    """
+    Returns the short alias for an aggregated column, e.g. 'home_money_line_last' -> 'hml_l'.
+
+    Columns without a known metric stem are returned unchanged.
+    """
+    for suffix, short_suffix in SUFFIX_ALIASES.items():
+        if col.endswith(suffix):
+            stem = col[:-len(suffix)]
+            if stem in metric_aliases:
+                return metric_aliases[stem] + short_suffix
+            return col
+    return metric_aliases.get(col, col)
+
+
+def format_exact(values: pd.Series) -> pd.Series:
+    """
+    Formats numbers exactly, without the trailing '.0' pandas adds to whole floats.
+
+    -110.0 becomes '-110', -3.5 stays '-3.5' and missing values become ''.
+    Non-numeric values are passed through as strings.
+    """
+    numeric = pd.to_numeric(values, errors='coerce')
+    if numeric.isna().all() and values.notna().any():
+        return values.astype(str)
+
+    arr = numeric.to_numpy(dtype=float)
+    is_whole = np.isfinite(arr) & (arr == np.round(arr))
+    out = numeric.astype(str).astype(object)
+    out[is_whole] = arr[is_whole].astype(np.int64).astype(str)
+    out[numeric.isna()] = ''
+    return out
+
+
+def format_rounded(values: pd.Series, decimals: int) -> pd.Series:
+    """Rounds numbers to the given number of decimals and formats them like format_exact()."""
+    numeric = pd.to_numeric(values, errors='coerce').round(decimals)
+    return format_exact(numeric)
+
+
+def format_share(values: pd.Series, step: int = SHARE_STEP) -> pd.Series:
+    """Rounds percentage-point shares to the nearest step and formats them like format_exact()."""
+    numeric = pd.to_numeric(values, errors='coerce')
+    return format_exact((numeric / step).round() * step)
+
+
+def _is_share(col: str) -> bool:
+    for suffix in SUFFIX_ALIASES:
+        if col.endswith(suffix):
+            col = col[:-len(suffix)]
+            break
+    return col.endswith(SHARE_STEMS)
+
+
+def dataset_frame(df: pd.DataFrame, avg_decimals: int = 1, time_col: str = 'start_time',
+                  share_step: int = SHARE_STEP) -> pd.DataFrame:
+    """
+    Every column of Dataset 1 formatted as text, exactly as compact_dataset_csv() renders it.
+
+    Display-only columns are dropped and games are sorted by start time.
+    """
+    df = df.drop(columns=[c for c in REDUNDANT_COLUMNS if c in df.columns])
+    df = df.sort_values([time_col, 'game_id'] if 'game_id' in df.columns else [time_col])
+
+    formatted = {}
+    for col in df.columns:
+        if col == time_col:
+            formatted[col] = pd.to_datetime(df[col], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        elif col in ID_COLUMNS:
+            formatted[col] = df[col].astype(str)
+        elif _is_share(col):
+            formatted[col] = format_share(df[col], share_step)
+        elif col.endswith('_avg'):
+            formatted[col] = format_rounded(df[col], avg_decimals)
+        else:
+            formatted[col] = format_exact(df[col])
+    return pd.DataFrame(formatted, index=df.index)
+
+
+def compact_dataset_csv(df: pd.DataFrame, avg_decimals: int = 1,
+                        time_col: str = 'start_time',
+                        metric_aliases: dict = METRIC_ALIASES,
+                        share_step: int = SHARE_STEP) -> str:
+    """
+    Serializes an aggregated upcoming-games DataFrame into the compact prompt format.
+
+    Args:
+        df (pd.DataFrame): Output of aggregate_betting_data(), one row per game.
+        avg_decimals (int): Decimals kept for `_avg` columns.
+        time_col (str): Column used to group games; it is printed once per group.
+        metric_aliases (dict): Mapping of metric stems to short aliases.
+        share_step (int): Ticket/money shares are rounded to this many points.
+
+    Returns:
+        str: The compact dataset text to place in the prompt.
+    """
+    if df.empty:
+        return "No upcoming games."
+
+    df_fmt = dataset_frame(df, avg_decimals, time_col, share_step)
+
+    # --- Drop empty columns and hoist constant ones ---
+    value_cols = [c for c in df_fmt.columns if c != time_col and c not in ID_COLUMNS]
+    dropped, constants, kept = [], {}, []
+    for col in value_cols:
+        unique_vals = df_fmt[col].unique()
+        if len(unique_vals) == 1 and unique_vals[0] == '':
+            dropped.append(col)
+        elif len(unique_vals) == 1 and len(df_fmt) > 1:
+            constants[col] = unique_vals[0]
+        else:
+            kept.append(col)
+
+    row_cols = [c for c in ID_COLUMNS if c in df_fmt.columns] + kept
+
+    # --- Legend ---
+    legend_cols = [c for c in row_cols + list(constants) if column_alias(c, metric_aliases) != c]
+    stems = {}
+    for col in legend_cols:
+        alias = column_alias(col, metric_aliases)
+        for suffix, short_suffix in SUFFIX_ALIASES.items():
+            if col.endswith(suffix) and alias.endswith(short_suffix):
+                stems[alias[:-len(short_suffix)]] = col[:-len(suffix)]
+                break
+        else:
+            stems[alias] = col
+
+    lines = [
+        "Column legend: short name = dataset column. Suffix _f/_a/_l = _first/_avg/_last "
+        f"(e.g. hml_l = home_money_line_last). _avg is rounded to {avg_decimals} decimal(s); "
+        "_f and _l are exact and _l is the value to copy into picks. "
+        f"Ticket/money shares (_tk, _mn, _mvt) are rounded to the nearest {share_step} points.",
+        ', '.join(f"{alias}={stem}" for alias, stem in stems.items()),
+    ]
+    if constants:
+        lines.append("Same for every game: " + ', '.join(
+            f"{column_alias(col, metric_aliases)}={val}" for col, val in constants.items()))
+    if dropped:
+        lines.append("Not available for these games: " + ', '.join(dropped))
+
+    # --- Rows, grouped by start time ---
+    lines.append(f"Games grouped by {time_col} (UTC):")
+    lines.append(','.join(column_alias(c, metric_aliases) for c in row_cols))
+
+    rows = df_fmt[row_cols].copy()
+    for col in ['home_team', 'away_team']:
+        if col in rows.columns:
+            needs_quotes = rows[col].str.contains(',', regex=False)
+            rows.loc[needs_quotes, col] = '"' + rows.loc[needs_quotes, col] + '"'
+    row_text = rows[row_cols[0]].str.cat([rows[c] for c in row_cols[1:]], sep=',')
+
+    for start_time, group_text in row_text.groupby(df_fmt[time_col], sort=False):
+        lines.append(f"{time_col}={start_time}")
+        lines.extend(group_text.tolist())
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,374 @@
+"""
+Prompt size and token-count instrumentation.
+
+Every rendered prompt gets a small JSON manifest describing how big it is:
+byte size, an estimated token count, per-section sizes (instructions,
+Dataset 1, Dataset 2), the dataset row counts and how long it took to render.
+One row per render is also appended to a trend CSV so prompt bloat can be
+spotted over time, per sport and model, before anything is sent to an LLM.
+
+Token counts are estimates from a local heuristic. Heuristics live in the
+TOKENIZERS registry so a better one can be plugged in with register_tokenizer().
+
+Manifests also store a fingerprint of the prompt's inputs (upcoming lines,
+model history and template version). A builder checks it before rendering and
+leaves the prompt file alone when nothing it depends on has changed; the
+manifest records why a prompt was or wasn't rewritten.
+"""
+
+import datetime
+import hashlib
+import json
+import math
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from prompt_format import dataset_frame
+
+MANIFEST_DIR = Path('./data/prompt_stats')
+TREND_FILE = MANIFEST_DIR / 'prompt_trend.csv'
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def _tokens_from_chars(text: str) -> int:
+    """Roughly 4 characters per token, the usual rule of thumb for English text."""
+    return math.ceil(len(text) / 4)
+
+
+def _tokens_from_words(text: str) -> int:
+    """Counts words and punctuation marks; long words are split every 6 characters."""
+    return sum(math.ceil(len(tok) / 6) for tok in _WORD_PATTERN.findall(text))
+
+
+TOKENIZERS = {
+    'chars': _tokens_from_chars,
+    'words': _tokens_from_words,
+}
+
+DEFAULT_TOKENIZER = 'words'
+
+def register_tokenizer(name: str, func) -> None:
+    """
+    Registers a token-count heuristic under the given name.
+
+    Args:
+        name (str): Name used to select the tokenizer (e.g. 'tiktoken').
+        func (callable): Function taking the prompt text and returning an int.
+    """
+    TOKENIZERS[name] = func
+
+
+def estimate_tokens(text: str, tokenizer: str = DEFAULT_TOKENIZER) -> int:
+    """
+    Estimates the number of tokens in a piece of text.
+
+    Args:
+        text (str): The text to measure.
+        tokenizer (str): Name of a registered tokenizer heuristic.
+
+    Returns:
+        int: The estimated token count.
+
+    Raises:
+        ValueError: If the tokenizer name is not registered.
+    """
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{tokenizer}'. Available: {sorted(TOKENIZERS)}")
+    return int(TOKENIZERS[tokenizer](text or ''))
+
+
+def build_prompt_manifest(sport: str, model: str, prompt: str, sections: dict,
+                          dataset_1_rows: int, dataset_2_rows: int,
+                          render_seconds: float, prompt_file=None,
+                          tokenizer: str = DEFAULT_TOKENIZER,
+                          fingerprint: dict = None, change_reason: str = None) -> dict:
+    """
+    Builds the size manifest for a single rendered prompt.
+
+    Args:
+        sport (str): The sport prefix (e.g. 'nba').
+        model (str): The model the prompt is for (e.g. 'claude').
+        prompt (str): The fully rendered prompt text.
+        sections (dict): Mapping of section name to the text inserted into the
+                         prompt (e.g. {'dataset_1': ..., 'dataset_2': ...}).
+                         Whatever is left over is reported as 'instructions'.
+        dataset_1_rows (int): Number of upcoming-game rows in Dataset 1.
+        dataset_2_rows (int): Number of historical rows in Dataset 2.
+        render_seconds (float): Wall time spent rendering the prompt.
+        prompt_file (str or Path, optional): Where the prompt was written.
+        tokenizer (str): Name of the tokenizer heuristic to use.
+        fingerprint (dict, optional): Output of prompt_fingerprint() for the inputs.
+        change_reason (str, optional): Why the prompt was (re)rendered.
+
+    Returns:
+        dict: The manifest.
+    """
+    total_bytes = len(prompt.encode('utf-8'))
+    total_tokens = estimate_tokens(prompt, tokenizer)
+
+    section_stats = {}
+    for name, text in sections.items():
+        section_stats[name] = {
+            'bytes': len(text.encode('utf-8')),
+            'est_tokens': estimate_tokens(text, tokenizer),
+        }
+
+    # The instructions are everything in the prompt that isn't a dataset.
+    section_stats['instructions'] = {
+        'bytes': total_bytes - sum(s['bytes'] for s in section_stats.values()),
+        'est_tokens': max(total_tokens - sum(s['est_tokens'] for s in section_stats.values()), 0),
+    }
+
+    now_str = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    return {
+        'sport': sport,
+        'model': model,
+        'generated_at': now_str,
+        'checked_at': now_str,
+        'changed': True,
+        'change_reason': change_reason,
+        'fingerprint': fingerprint['fingerprint'] if fingerprint else None,
+        'fingerprint_parts': {k: v for k, v in fingerprint.items() if k != 'fingerprint'} if fingerprint else None,
+        'prompt_file': str(prompt_file) if prompt_file is not None else None,
+        'tokenizer': tokenizer,
+        'bytes': total_bytes,
+        'est_tokens': total_tokens,
+        'dataset_1_rows': int(dataset_1_rows),
+        'dataset_2_rows': int(dataset_2_rows),
+        'render_seconds': round(float(render_seconds), 4),
+        'sections': section_stats,
+    }
+
+
+def manifest_path(sport: str, model: str, manifest_dir: Path = MANIFEST_DIR) -> Path:
+    """Returns the path of the JSON manifest for a sport/model prompt."""
+    return Path(manifest_dir) / f'{sport}_prompt_{model}.json'
+
+
+def write_prompt_manifest(manifest: dict, manifest_dir: Path = MANIFEST_DIR,
+                          trend_file: Path = TREND_FILE) -> Path:
+    """
+    Writes a manifest as JSON and appends it as one row to the trend CSV.
+
+    Args:
+        manifest (dict): A manifest from build_prompt_manifest().
+        manifest_dir (Path): Directory for the per-prompt JSON manifests.
+        trend_file (Path): CSV that collects one row per rendered prompt.
+
+    Returns:
+        Path: The path of the JSON manifest.
+    """
+    path = manifest_path(manifest['sport'], manifest['model'], manifest_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Flatten the sections so every render is a single CSV row
+    row = {k: v for k, v in manifest.items() if not isinstance(v, dict)}
+    for name, stats in manifest['sections'].items():
+        row[f'{name}_bytes'] = stats['bytes']
+        row[f'{name}_est_tokens'] = stats['est_tokens']
+    df_row = pd.DataFrame([row])
+
+    trend_file = Path(trend_file)
+    trend_file.parent.mkdir(parents=True, exist_ok=True)
+    if trend_file.is_file():
+        # Keep the existing column order so appended rows line up
+        existing_cols = pd.read_csv(trend_file, nrows=0).columns.tolist()
+        new_cols = [c for c in df_row.columns if c not in existing_cols]
+        if new_cols:
+            df_trend = pd.concat([pd.read_csv(trend_file), df_row], ignore_index=True)
+            df_trend.to_csv(trend_file, index=False)
+        else:
+            df_row.reindex(columns=existing_cols).to_csv(trend_file, mode='a', header=False, index=False)
+    else:
+        df_row.to_csv(trend_file, index=False)
+
+    return path
+
+
+def record_prompt_manifest(sport: str, model: str, prompt: str, sections: dict,
+                           dataset_1_rows: int, dataset_2_rows: int,
+                           render_seconds: float, prompt_file=None,
+                           tokenizer: str = DEFAULT_TOKENIZER,
+                           fingerprint: dict = None, change_reason: str = None) -> dict:
+    """
+    Builds and writes the manifest for a rendered prompt and prints a one-line summary.
+
+    Takes the same arguments as build_prompt_manifest().
+
+    Returns:
+        dict: The manifest that was written.
+    """
+    manifest = build_prompt_manifest(
+        sport, model, prompt, sections,
+        dataset_1_rows, dataset_2_rows, render_seconds,
+        prompt_file=prompt_file, tokenizer=tokenizer,
+        fingerprint=fingerprint, change_reason=change_reason
+    )
+    path = write_prompt_manifest(manifest)
+
+    section_summary = ', '.join(f"{name}={stats['est_tokens']}" for name, stats in manifest['sections'].items())
+    print(f"Prompt manifest: {manifest['bytes']} bytes, ~{manifest['est_tokens']} tokens ({section_summary}), "
+          f"rendered in {manifest['render_seconds']:.3f}s -> {path}")
+
+    return manifest
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def text_fingerprint(text: str) -> str:
+    """Returns a short content hash of a string."""
+    return _sha256((text or '').encode('utf-8'))
+
+
+def file_fingerprint(path) -> str:
+    """Returns a short content hash of a file, e.g. a builder script as its template version."""
+    with open(path, 'rb') as f:
+        return _sha256(f.read())
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Returns a short content hash of a DataFrame's columns and values."""
+    row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+    return _sha256(','.join(map(str, df.columns)).encode('utf-8') + row_hashes.tobytes())
+
+
+def lines_fingerprint(df: pd.DataFrame, compact_dataset: bool = True) -> str:
+    """
+    Returns a content hash of Dataset 1 as it will be rendered from an
+    aggregated upcoming-games DataFrame.
+
+    In compact mode that is prompt_format.dataset_frame(), the same columns
+    with the same rounding compact_dataset_csv() uses, so a scrape that only
+    moves values below their rendered precision leaves the fingerprint
+    unchanged. Otherwise every column is rendered with to_csv() and hashed as is.
+    """
+    if df.empty:
+        return frame_fingerprint(df.iloc[:, :0])
+    return frame_fingerprint(dataset_frame(df) if compact_dataset else df)
+
+
+def prompt_fingerprint(upcoming_lines: str, history: str, template_version: str) -> dict:
+    """
+    Builds the fingerprint of a prompt's inputs.
+
+    Args:
+        upcoming_lines (str): Hash of the upcoming lines (see lines_fingerprint()).
+        history (str): Hash of the model's historical results (see frame_fingerprint()).
+        template_version (str): Hash or version label of the prompt template.
+
+    Returns:
+        dict: The hash of each input plus a combined 'fingerprint'.
+    """
+    parts = {
+        'upcoming_lines': upcoming_lines,
+        'history': history,
+        'template': template_version,
+    }
+    parts['fingerprint'] = _sha256('|'.join(f"{k}={v}" for k, v in parts.items()).encode('utf-8'))
+    return parts
+
+
+def load_prompt_manifest(sport: str, model: str, manifest_dir: Path = MANIFEST_DIR):
+    """Returns the stored manifest for a sport/model prompt, or None if there isn't one."""
+    path = manifest_path(sport, model, manifest_dir)
+    if not path.is_file():
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def check_prompt_fingerprint(sport: str, model: str, fingerprint: dict, prompt_file,
+                             manifest_dir: Path = MANIFEST_DIR):
+    """
+    Compares a fingerprint against the one stored with the last rendered prompt.
+
+    Args:
+        sport (str): The sport prefix.
+        model (str): The model name.
+        fingerprint (dict): Output of prompt_fingerprint() for the current inputs.
+        prompt_file (str or Path): The prompt file the builder would write.
+        manifest_dir (Path): Directory holding the JSON manifests.
+
+    Returns:
+        tuple: (changed, reason). `changed` is False only when the prompt file
+               exists and every input hash matches; `reason` names what changed.
+    """
+    manifest = load_prompt_manifest(sport, model, manifest_dir)
+    if manifest is None or not manifest.get('fingerprint'):
+        return True, 'no previous manifest'
+    if not Path(prompt_file).is_file():
+        return True, 'prompt file missing'
+    if manifest['fingerprint'] == fingerprint['fingerprint']:
+        return False, 'inputs unchanged'
+
+    previous = manifest.get('fingerprint_parts') or {}
+    changed_parts = [k for k, v in fingerprint.items() if k != 'fingerprint' and previous.get(k) != v]
+    return True, 'changed: ' + ', '.join(changed_parts or ['fingerprint'])
+
+
+def record_prompt_unchanged(sport: str, model: str, reason: str,
+                            manifest_dir: Path = MANIFEST_DIR) -> dict:
+    """
+    Marks the stored manifest as not rewritten and prints why.
+
+    The manifest is only written when its status or reason changes, so repeated
+    builds with unchanged inputs leave the file (and the committed tree) alone.
+
+    Returns:
+        dict: The stored manifest.
+    """
+    manifest = load_prompt_manifest(sport, model, manifest_dir) or {'sport': sport, 'model': model}
+    if manifest.get('changed') is not False or manifest.get('change_reason') != reason:
+        manifest['changed'] = False
+        manifest['change_reason'] = reason
+
+        path = manifest_path(sport, model, manifest_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    print(f"Prompt for {sport}/{model} not rewritten ({reason}); last rendered {manifest.get('generated_at')}")
+    return manifest
+
+
+def summarize_prompt_trend(trend_file: Path = TREND_FILE) -> pd.DataFrame:
+    """
+    Summarizes the trend CSV by sport, model and day.
+
+    Returns:
+        pd.DataFrame: Renders, average size and token counts per sport/model/day,
+                      plus the change in average tokens versus the previous day.
+    """
+    trend_file = Path(trend_file)
+    if not trend_file.is_file():
+        return pd.DataFrame()
+
+    df = pd.read_csv(trend_file)
+    df['day'] = pd.to_datetime(df['generated_at'], utc=True).dt.date
+
+    agg_config = {
+        'renders': ('est_tokens', 'size'),
+        'bytes': ('bytes', 'mean'),
+        'est_tokens': ('est_tokens', 'mean'),
+        'dataset_1_rows': ('dataset_1_rows', 'mean'),
+        'dataset_2_rows': ('dataset_2_rows', 'mean'),
+    }
+    for col in df.columns:
+        if col.endswith('_est_tokens') and col != 'est_tokens':
+            agg_config[col] = (col, 'mean')
+
+    df_summary = df.groupby(['sport', 'model', 'day']).agg(**agg_config).reset_index()
+    df_summary['est_tokens_change'] = df_summary.groupby(['sport', 'model'])['est_tokens'].diff()
+
+    return df_summary
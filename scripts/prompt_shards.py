@@ -0,0 +1,313 @@
+"""
+Sharded prompts: split the upcoming slate into small prompts that can be sent
+to a model in parallel, then merge the returned pick blocks back together.
+
+Each shard carries only a few games (or one start-time window) plus a compact
+summary of the model's history instead of the full Dataset 2, so every call
+is short and the shards finish much faster than one prompt with 30 games.
+
+Shard prompts are written to prompts/shards/<sport>_prompt_<model>_<NN>.txt,
+each with its own manifest (model '<model>_<NN>'). Like a single prompt, a
+shard whose games, history and template hash the same as last time is not
+rendered again, and shards beyond the current count are removed along with
+their manifests.
+
+merge_shard_responses() takes the raw responses for those shards, pulls out
+each CSV block, re-ranks the picks across shards by confidence and appends
+them to data/bets/<sport>_bets_<model>.txt.
+"""
+
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calibration import compact_calibration
+from leaderboards import LEADERBOARD_DIR, leaderboard_view, load_leaderboard
+from llm_response import PICK_COLUMNS, parse_pick_block, append_picks_csv
+from prompt_format import compact_dataset_csv
+from prompt_manifest import (MANIFEST_DIR, check_prompt_fingerprint, lines_fingerprint, prompt_fingerprint,
+                             record_prompt_manifest, record_prompt_unchanged, text_fingerprint)
+
+
+SHARD_DIR = Path('./prompts/shards')
+PICKS_DIR = Path('./data/bets')
+
+
+def shard_games(df_games: pd.DataFrame, games_per_shard: int = 1,
+                window_minutes: int = None) -> list:
+    """
+    Splits the upcoming games into shards.
+
+    Args:
+        df_games (pd.DataFrame): Aggregated upcoming games, one row per game.
+        games_per_shard (int): Maximum number of games in a shard.
+        window_minutes (int, optional): If set, games are first grouped into
+                                        start-time windows of this length and
+                                        shards never span two windows.
+
+    Returns:
+        list: A list of DataFrames, in start-time order.
+    """
+    if df_games.empty:
+        return []
+
+    df_games = df_games.sort_values('start_time')
+    start_times = pd.to_datetime(df_games['start_time'], utc=True)
+
+    if window_minutes:
+        window_key = start_times.dt.floor(f'{int(window_minutes)}min')
+    else:
+        window_key = pd.Series(0, index=df_games.index)
+
+    # Position of each game within its window decides which shard it lands in
+    position = df_games.groupby(window_key.values).cumcount().to_numpy()
+    chunk = position // max(int(games_per_shard), 1)
+    shard_key = df_games.groupby([window_key.values, chunk], sort=False).ngroup().to_numpy()
+
+    return [df_games.iloc[np.flatnonzero(shard_key == k)] for k in range(shard_key.max() + 1)]
+
+
+def compact_history(df_hist: pd.DataFrame, recent_picks: int = 15, df_calibration: pd.DataFrame = None,
+                    sport: str = None, leaderboard_dir: Path = LEADERBOARD_DIR) -> str:
+    """
+    Summarizes a model's evaluated picks into a short history header for shard prompts.
+
+    The summaries by bet type and by units are the model's rows of the stored
+    model_bet_type and model_units leaderboards when sport is given, so the
+    history isn't grouped again on every build. Without them (or before the
+    first evaluation has built them) they're computed from df_hist.
+
+    Args:
+        df_hist (pd.DataFrame): The model's rows from <sport>_bet_picks_evaluated.csv.
+        recent_picks (int): Number of most recent graded picks to list verbatim.
+        df_calibration (pd.DataFrame, optional): The sport's stored calibration bins
+                                                 (calibration.load_calibration); adds the
+                                                 model's reliability table.
+        sport (str, optional): The sport prefix whose leaderboards to read.
+        leaderboard_dir (Path): Directory holding the leaderboard views.
+
+    Returns:
+        str: Summary tables by bet type and by units, the calibration table if
+             given, followed by the recent picks.
+    """
+    if df_hist is None or df_hist.empty:
+        return "No historical data yet"
+
+    model = df_hist['model'].iloc[0]
+
+    def summarize(view):
+        df_view = None
+        if sport is not None:
+            try:
+                df_view = load_leaderboard(sport, view, leaderboard_dir)
+            except FileNotFoundError:
+                pass
+        if df_view is None:
+            df_view = leaderboard_view(df_hist, view)
+        df_view = df_view.loc[df_view['model'] == model].drop(columns='model')
+        return df_view.round({'units_staked': 2, 'units_won': 2, 'roi': 1, 'win_rate': 1})
+
+    df_recent = df_hist.sort_values(['date', 'rank']).tail(recent_picks)[
+        ['date', 'match', 'pick', 'odds', 'units', 'bet_result', 'bet_payout']
+    ].round({'bet_payout': 2})
+
+    sections = [
+        "Summary by bet type:",
+        summarize('model_bet_type').to_csv(index=False),
+        "Summary by units:",
+        summarize('model_units').to_csv(index=False),
+    ]
+    if df_calibration is not None:
+        calibration_string = compact_calibration(df_calibration, model)
+        if calibration_string:
+            sections.append(calibration_string)
+
+    return '\n'.join(sections + [
+        f"Most recent {len(df_recent)} graded picks:",
+        df_recent.to_csv(index=False),
+    ])
+
+
+def shard_prompt_path(sport: str, model: str, shard_index: int, shard_dir: Path = SHARD_DIR) -> Path:
+    """Returns the prompt file path for one shard."""
+    return Path(shard_dir) / f'{sport}_prompt_{model}_{shard_index:02d}.txt'
+
+
+def _shard_index(path: Path, sport: str, model: str):
+    match = re.fullmatch(rf'{re.escape(sport)}_prompt_{re.escape(model)}_(\d+)', path.stem)
+    return int(match.group(1)) if match else None
+
+
+def remove_shard_prompts(sport: str, model: str, shard_dir: Path = SHARD_DIR, keep: int = 0,
+                         manifest_dir: Path = MANIFEST_DIR) -> int:
+    """
+    Deletes the shard prompts of a sport/model and their manifests, e.g. when
+    the builder goes back to a single prompt or there are no games to prompt for.
+
+    Args:
+        keep (int): Keep shards 1..keep; only those numbered above it are removed,
+                    e.g. when the slate now needs fewer shards.
+
+    Returns:
+        int: The number of shard prompts removed.
+    """
+    removed = 0
+    for stale in Path(shard_dir).glob(f'{sport}_prompt_{model}_*.txt'):
+        index = _shard_index(stale, sport, model)
+        if index is not None and index > keep:
+            stale.unlink()
+            removed += 1
+    for stale in Path(manifest_dir).glob(f'{sport}_prompt_{model}_*.json'):
+        index = _shard_index(stale, sport, model)
+        if index is not None and index > keep:
+            stale.unlink()
+    if removed:
+        print(f"Removed {removed} stale shard prompts for {sport}/{model} from {shard_dir}")
+    return removed
+
+
+def write_prompt_shards(sport: str, model: str, df_games: pd.DataFrame, df_hist: pd.DataFrame,
+                        render_fn, games_per_shard: int = 1, window_minutes: int = None,
+                        compact_dataset: bool = True, shard_dir: Path = SHARD_DIR,
+                        df_calibration: pd.DataFrame = None, prompt_file=None,
+                        template_version: str = '') -> list:
+    """
+    Renders and writes one prompt per shard of the upcoming slate.
+
+    A shard is only rendered again when its games, the history header or the
+    template changed since its manifest was written (check_prompt_fingerprint).
+    Shards numbered beyond the current count are removed with their manifests,
+    and so is the single prompt file of an earlier unsharded build (prompt_file).
+
+    Args:
+        sport (str): The sport prefix.
+        model (str): The model name.
+        df_games (pd.DataFrame): Aggregated upcoming games, one row per game.
+        df_hist (pd.DataFrame): The model's evaluated pick history.
+        render_fn (callable): Takes (df1_string, df2_string) and returns the prompt text.
+        games_per_shard (int): Maximum number of games per shard.
+        window_minutes (int, optional): Keep shards within start-time windows of this length.
+        compact_dataset (bool): Serialize games with compact_dataset_csv().
+        shard_dir (Path): Directory for the shard prompt files.
+        df_calibration (pd.DataFrame, optional): Calibration bins to summarize in the history.
+        prompt_file (str or Path, optional): The unsharded prompt file, removed if present.
+        template_version (str): Hash or version label of the prompt template.
+
+    Returns:
+        list: The paths of the current shard prompts, rewritten or not.
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    if prompt_file is not None and Path(prompt_file).is_file():
+        Path(prompt_file).unlink()
+        print(f"Removed unsharded prompt file: {prompt_file}")
+
+    history_string = compact_history(df_hist, df_calibration=df_calibration, sport=sport)
+    shards = shard_games(df_games, games_per_shard, window_minutes)
+    remove_shard_prompts(sport, model, shard_dir, keep=len(shards))
+
+    paths = []
+    rendered = 0
+    for i, df_shard in enumerate(shards, start=1):
+        shard_model = f'{model}_{i:02d}'
+        path = shard_prompt_path(sport, model, i, shard_dir)
+        paths.append(path)
+
+        fingerprint = prompt_fingerprint(
+            lines_fingerprint(df_shard, compact_dataset),
+            text_fingerprint(history_string),
+            f"{template_version}:{'compact' if compact_dataset else 'csv'}"
+        )
+        changed, change_reason = check_prompt_fingerprint(sport, shard_model, fingerprint, path)
+        if not changed:
+            record_prompt_unchanged(sport, shard_model, change_reason)
+            continue
+
+        render_start = time.perf_counter()
+        if compact_dataset:
+            df1_string = compact_dataset_csv(df_shard)
+        else:
+            df1_string = df_shard.to_csv(index=False)
+        prompt = render_fn(df1_string, history_string)
+        render_seconds = time.perf_counter() - render_start
+
+        with open(path, 'w') as f:
+            f.write(prompt)
+        rendered += 1
+
+        record_prompt_manifest(
+            sport, shard_model, prompt,
+            sections={'dataset_1': df1_string, 'dataset_2': history_string},
+            dataset_1_rows=len(df_shard),
+            dataset_2_rows=len(df_hist),
+            render_seconds=render_seconds,
+            prompt_file=path,
+            fingerprint=fingerprint,
+            change_reason=change_reason
+        )
+
+    print(f"Wrote {rendered} of {len(paths)} shard prompts for {sport}/{model} to {shard_dir}")
+    return paths
+
+
+def _is_response_file(response) -> bool:
+    """A Path, or a str that names an existing file rather than holding response text."""
+    if isinstance(response, Path):
+        return True
+    if not isinstance(response, str) or '\n' in response:
+        return False
+    try:
+        return Path(response).is_file()
+    except OSError:
+        return False
+
+
+def merge_shard_responses(sport: str, model: str, responses: list,
+                          picks_dir: Path = PICKS_DIR) -> pd.DataFrame:
+    """
+    Merges the CSV pick blocks from several shard responses into one picks file.
+
+    Picks are re-ranked across all shards by confidence_pct (highest first)
+    and appended to data/bets/<sport>_bets_<model>.txt, writing the header
+    only if the file is new.
+
+    Args:
+        sport (str): The sport prefix.
+        model (str): The model name.
+        responses (list): Raw response texts, or paths to files containing them.
+        picks_dir (Path): Directory holding the <sport>_bets_<model>.txt files.
+
+    Returns:
+        pd.DataFrame: The merged picks that were appended.
+    """
+    frames = []
+    for response in responses:
+        if _is_response_file(response):
+            response = Path(response).read_text(encoding='utf-8')
+        df_picks = parse_pick_block(response)
+        if df_picks is None:
+            print("Warning: no CSV pick block found in a shard response. Skipping it.")
+            continue
+        frames.append(df_picks)
+
+    if not frames:
+        print(f"No picks found in {len(responses)} shard responses for {sport}/{model}.")
+        return pd.DataFrame(columns=PICK_COLUMNS)
+
+    df_merged = pd.concat(frames, ignore_index=True).reindex(columns=PICK_COLUMNS, fill_value='')
+
+    # Re-rank across shards; each shard numbered its own picks from 1
+    confidence = pd.to_numeric(df_merged['confidence_pct'], errors='coerce').fillna(0)
+    shard_rank = pd.to_numeric(df_merged['rank'], errors='coerce').fillna(0)
+    order = np.lexsort((shard_rank.to_numpy(), -confidence.to_numpy()))
+    df_merged = df_merged.iloc[order].reset_index(drop=True)
+    df_merged['rank'] = np.arange(1, len(df_merged) + 1)
+
+    picks_file = Path(picks_dir) / f'{sport}_bets_{model}.txt'
+    append_picks_csv(df_merged, picks_file)
+
+    print(f"Merged {len(df_merged)} picks from {len(frames)} shard responses into {picks_file}")
+    return df_merged
@@ -0,0 +1,168 @@
+"""
+Game results store shared by every sport's evaluator.
+
+Results live where they always have, in data/evaluated/<sport>_game_results.csv,
+but are held in memory indexed by game_id (one row per game), and the file is
+rewritten deduplicated instead of appended to. Next to it,
+data/evaluated/<sport>_results_dates.csv records every date that has been
+fetched and whether all of that date's games were final at the time:
+
+    date,games,final_games,complete,fetched_at
+    20251105,11,11,True,2025-11-06T09:00:00Z
+
+A date marked complete is never fetched again, even if one of its games
+never produced a usable result (cancelled, postponed). Looking up the results
+for a batch of picks is a reindex on game_id, so it costs O(picks) whatever
+the size of the history.
+
+    store = ResultsStore.load('nba')
+    store.update(store.missing_dates(df_picks), fetch_date)
+    df_result = store.results_for(df_picks['game_id'])
+    store.save()
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from timestamps import ensure_epoch
+
+
+RESULTS_DIR = Path('./data/evaluated')
+
+RESULT_COLUMNS = ['game_id', 'start_time', 'league_name', 'home_team', 'away_team', 'home_score', 'away_score', 'status']
+# start_time parsed once to int64 epoch milliseconds (see timestamps), saved with the results
+DATE_COLUMNS = ['date', 'games', 'final_games', 'complete', 'fetched_at']
+
+# Statuses after which a game's result won't change any more
+FINAL_STATUSES = {'complete', 'cancelled', 'canceled', 'postponed', 'abandoned'}
+
+
+class ResultsStore:
+    """
+    Complete game results for one sport, indexed by game_id, with per-date completeness.
+    """
+
+    def __init__(self, sport: str, df_results: pd.DataFrame = None, df_dates: pd.DataFrame = None,
+                 results_dir: Path = RESULTS_DIR):
+        self.sport = sport
+        self.results_dir = Path(results_dir)
+        self.results = self._index(df_results if df_results is not None else pd.DataFrame(columns=RESULT_COLUMNS))
+        self.dates = (df_dates if df_dates is not None else pd.DataFrame(columns=DATE_COLUMNS)).set_index('date')
+        self.changed = False
+
+    @property
+    def results_file(self) -> Path:
+        return self.results_dir / f'{self.sport}_game_results.csv'
+
+    @property
+    def dates_file(self) -> Path:
+        return self.results_dir / f'{self.sport}_results_dates.csv'
+
+    @classmethod
+    def load(cls, sport: str, results_dir: Path = RESULTS_DIR):
+        """
+        Reads the results and date files for a sport; missing files start empty.
+        """
+        results_dir = Path(results_dir)
+        try:
+            df_results = pd.read_csv(results_dir / f'{sport}_game_results.csv')
+        except FileNotFoundError:
+            print(f"Results file for {sport} not found. A new one will be created.")
+            df_results = None
+        try:
+            df_dates = pd.read_csv(results_dir / f'{sport}_results_dates.csv', dtype={'date': str})
+        except FileNotFoundError:
+            df_dates = None
+
+        store = cls(sport, df_results, df_dates, results_dir)
+        # Files written before this store kept every appended duplicate and had no epoch column
+        store.changed = df_results is not None and (
+            len(df_results) != len(store.results) or 'start_time_epoch' not in df_results.columns
+        )
+        return store
+
+    @staticmethod
+    def _index(df: pd.DataFrame) -> pd.DataFrame:
+        df = ensure_epoch(df, 'start_time')
+        df['game_id'] = pd.to_numeric(df['game_id'], errors='coerce')
+        df = df.dropna(subset=['game_id'])
+        df['game_id'] = df['game_id'].astype('int64')
+        # Later rows are newer fetches of the same game
+        return df.drop_duplicates(subset='game_id', keep='last').set_index('game_id', drop=False).rename_axis(None)
+
+    def is_complete(self, game_ids) -> pd.Series:
+        """Whether each game has a complete result, as a boolean Series aligned with game_ids."""
+        game_ids = pd.Series(game_ids)
+        status = self.results['status'].reindex(pd.to_numeric(game_ids, errors='coerce'))
+        return pd.Series((status == 'complete').to_numpy(), index=game_ids.index)
+
+    def complete_dates(self) -> set:
+        return set(self.dates.index[self.dates['complete'].astype(str) == 'True'])
+
+    def missing_dates(self, df_picks: pd.DataFrame) -> list:
+        """
+        The dates (YYYYMMDD) that still need fetching for a batch of picks.
+
+        A date is needed if one of its picks has no complete result yet and
+        the date hasn't been marked complete.
+        """
+        needed = df_picks.loc[~self.is_complete(df_picks['game_id']).to_numpy() & df_picks['date'].notna()]
+        dates = set(needed['date'].astype(str).str.replace('-', ''))
+        return sorted(dates - self.complete_dates())
+
+    def update(self, dates: list, fetch_date) -> pd.DataFrame:
+        """
+        Fetches each date once and stores its complete results.
+
+        Args:
+            dates (list): Dates as YYYYMMDD strings.
+            fetch_date (callable): date -> DataFrame of all that date's games with a status column.
+
+        Returns:
+            pd.DataFrame: The complete results that were new or changed.
+        """
+        fetched_at = pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%dT%H:%M:%SZ')
+        new_frames = []
+        for date in dates:
+            df_games = fetch_date(date)
+            if df_games is None or df_games.empty or 'status' not in df_games.columns:
+                # Nothing came back (no games or a failed request); try again next run
+                continue
+
+            # The API returns a row per market; count each game once
+            df_games = df_games.drop_duplicates(subset='game_id', keep='last')
+            final = df_games['status'].isin(FINAL_STATUSES)
+            self.dates.loc[date, ['games', 'final_games', 'complete', 'fetched_at']] = [
+                len(df_games), int(final.sum()), bool(final.all()), fetched_at
+            ]
+            self.changed = True
+
+            df_complete = df_games.loc[df_games['status'] == 'complete']
+            new_frames.append(df_complete[[c for c in RESULT_COLUMNS if c in df_complete.columns]])
+
+        if not new_frames:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        df_new = self._index(pd.concat(new_frames, ignore_index=True))
+        self.results = pd.concat([self.results.drop(index=df_new.index, errors='ignore'), df_new])
+        print(f"Stored {len(df_new)} complete {self.sport} results from {len(new_frames)} dates")
+        return df_new
+
+    def results_for(self, game_ids) -> pd.DataFrame:
+        """
+        The stored results for the given games (games without a result are left out).
+        """
+        ids = pd.Index(pd.to_numeric(pd.Series(game_ids), errors='coerce').dropna().astype('int64').unique())
+        return self.results.loc[ids.intersection(self.results.index)].reset_index(drop=True)
+
+    def save(self):
+        """
+        Writes the deduplicated results and the date flags, if anything changed.
+        """
+        if not self.changed:
+            return
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.results.sort_values(['start_time_epoch', 'game_id']).to_csv(self.results_file, index=False)
+        self.dates.sort_index().reset_index().reindex(columns=DATE_COLUMNS).to_csv(self.dates_file, index=False)
+        self.changed = False
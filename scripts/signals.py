@@ -0,0 +1,218 @@
+"""
+Sharp-money and line-movement signals per game and market.
+
+The line store has, for every snapshot, each market's line and the share of
+tickets and of money on the home side (moneyline, spread) or the over
+(total). This module turns that history into signals, always from the
+home / over point of view:
+
+    money_vs_tickets  money_pct - ticket_pct; positive means fewer, bigger
+                      bets on the home side / over than the ticket count suggests
+    line_move         how far the line has moved toward the home side / over
+                      since the first snapshot (implied probability points
+                      for the moneyline, points for spreads and totals)
+    rlm               reverse line movement: at least RLM_TICKET_SHARE% of the
+                      tickets are on one side but the line has moved at least
+                      RLM_MIN_MOVE toward the other
+    steam             a move of at least STEAM_MIN_MOVE between two
+                      snapshots no more than STEAM_WINDOW apart; +1 toward
+                      the home side / over, -1 away
+
+A ticket and money share of 0/0 is the book's placeholder before any bets
+are in, not an even split, so those snapshots get no money_vs_tickets or rlm.
+
+compute_signals() computes every snapshot's signals with one sort and
+groupby transforms over the whole history. update_signals() caches them per
+snapshot in data/checkpoints/<sport>_signals.csv, a local cache (git-ignored)
+that the build workflows carry between runs with actions/cache and that is
+rebuilt whenever it's missing. Only games whose snapshots changed
+since the last run are recomputed, because the line store drops unchanged
+snapshots as new ones arrive. game_signals() reduces the snapshots to one
+row per game for df_agg (add_signals).
+
+Usage:
+    python scripts/signals.py [sport]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from timestamps import ensure_epoch, to_epoch_ms
+from utils import implied_probability
+
+
+LINES_DIR = Path('./data/bets_db')
+SIGNALS_DIR = Path('./data/checkpoints')
+
+# market -> line, ticket and money columns of the home side / over
+MARKETS = {
+    'ml': {'line': 'home_money_line', 'tickets': 'home_ml_ticket_pct', 'money': 'home_ml_money_pct'},
+    'spread': {'line': 'home_spread', 'tickets': 'home_spread_ticket_pct', 'money': 'home_spread_money_pct'},
+    'total': {'line': 'total_score', 'tickets': 'over_ticket_pct', 'money': 'over_money_pct'},
+}
+SIGNALS = ['money_vs_tickets', 'line_move', 'rlm', 'steam']
+
+# Moneyline moves in implied probability points, spreads and totals in points
+RLM_MIN_MOVE = {'ml': 2.0, 'spread': 0.5, 'total': 0.5}
+RLM_TICKET_SHARE = 60
+STEAM_MIN_MOVE = {'ml': 3.0, 'spread': 1.0, 'total': 1.0}
+STEAM_WINDOW = pd.Timedelta(minutes=30)
+
+KEY_COLUMNS = ['game_id', 'date_scraped_epoch', 'start_time_epoch']
+SIGNAL_COLUMNS = KEY_COLUMNS + [f'{market}_{signal}' for market in MARKETS for signal in SIGNALS]
+# The per-game columns game_signals() adds to df_agg
+GAME_SIGNAL_COLUMNS = [f'{market}_{signal}' for market in MARKETS for signal in SIGNALS + ['steam_mins']]
+
+
+def _position(df: pd.DataFrame, market: str) -> np.ndarray:
+    """The line of a market as a number that grows as it moves toward the home side / over."""
+    line = pd.to_numeric(df[MARKETS[market]['line']], errors='coerce').to_numpy(dtype=np.float64)
+    if market == 'ml':
+        return implied_probability(line) * 100
+    if market == 'spread':
+        # A more negative home spread means the home side is more favored
+        return -line
+    return line
+
+
+def compute_signals(df_lines: pd.DataFrame) -> pd.DataFrame:
+    """
+    Signals for every snapshot of every game in df_lines.
+
+    Args:
+        df_lines (pd.DataFrame): Line store rows (any subset of whole games).
+
+    Returns:
+        pd.DataFrame: SIGNAL_COLUMNS, one row per snapshot, sorted by game and time.
+    """
+    df = ensure_epoch(df_lines, 'start_time')
+    df = df.assign(
+        game_id=pd.to_numeric(df['game_id'], errors='coerce').astype('Int64'),
+        date_scraped_epoch=to_epoch_ms(df['date_scraped']),
+    ).dropna(subset=['game_id', 'date_scraped_epoch'])
+    df = df.sort_values(['game_id', 'date_scraped_epoch'], kind='stable').reset_index(drop=True)
+
+    out = df[KEY_COLUMNS].copy()
+    games = df.groupby('game_id', sort=False)
+    scraped = df['date_scraped_epoch'].astype('int64')
+    gap = (scraped - games['date_scraped_epoch'].shift()).to_numpy(dtype=np.float64)
+    in_window = gap <= STEAM_WINDOW // pd.Timedelta(milliseconds=1)
+
+    for market, cols in MARKETS.items():
+        position = pd.Series(_position(df, market), index=df.index)
+        tickets = pd.to_numeric(df[cols['tickets']], errors='coerce')
+        money = pd.to_numeric(df[cols['money']], errors='coerce')
+        # 0/0 means no bets are in yet, not an even split
+        no_data = (tickets == 0) & (money == 0)
+        tickets = tickets.mask(no_data)
+        money = money.mask(no_data)
+
+        by_game = position.groupby(df['game_id'], sort=False)
+        move = (position - by_game.transform('first')).to_numpy()
+        step = (position - by_game.shift()).to_numpy()
+
+        tickets_home = tickets.to_numpy(dtype=np.float64)
+        rlm = (((tickets_home >= RLM_TICKET_SHARE) & (move <= -RLM_MIN_MOVE[market]))
+               | ((tickets_home <= 100 - RLM_TICKET_SHARE) & (move >= RLM_MIN_MOVE[market])))
+        steam = np.where(in_window & (np.abs(step) >= STEAM_MIN_MOVE[market]), np.sign(step), 0)
+
+        out[f'{market}_money_vs_tickets'] = (money - tickets).to_numpy()
+        out[f'{market}_line_move'] = np.round(move, 2)
+        out[f'{market}_rlm'] = rlm.astype(int)
+        out[f'{market}_steam'] = steam.astype(int)
+    return out[SIGNAL_COLUMNS]
+
+
+def signals_file(sport: str, signals_dir: Path = SIGNALS_DIR) -> Path:
+    return Path(signals_dir) / f'{sport}_signals.csv'
+
+
+def update_signals(sport: str, df_lines: pd.DataFrame, signals_dir: Path = SIGNALS_DIR) -> pd.DataFrame:
+    """
+    Brings the sport's cached snapshot signals up to date with the line store.
+
+    A game is recomputed when its number of snapshots or its latest snapshot
+    differs from the cache; games no longer in df_lines are dropped.
+
+    Args:
+        sport (str): The sport prefix.
+        df_lines (pd.DataFrame): The line store as just saved by the builder.
+        signals_dir (Path): Directory for the signals cache.
+
+    Returns:
+        pd.DataFrame: The signals for every snapshot in df_lines.
+    """
+    path = signals_file(sport, signals_dir)
+    try:
+        df_cached = pd.read_csv(path, dtype={'game_id': 'Int64'})
+    except FileNotFoundError:
+        df_cached = pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+    game_ids = pd.to_numeric(df_lines['game_id'], errors='coerce').astype('Int64')
+    current = pd.DataFrame({'game_id': game_ids, 'date_scraped_epoch': to_epoch_ms(df_lines['date_scraped'])})
+    current = current.dropna().groupby('game_id')['date_scraped_epoch'].agg(['size', 'max'])
+    cached = df_cached.groupby('game_id')['date_scraped_epoch'].agg(['size', 'max'])
+
+    unchanged = current.eq(cached.reindex(current.index)).astype('boolean').fillna(False).all(axis=1)
+    stale = current.index[~unchanged.to_numpy(dtype=bool)]
+    keep = df_cached['game_id'].isin(current.index.difference(stale))
+
+    if len(stale) == 0 and keep.all():
+        return df_cached
+
+    df_new = compute_signals(df_lines.loc[game_ids.isin(stale).to_numpy()])
+    frames = [df for df in [df_cached.loc[keep], df_new] if not df.empty]
+    df_signals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SIGNAL_COLUMNS)
+    df_signals = df_signals.sort_values(['game_id', 'date_scraped_epoch'], kind='stable').reset_index(drop=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df_signals.to_csv(path, index=False)
+    print(f"Updated signals for {len(stale)} {sport} games in {path}")
+    return df_signals
+
+
+def game_signals(df_signals: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per game: the latest snapshot's signals and the game's steam moves.
+
+    Returns:
+        pd.DataFrame: game_id and, per market, <market>_money_vs_tickets,
+                      <market>_line_move and <market>_rlm as of the latest
+                      snapshot, <market>_steam (net steam moves, positive
+                      toward the home side / over) and <market>_steam_mins
+                      (minutes before the start of the latest steam move).
+    """
+    games = df_signals.groupby('game_id', sort=False)
+    out = games[[f'{market}_{signal}' for market in MARKETS for signal in ['money_vs_tickets', 'line_move', 'rlm']]].last()
+
+    mins_before = (df_signals['start_time_epoch'] - df_signals['date_scraped_epoch']) / 60_000
+    for market in MARKETS:
+        steam = df_signals[f'{market}_steam']
+        out[f'{market}_steam'] = steam.groupby(df_signals['game_id'], sort=False).sum()
+        out[f'{market}_steam_mins'] = mins_before.where(steam != 0).groupby(df_signals['game_id'], sort=False).last().round()
+
+    return out[GAME_SIGNAL_COLUMNS].reset_index()
+
+
+def add_signals(df_agg: pd.DataFrame, df_game_signals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the per-game signals (game_signals) to the upcoming-games dataset.
+    """
+    df_game_signals = df_game_signals.assign(game_id=df_game_signals['game_id'].astype('int64'))
+    df = df_agg.assign(_game=pd.to_numeric(df_agg['game_id'], errors='coerce'))
+    df = df.merge(df_game_signals.rename(columns={'game_id': '_game'}), on='_game', how='left')
+    return df.drop(columns='_game').set_axis(df_agg.index)
+
+
+if __name__ == '__main__':
+    sport = sys.argv[1] if len(sys.argv) > 1 else 'nba'
+    df_lines = pd.read_csv(LINES_DIR / f'{sport}_bets_db.csv')
+    df_signals = update_signals(sport, df_lines)
+    df_games = game_signals(df_signals)
+
+    print(f"{len(df_signals)} snapshots of {len(df_games)} {sport} games")
+    for market in MARKETS:
+        print(f"{market:>6}: {(df_games[f'{market}_rlm'] == 1).sum()} games with reverse line movement, "
+              f"{(df_games[f'{market}_steam'] != 0).sum()} with steam")
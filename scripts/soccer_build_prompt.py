@@ -1,5 +1,6 @@
 import pandas as pd
 import datetime
+import time
 from pathlib import Path
 import os
 import sys
@@ -8,7 +9,13 @@ import sys
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir / 'scripts'))
 
-from utils import get_todays_games, filter_data_on_change, aggregate_betting_data, get_complete_game_results, process_and_save_evaluated_bets
+from utils import get_todays_games, filter_data_on_change, aggregate_betting_data
+from prompt_manifest import record_prompt_manifest, record_prompt_unchanged, check_prompt_fingerprint, prompt_fingerprint, lines_fingerprint, frame_fingerprint, file_fingerprint, text_fingerprint
+from calibration import calibration_file, compact_calibration, load_calibration
+from prompt_format import compact_dataset_csv
+from prompt_shards import write_prompt_shards, remove_shard_prompts
+from pricing import add_fair_prices
+from signals import add_signals, game_signals, update_signals
 
 HEADERS = {
     'Authority': 'api.actionnetwork',
@@ -18,155 +25,11 @@ HEADERS = {
 }
 
 
-def build_soccer_prompt(model_name, hours_ahead = 2):
+def render_soccer_prompt(df1_string, df2_string):
     """
-    Build soccer betting prompt for a specific model.
-    
-    Args:
-        model_name: Model name (chatgpt, claude, deepseek, gemini, grok)
-    
-    Returns:
-        DataFrame with aggregated betting data
+    Renders the soccer prompt around Dataset 1 (upcoming games) and Dataset 2 (historical results).
     """
-    
-    # Ensure directories exist (parent directory since we're in scripts/)
-    Path('./data/bets').mkdir(parents=True, exist_ok=True)
-    Path('./data/bets_db').mkdir(parents=True, exist_ok=True)
-    Path('./data/evaluated').mkdir(parents=True, exist_ok=True)
-    
-    # Load existing soccer bets database
-    db_path = Path('./data/bets_db/soccer_bets_db.csv')
-    if db_path.exists():
-        df_all = pd.read_csv(db_path)
-    else:
-        df_all = pd.DataFrame()
-        print("Creating new soccer_bets_db.csv")
-
-    # Sport is soccer
-    sport = 'soccer'
-
-    # Get today's date and next few days
-    today = datetime.date.today()
-    date_format = '%Y%m%d'
-    
-    # Get games for next 4 days
-    date_str_list = [
-        (today + datetime.timedelta(days=-1)).strftime(date_format),
-        (today + datetime.timedelta(days=0)).strftime(date_format),  # Today
-        (today + datetime.timedelta(days=1)).strftime(date_format),  # Tomorrow
-        (today + datetime.timedelta(days=2)).strftime(date_format),  # Day after
-        (today + datetime.timedelta(days=3)).strftime(date_format)   # 3 days out
-    ]
-
-    # Fetch today's games
-    df = get_todays_games(sport, date_str_list, HEADERS)
-    
-    if df.empty or 'status' not in df.columns:
-        print(f"No soccer games found or status column missing. Returning empty.")
-        return pd.DataFrame()
-
-    df['date_scraped'] = datetime.datetime.now()
-
-    # Only keep scheduled games
-    df = df.loc[df['status'] == 'scheduled']
-
-    # Combine with historical data
-    if not df_all.empty:
-        df_all = pd.concat([df_all, df])
-        df_all['date_scraped'] = pd.to_datetime(df_all['date_scraped'])
-
-        # Filter for changes in key metrics
-        dimension_cols = ['game_id', 'home_team', 'away_team']
-        metric_cols = ['home_money_line', 'away_money_line', 'total_score', 'tie_money_line']
-        filtered_df = filter_data_on_change(df_all, dimension_cols, metric_cols)
-        
-        print(f"Total records: {df_all.index.size}")
-        print(f"Filtered records: {filtered_df.index.size}")
-    else:
-        filtered_df = df
-
-    # Save updated database
-    filtered_df.to_csv('./data/bets_db/soccer_bets_db.csv', index=False)
-
-    # Aggregate betting data
-    group_by_columns = ['game_id', 'home_team', 'away_team', 'start_time']
-    metric_columns = [
-        'num_bets', 'home_money_line', 'home_ml_ticket_pct', 'home_ml_money_pct',
-        'away_money_line', 'away_ml_ticket_pct', 'away_ml_money_pct',
-        'tie_money_line', 'tie_ml_ticket_pct', 'tie_ml_money_pct',  # Soccer-specific
-        'total_score', 'over_odds', 'under_odds', 'over_ticket_pct', 'over_money_pct',
-        'under_ticket_pct', 'under_money_pct', 'home_spread', 'home_spread_odds',
-        'home_spread_ticket_pct', 'home_spread_money_pct', 'away_spread',
-        'away_spread_odds', 'away_spread_ticket_pct', 'away_spread_money_pct'
-    ]
-
-    # Convert start_time_pt to datetime
-    filtered_df['start_time_pt'] = pd.to_datetime(filtered_df['start_time_pt'])
-
-    # Get next games list
-    next_games_list = df['game_id'].unique().tolist()
-
-    # Get top 30 upcoming games
-    games_list = (filtered_df.loc[filtered_df['game_id'].isin(next_games_list)]
-                  .groupby(['game_id', 'home_team', 'away_team', 'start_time_pt'])
-                  .agg(rec_count=('date_scraped', 'size'))
-                  .sort_values('start_time_pt', ascending=True)
-                  .head(30)
-                  .reset_index()['game_id'].tolist())
-
-    # Aggregate betting data for selected games
-    df_agg = aggregate_betting_data(
-        filtered_df.loc[filtered_df['game_id'].isin(games_list)],
-        group_by_columns,
-        metric_columns
-    )
-
-    df_agg = df_agg.sort_values('start_time', ascending=True)
-
-    # Create spread columns for display
-    df_agg['home_team_spread'] = df_agg['home_team'] + " " + df_agg['home_spread_last'].apply(lambda x: f"{x:+.1f}")
-    df_agg['away_team_spread'] = df_agg['away_team'] + " " + df_agg['away_spread_last'].apply(lambda x: f"{x:+.1f}")
-
-    # Load historical results for this model
-    hist_path = Path(f'./data/evaluated/soccer_bet_picks_evaluated.csv')
-    if hist_path.exists():
-        df_hist = pd.read_csv(hist_path)
-        df_hist = df_hist.loc[df_hist['model'] == model_name]
-    else:
-        df_hist = pd.DataFrame()
-        print(f"No historical data found for {model_name}")
-
-    # Filter df_agg to only include games starting within the next 2 hours
-    current_time = pd.Timestamp.now(tz='America/Los_Angeles')
-    n_hours_from_now = current_time + pd.Timedelta(hours=hours_ahead)
-    
-    # Convert start_time to datetime if not already
-    df_agg['start_time'] = pd.to_datetime(df_agg['start_time'])
-    df_agg['start_time_pt'] = df_agg['start_time'].dt.tz_convert('America/Los_Angeles')
-    
-    # Filter for games starting within next n hours
-    df_agg_filtered = df_agg[df_agg['start_time_pt'] <= n_hours_from_now].copy()
-    
-    print(f"Total games in df_agg: {len(df_agg)}")
-    print(f"Games starting within next {hours_ahead} hours: {len(df_agg_filtered)}")
-
-    # Define the prompt file path
-    prompt_path = Path(f"./prompts/soccer_prompt_{model_name}.txt")
-    
-    # If no games in the next 2 hours, delete the prompt file if it exists and return
-    if len(df_agg_filtered) == 0:
-        print(f"No games starting within {hours_ahead} hours for {model_name}. Skipping prompt generation.")
-        if prompt_path.exists():
-            prompt_path.unlink()
-            print(f"Removed existing prompt file: {prompt_path}")
-        return df_agg
-
-    # Convert DataFrames to CSV strings for prompt
-    df1_string = df_agg_filtered.to_csv(index=False)
-    df2_string = df_hist.to_csv(index=False) if not df_hist.empty else "No historical data yet"
-
-    # Build the prompt (soccer-specific, following NBA/NCAAB structure)
-    prompt = f"""
+    return f"""
 You are my expert Soccer betting adviser.
 I will provide you with two datasets:
 
@@ -218,6 +81,18 @@ If picking Arsenal +1.5: bet_away_spread=1 (Arsenal is away)
 - `away_spread_last` and `away_spread_odds_last` for away team spread
 - `total_score_last`, `over_odds_last`, `under_odds_last` for totals
 
+**Market pricing (already computed, don't redo the vig math):**
+- `<side>_fair_prob_last`: no-vig win probability (%) for each side (the moneyline is three-way home/draw/away when a draw is quoted), e.g. `home_ml_fair_prob_last`, `over_fair_prob_last`
+- `<side>_fair_odds_last`: the same probability as fair American odds
+- `ml_hold_last`, `spread_hold_last`, `total_hold_last`: the book's margin (%) on each market
+- Compare your own win probability to the fair probability to find value, but always copy the actual odds from the columns above
+
+**Market signals (already computed from the line history, home side / over point of view):**
+- `<market>_money_vs_tickets`: money % minus ticket % on the home side / over; positive = bigger bets than the ticket count suggests
+- `<market>_line_move`: line movement toward the home side / over since the first snapshot
+- `<market>_rlm`: 1 when the line moved against the ticket majority (reverse line movement)
+- `<market>_steam` and `<market>_steam_mins`: net sharp line jumps (positive = toward home / over) and minutes before start of the latest one
+
 **NEVER:**
 - Invent odds
 - Approximate odds
@@ -402,120 +277,232 @@ Here is the historical dataset of your betting advice and results:
 {df2_string}
     """
 
-    print('-------')
-    print('-------')
-    print('-------')
-    print('-------')
-    print(prompt)
 
-    # Write prompt to file
-    prompt_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(prompt_path, "w") as f:
-        f.write(prompt)
-    
-    print(f"\nPrompt file created: {prompt_path}")
-
-    return df_agg
-
-
-def process_soccer_results(model_name: str, picks_dir: Path, results_csv_path: Path):
+def build_soccer_prompt(model_name, hours_ahead = 2, compact_dataset = True, shard_size = None, shard_window_minutes = None):
     """
-    Process soccer betting results for a given model.
+    Build soccer betting prompt for a specific model.
     
     Args:
         model_name: Model name (chatgpt, claude, deepseek, gemini, grok)
-        picks_dir: Directory containing picks files
-        results_csv_path: Path to game results CSV
+        hours_ahead: Only include games starting within this many hours
+        compact_dataset: Serialize Dataset 1 with compact_dataset_csv() instead of to_csv()
+        shard_size: If set, write one prompt per this many games to prompts/shards/
+        shard_window_minutes: If set, shards never span two start-time windows of this length
     
     Returns:
-        DataFrame with evaluated bets
+        DataFrame with aggregated betting data
     """
+    
+    # Ensure directories exist (parent directory since we're in scripts/)
+    Path('./data/bets').mkdir(parents=True, exist_ok=True)
+    Path('./data/bets_db').mkdir(parents=True, exist_ok=True)
+    Path('./data/evaluated').mkdir(parents=True, exist_ok=True)
+    
+    # Load existing soccer bets database
+    db_path = Path('./data/bets_db/soccer_bets_db.csv')
+    if db_path.exists():
+        df_all = pd.read_csv(db_path)
+    else:
+        df_all = pd.DataFrame()
+        print("Creating new soccer_bets_db.csv")
+
+    # Sport is soccer
     sport = 'soccer'
+
+    # Get today's date and next few days
+    today = datetime.date.today()
+    date_format = '%Y%m%d'
     
-    # Load picks file
-    picks_file = picks_dir / f'soccer_bets_{model_name}.txt'
-    try:
-        df_picks = pd.read_csv(picks_file)
-    except FileNotFoundError:
-        print(f"Error: Picks file not found at {picks_file}")
-        return None
-
-    # Process timestamps
-    df_picks = df_picks.rename(columns={'timestamp\u200b': 'timestamp'})
-    df_picks['timestamp'] = df_picks['timestamp'].str.replace('\u200b', '')
-    df_picks['timestamp'] = pd.to_datetime(df_picks['timestamp'], format='ISO8601')
-    df_picks['start_time_pt'] = (
-        pd.to_datetime(df_picks['start_time'], utc=True)
-        .dt.tz_convert('America/Los_Angeles')
-    )
-    df_picks['date'] = df_picks['start_time_pt'].dt.date
-    df_picks['model'] = model_name
+    # Get games for next 4 days
+    date_str_list = [
+        (today + datetime.timedelta(days=-1)).strftime(date_format),
+        (today + datetime.timedelta(days=0)).strftime(date_format),  # Today
+        (today + datetime.timedelta(days=1)).strftime(date_format),  # Tomorrow
+        (today + datetime.timedelta(days=2)).strftime(date_format),  # Day after
+        (today + datetime.timedelta(days=3)).strftime(date_format)   # 3 days out
+    ]
 
-    # Load existing game results
-    results_file_exists = results_csv_path.is_file()
+    # Fetch today's games
+    df = get_todays_games(sport, date_str_list, HEADERS)
     
-    try:
-        df_old_results = pd.read_csv(results_csv_path)
-    except FileNotFoundError:
-        print(f"Results file {results_csv_path} not found. A new one will be created.")
-        df_old_results = pd.DataFrame()
-        df_old_results['game_id'] = []
-        df_old_results['status'] = []
-
-    # Find missing results
-    df_merge = pd.merge(
-        df_picks[['rank', 'game_id', 'match', 'date', 'start_time', 'pick']],
-        df_old_results,
-        on='game_id',
-        how='left',
-        suffixes=('_pick', '_result')
-    )
-    missing_games = df_merge.loc[df_merge['status'] != 'complete']
+    if df.empty or 'status' not in df.columns:
+        print(f"No soccer games found or status column missing. Returning empty.")
+        return pd.DataFrame()
 
-    # Fetch and append new results if needed
-    df_new_results = pd.DataFrame()
+    df['date_scraped'] = datetime.datetime.now()
+
+    # Only keep scheduled games
+    df = df.loc[df['status'] == 'scheduled']
+
+    # Combine with historical data
+    if not df_all.empty:
+        df_all = pd.concat([df_all, df])
+        df_all['date_scraped'] = pd.to_datetime(df_all['date_scraped'])
 
-    if not missing_games.empty:
-        date_str_list = missing_games['date'].astype(str).str.replace('-', '').unique().tolist()
+        # Filter for changes in key metrics
+        dimension_cols = ['game_id', 'home_team', 'away_team']
+        metric_cols = ['home_money_line', 'away_money_line', 'total_score', 'tie_money_line']
+        filtered_df = filter_data_on_change(df_all, dimension_cols, metric_cols)
         
-        if date_str_list:
-            print(f"Found missing results for {len(date_str_list)} dates. Fetching...")
-            df_new_results = get_complete_game_results(sport, date_str_list, HEADERS)
-            
-            if not df_new_results.empty:
-                print(f"Appending {len(df_new_results)} new results to {results_csv_path}")
-                df_new_results.to_csv(
-                    results_csv_path,
-                    mode='a',
-                    header=not results_file_exists,
-                    index=False
-                )
-            else:
-                print("API call returned no new results.")
+        print(f"Total records: {df_all.index.size}")
+        print(f"Filtered records: {filtered_df.index.size}")
     else:
-        print("No missing game results found. All picks are up-to-date.")
+        filtered_df = df
 
-    # Combine all results
-    df_all_results = pd.concat([df_old_results, df_new_results], ignore_index=True)
+    # Save updated database
+    filtered_df.to_csv('./data/bets_db/soccer_bets_db.csv', index=False)
 
-    # Drop duplicates
-    if 'game_id' in df_all_results.columns and not df_all_results.empty:
-        df_all_results = df_all_results.drop_duplicates(subset='game_id', keep='last')
+    # Aggregate betting data
+    group_by_columns = ['game_id', 'home_team', 'away_team', 'start_time']
+    metric_columns = [
+        'num_bets', 'home_money_line', 'home_ml_ticket_pct', 'home_ml_money_pct',
+        'away_money_line', 'away_ml_ticket_pct', 'away_ml_money_pct',
+        'tie_money_line', 'tie_ml_ticket_pct', 'tie_ml_money_pct',  # Soccer-specific
+        'total_score', 'over_odds', 'under_odds', 'over_ticket_pct', 'over_money_pct',
+        'under_ticket_pct', 'under_money_pct', 'home_spread', 'home_spread_odds',
+        'home_spread_ticket_pct', 'home_spread_money_pct', 'away_spread',
+        'away_spread_odds', 'away_spread_ticket_pct', 'away_spread_money_pct'
+    ]
 
-    # Process and save evaluations
-    df_evaluated, df_evaluated_hist = process_and_save_evaluated_bets(
-        df_picks,
-        df_all_results,
-        sport
+    # Convert start_time_pt to datetime
+    filtered_df['start_time_pt'] = pd.to_datetime(filtered_df['start_time_pt'])
+
+    # Get next games list
+    next_games_list = df['game_id'].unique().tolist()
+
+    # Get top 30 upcoming games
+    games_list = (filtered_df.loc[filtered_df['game_id'].isin(next_games_list)]
+                  .groupby(['game_id', 'home_team', 'away_team', 'start_time_pt'])
+                  .agg(rec_count=('date_scraped', 'size'))
+                  .sort_values('start_time_pt', ascending=True)
+                  .head(30)
+                  .reset_index()['game_id'].tolist())
+
+    # Aggregate betting data for selected games
+    df_agg = aggregate_betting_data(
+        filtered_df.loc[filtered_df['game_id'].isin(games_list)],
+        group_by_columns,
+        metric_columns
+    )
+
+    df_agg = df_agg.sort_values('start_time', ascending=True)
+
+    # Create spread columns for display
+    df_agg['home_team_spread'] = df_agg['home_team'] + " " + df_agg['home_spread_last'].apply(lambda x: f"{x:+.1f}")
+    df_agg['away_team_spread'] = df_agg['away_team'] + " " + df_agg['away_spread_last'].apply(lambda x: f"{x:+.1f}")
+    # No-vig probabilities, fair odds and hold for every market
+    df_agg = add_fair_prices(df_agg)
+    # Sharp money, reverse line movement and steam per game (cached per snapshot)
+    df_agg = add_signals(df_agg, game_signals(update_signals('soccer', filtered_df)))
+
+    # Load historical results for this model
+    hist_path = Path(f'./data/evaluated/soccer_bet_picks_evaluated.csv')
+    if hist_path.exists():
+        df_hist = pd.read_csv(hist_path)
+        df_hist = df_hist.loc[df_hist['model'] == model_name]
+    else:
+        df_hist = pd.DataFrame()
+        print(f"No historical data found for {model_name}")
+
+    # Stored confidence calibration (see calibration), once an evaluation run has built it
+    df_calibration = load_calibration('soccer') if calibration_file('soccer').is_file() else None
+    calibration_string = compact_calibration(df_calibration, model_name) if df_calibration is not None else ""
+
+    # Filter df_agg to only include games starting within the next 2 hours
+    current_time = pd.Timestamp.now(tz='America/Los_Angeles')
+    n_hours_from_now = current_time + pd.Timedelta(hours=hours_ahead)
+    
+    # Convert start_time to datetime if not already
+    df_agg['start_time'] = pd.to_datetime(df_agg['start_time'])
+    df_agg['start_time_pt'] = df_agg['start_time'].dt.tz_convert('America/Los_Angeles')
+    
+    # Filter for games starting within next n hours
+    df_agg_filtered = df_agg[df_agg['start_time_pt'] <= n_hours_from_now].copy()
+    
+    print(f"Total games in df_agg: {len(df_agg)}")
+    print(f"Games starting within next {hours_ahead} hours: {len(df_agg_filtered)}")
+
+    # Define the prompt file path
+    prompt_path = Path(f"./prompts/soccer_prompt_{model_name}.txt")
+    
+    # If no games in the next 2 hours, delete the prompt file if it exists and return
+    if len(df_agg_filtered) == 0:
+        print(f"No games starting within {hours_ahead} hours for {model_name}. Skipping prompt generation.")
+        if prompt_path.exists():
+            prompt_path.unlink()
+            print(f"Removed existing prompt file: {prompt_path}")
+        remove_shard_prompts('soccer', model_name)
+        return df_agg
+
+    # Sharded mode: several small prompts that can be sent in parallel instead of one for the whole slate
+    if shard_size or shard_window_minutes:
+        write_prompt_shards(
+            'soccer', model_name, df_agg_filtered, df_hist,
+            render_soccer_prompt,
+            games_per_shard=shard_size or len(df_agg_filtered),
+            window_minutes=shard_window_minutes,
+            compact_dataset=compact_dataset,
+            df_calibration=df_calibration,
+            prompt_file=prompt_path,
+            template_version=file_fingerprint(__file__)
+        )
+        return df_agg
+
+    # Single prompt: shards from an earlier sharded build would otherwise be sent too
+    remove_shard_prompts('soccer', model_name)
+
+    # Skip rendering when the lines, history and template are the same as last time
+    fingerprint = prompt_fingerprint(
+        lines_fingerprint(df_agg_filtered, compact_dataset),
+        f"{frame_fingerprint(df_hist)}:{text_fingerprint(calibration_string)}",
+        f"{file_fingerprint(__file__)}:{'compact' if compact_dataset else 'csv'}"
     )
+    prompt_changed, change_reason = check_prompt_fingerprint('soccer', model_name, fingerprint, prompt_path)
+    if not prompt_changed:
+        record_prompt_unchanged('soccer', model_name, change_reason)
+        return df_agg
+
+    render_start = time.perf_counter()
 
-    if 'date' in df_evaluated_hist.columns:
-        df_evaluated_hist['date'] = pd.to_datetime(df_evaluated_hist['date'])
+    # Convert DataFrames to CSV strings for prompt
+    if compact_dataset:
+        df1_string = compact_dataset_csv(df_agg_filtered)
     else:
-        print("Warning: 'df_evaluated_hist' has no 'date' column to convert.")
+        df1_string = df_agg_filtered.to_csv(index=False)
+    df2_string = df_hist.to_csv(index=False) if not df_hist.empty else "No historical data yet"
+    if calibration_string:
+        df2_string += '\n' + calibration_string
 
-    return df_evaluated_hist
+    # Build the prompt (soccer-specific, following NBA/NCAAB structure)
+    prompt = render_soccer_prompt(df1_string, df2_string)
+    render_seconds = time.perf_counter() - render_start
+
+    print('-------')
+    print('-------')
+    print('-------')
+    print('-------')
+    print(prompt)
+
+    # Write prompt to file
+    prompt_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(prompt_path, "w") as f:
+        f.write(prompt)
+    
+    print(f"\nPrompt file created: {prompt_path}")
+
+    record_prompt_manifest(
+        'soccer', model_name, prompt,
+        sections={'dataset_1': df1_string, 'dataset_2': df2_string},
+        dataset_1_rows=len(df_agg_filtered),
+        dataset_2_rows=len(df_hist),
+        render_seconds=render_seconds,
+        prompt_file=prompt_path,
+        fingerprint=fingerprint,
+        change_reason=change_reason
+    )
+
+    return df_agg
 
 
 # Model list for soccer
@@ -0,0 +1,297 @@
+"""
+Rebuild the prompt datasets of any past build time from stored data.
+
+To try a prompt or pick-selection change against the past, the inputs have
+to be what the model actually saw at the time:
+
+    Dataset 1  the aggregated upcoming games (first/avg/last of every line),
+               from the line store data/bets_db/<sport>_bets_db.csv
+    Dataset 2  the model's graded picks, from <sport>_bet_picks_evaluated.csv
+
+SnapshotStore loads both once and sorts them so that every as-of read is a
+range lookup (np.searchsorted) instead of a scan:
+
+    lines    sorted by (start_time, game_id, date_scraped). The games that
+             were upcoming at T start in (T, T + LOOKAHEAD], a contiguous
+             block; only that block is checked for date_scraped <= T.
+    history  sorted by (model, available_at). A model's history at T is a
+             prefix of its block.
+
+available_at is the ledger's graded_at when it was recorded. Picks graded
+before the ledger existed use their game's start_time plus GRADE_DELAY.
+
+This is a reconstruction, not a copy of the prompt that was sent. The line
+store only keeps snapshots where a line changed (filter_data_on_change), so
+first and last values are exact but averages run over fewer snapshots.
+Games are taken as upcoming when they start within LOOKAHEAD of T, not from
+the API's schedule at the time.
+
+replay_builds() rebuilds every model's datasets for many build times in a
+process pool and reports their sizes and fingerprints (see prompt_manifest).
+Consecutive builds with equal fingerprints would have produced the same
+prompt.
+
+    store = SnapshotStore.load('nba')
+    df_games, df_hist = store.datasets('2025-11-20 18:00', 'claude', hours_ahead=6)
+
+Usage:
+    python scripts/time_travel.py [sport] [hours_between_builds]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from picks_ledger import LEDGER_KEY, key_frame, load_ledger
+from pricing import add_fair_prices
+from prompt_format import compact_dataset_csv
+from prompt_manifest import frame_fingerprint, lines_fingerprint
+from signals import add_signals, compute_signals, game_signals
+from timestamps import EASTERN, PACIFIC, ensure_epoch, to_epoch_ms
+from utils import aggregate_betting_data
+
+
+LINES_DIR = Path('./data/bets_db')
+EVALUATED_DIR = Path('./data/evaluated')
+
+GROUP_BY_COLUMNS = ['game_id', 'home_team', 'away_team', 'start_time']
+METRIC_COLUMNS = [
+    'num_bets', 'home_money_line', 'home_ml_ticket_pct', 'home_ml_money_pct',
+    'away_money_line', 'away_ml_ticket_pct', 'away_ml_money_pct', 'total_score',
+    'over_odds', 'under_odds', 'over_ticket_pct', 'over_money_pct',
+    'under_ticket_pct', 'under_money_pct', 'home_spread', 'home_spread_odds',
+    'home_spread_ticket_pct', 'home_spread_money_pct', 'away_spread',
+    'away_spread_odds', 'away_spread_ticket_pct', 'away_spread_money_pct'
+]
+
+# The builders fetch games from yesterday to three days ahead and keep the next 30
+LOOKAHEAD = pd.Timedelta(days=4)
+MAX_GAMES = 30
+# Picks graded before the ledger recorded graded_at
+GRADE_DELAY = pd.Timedelta(hours=6)
+
+
+def _epoch(as_of) -> int:
+    """A single timestamp (naive = UTC), or epoch milliseconds as an int, as epoch milliseconds."""
+    if isinstance(as_of, (int, np.integer)):
+        return int(as_of)
+    return int(to_epoch_ms(pd.Series([pd.Timestamp(as_of)]))[0])
+
+
+class SnapshotStore:
+    """
+    Line store and evaluated history for one sport, indexed for as-of reads.
+    """
+
+    def __init__(self, sport: str, df_lines: pd.DataFrame, df_hist: pd.DataFrame):
+        self.sport = sport
+
+        df_lines = ensure_epoch(df_lines, 'start_time')
+        df_lines = df_lines.assign(date_scraped_epoch=to_epoch_ms(df_lines['date_scraped']))
+        df_lines = df_lines.dropna(subset=['start_time_epoch', 'date_scraped_epoch'])
+        self.lines = df_lines.sort_values(['start_time_epoch', 'game_id', 'date_scraped_epoch'],
+                                          kind='stable').reset_index(drop=True)
+        self._line_start = self.lines['start_time_epoch'].to_numpy(dtype=np.int64)
+        self._line_scraped = self.lines['date_scraped_epoch'].to_numpy(dtype=np.int64)
+
+        # Keep the file order to restore after slicing, so Dataset 2 reads like the CSV
+        df_hist = df_hist.reset_index(drop=True).rename_axis('_row').reset_index()
+        df_hist = df_hist.sort_values(['model', 'available_at', '_row'], kind='stable')
+        self.history = {model: df for model, df in df_hist.groupby('model', sort=False)}
+        self._hist_available = {model: df['available_at'].to_numpy(dtype=np.int64)
+                                for model, df in self.history.items()}
+
+    @classmethod
+    def load(cls, sport: str, lines_dir: Path = LINES_DIR, evaluated_dir: Path = EVALUATED_DIR):
+        """
+        Reads the line store, evaluated history and ledger for a sport.
+        """
+        evaluated_dir = Path(evaluated_dir)
+        df_lines = pd.read_csv(Path(lines_dir) / f'{sport}_bets_db.csv')
+
+        evaluated_hist_file = evaluated_dir / f'{sport}_bet_picks_evaluated.csv'
+        df_hist = pd.read_csv(evaluated_hist_file)
+        ledger = load_ledger(evaluated_dir / f'{sport}_pick_ledger.csv',
+                             evaluated_dir / f'{sport}_bet_picks.csv', evaluated_hist_file)
+
+        times = ledger[LEDGER_KEY].assign(
+            graded_epoch=to_epoch_ms(ledger['graded_at']),
+            start_time_epoch=to_epoch_ms(ledger['start_time']),
+        ).drop_duplicates(subset=LEDGER_KEY)
+        keys = key_frame(df_hist).merge(times, on=LEDGER_KEY, how='left')
+
+        # Last resort for picks missing from the ledger: the end of the game's Eastern date
+        end_of_date = to_epoch_ms(pd.to_datetime(df_hist['date']) + pd.Timedelta(days=1), naive_tz=EASTERN)
+        fallback = (keys['start_time_epoch'] + GRADE_DELAY // pd.Timedelta(milliseconds=1)).fillna(end_of_date)
+        available = keys['graded_epoch'].fillna(fallback)
+        df_hist['available_at'] = available.to_numpy()
+        df_hist = df_hist.dropna(subset=['available_at'])
+        df_hist['available_at'] = df_hist['available_at'].astype('int64')
+        return cls(sport, df_lines, df_hist)
+
+    def build_times(self) -> np.ndarray:
+        """The distinct scrape times in the line store (epoch ms), one per past build."""
+        return np.unique(self._line_scraped)
+
+    def upcoming_games(self, as_of, max_games: int = MAX_GAMES) -> pd.DataFrame:
+        """
+        Dataset 1 before the hours_ahead filter: the next games at as_of, aggregated
+        over the snapshots scraped up to then.
+        """
+        t = _epoch(as_of)
+        lo = np.searchsorted(self._line_start, t, side='right')
+        hi = np.searchsorted(self._line_start, t + LOOKAHEAD // pd.Timedelta(milliseconds=1), side='right')
+        seen = np.flatnonzero(self._line_scraped[lo:hi] <= t) + lo
+        df = self.lines.iloc[seen]
+        if df.empty:
+            return pd.DataFrame(columns=GROUP_BY_COLUMNS)
+
+        games = df.drop_duplicates('game_id')['game_id'].head(max_games)
+        df = df.loc[df['game_id'].isin(games)]
+        df_agg = aggregate_betting_data(df, GROUP_BY_COLUMNS, METRIC_COLUMNS)
+        df_agg = df_agg.sort_values('start_time', ascending=True)
+
+        df_agg['home_team_spread'] = df_agg['home_team'] + " " + df_agg['home_spread_last'].apply(lambda x: f"{x:+.1f}")
+        df_agg['away_team_spread'] = df_agg['away_team'] + " " + df_agg['away_spread_last'].apply(lambda x: f"{x:+.1f}")
+        df_agg = add_fair_prices(df_agg)
+        df_agg = add_signals(df_agg, game_signals(compute_signals(df)))
+        df_agg['start_time'] = pd.to_datetime(df_agg['start_time'])
+        df_agg['start_time_pt'] = df_agg['start_time'].dt.tz_convert(PACIFIC)
+        return df_agg
+
+    def history_as_of(self, as_of, model: str) -> pd.DataFrame:
+        """
+        Dataset 2: the model's picks that had been graded by as_of, in file order.
+        """
+        if model not in self.history:
+            return pd.DataFrame()
+        i = np.searchsorted(self._hist_available[model], _epoch(as_of), side='right')
+        df = self.history[model].iloc[:i].sort_values('_row')
+        return df.drop(columns=['_row', 'available_at']).reset_index(drop=True)
+
+    def datasets(self, as_of, model: str, hours_ahead: float = 6) -> tuple:
+        """
+        Both datasets of a build at as_of, with Dataset 1 limited to games starting
+        within hours_ahead, as in the builders.
+
+        Returns:
+            tuple: (df_agg_filtered, df_hist)
+        """
+        return _starting_within(self.upcoming_games(as_of), as_of, hours_ahead), self.history_as_of(as_of, model)
+
+
+def _starting_within(df_agg: pd.DataFrame, as_of, hours_ahead: float) -> pd.DataFrame:
+    if df_agg.empty:
+        return df_agg
+    cutoff = pd.Timestamp(_epoch(as_of) + int(hours_ahead * 3_600_000), unit='ms', tz='UTC')
+    return df_agg.loc[df_agg['start_time'] <= cutoff].copy()
+
+
+def rebuild_prompt(store: SnapshotStore, as_of, model: str, render_fn, hours_ahead: float = 6,
+                   compact_dataset: bool = True) -> str:
+    """
+    The prompt a builder would have rendered at as_of.
+
+    Args:
+        render_fn (callable): The sport's renderer, e.g. render_nba_prompt.
+
+    Returns:
+        str: The prompt, or None if no games started within hours_ahead.
+    """
+    df_agg, df_hist = store.datasets(as_of, model, hours_ahead)
+    if df_agg.empty:
+        return None
+    df1_string = compact_dataset_csv(df_agg) if compact_dataset else df_agg.to_csv(index=False)
+    return render_fn(df1_string, df_hist.to_csv(index=False))
+
+
+_worker_store = None
+
+
+def _init_worker(sport: str, lines_dir: Path, evaluated_dir: Path):
+    global _worker_store
+    _worker_store = SnapshotStore.load(sport, lines_dir, evaluated_dir)
+
+
+def _replay_build(task: tuple) -> list:
+    """Sizes and fingerprints of every model's datasets at one build time (runs in a worker)."""
+    as_of, models, hours_ahead = task
+    # Dataset 1 is the same for every model
+    df_upcoming = _worker_store.upcoming_games(as_of)
+    df_agg = _starting_within(df_upcoming, as_of, hours_ahead)
+    dataset_1_fingerprint = lines_fingerprint(df_agg) if not df_agg.empty else None
+
+    rows = []
+    for model in models:
+        df_hist = _worker_store.history_as_of(as_of, model)
+        rows.append({
+            'build_time': pd.Timestamp(as_of, unit='ms', tz='UTC'),
+            'model': model,
+            'upcoming_games': len(df_upcoming),
+            'dataset_1_rows': len(df_agg),
+            'dataset_2_rows': len(df_hist),
+            'dataset_1_fingerprint': dataset_1_fingerprint,
+            'dataset_2_fingerprint': frame_fingerprint(df_hist),
+        })
+    return rows
+
+
+def replay_builds(sport: str, build_times=None, models: list = None, hours_ahead: float = 6,
+                  lines_dir: Path = LINES_DIR, evaluated_dir: Path = EVALUATED_DIR,
+                  max_workers: int = None) -> pd.DataFrame:
+    """
+    Rebuilds the datasets of many past builds in parallel.
+
+    Each worker loads the SnapshotStore once; every build after that is a
+    handful of range reads.
+
+    Args:
+        sport (str): The sport prefix.
+        build_times (list, optional): Timestamps or epoch ms; defaults to every
+                                      scrape time in the line store.
+        models (list, optional): Defaults to every model in the evaluated history.
+        hours_ahead (float): The builders' hours_ahead.
+        max_workers (int): Process pool size (defaults to the CPU count).
+
+    Returns:
+        pd.DataFrame: One row per build time and model (see _replay_build).
+    """
+    if build_times is None or models is None:
+        store = SnapshotStore.load(sport, lines_dir, evaluated_dir)
+        build_times = store.build_times() if build_times is None else build_times
+        models = sorted(store.history) if models is None else models
+    tasks = [(_epoch(bt), models, hours_ahead) for bt in build_times]
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(sport, lines_dir, evaluated_dir)) as pool:
+        chunksize = max(1, len(tasks) // (4 * workers))
+        rows = [row for result in pool.map(_replay_build, tasks, chunksize=chunksize) for row in result]
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    sport = sys.argv[1] if len(sys.argv) > 1 else 'nba'
+    hours_between = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    start = time.perf_counter()
+    store = SnapshotStore.load(sport)
+    scraped = store.build_times()
+    step = int(hours_between * 3_600_000)
+    build_times = np.arange(scraped.min() - scraped.min() % step + step, scraped.max() + step, step)
+
+    df_replay = replay_builds(sport, build_times, sorted(store.history))
+    print(f"Replayed {len(build_times)} {sport} builds for {df_replay['model'].nunique()} models "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    with_games = df_replay.loc[df_replay['dataset_1_rows'] > 0]
+    changed = with_games.groupby('model')['dataset_1_fingerprint'].apply(lambda x: (x != x.shift()).sum())
+    print(pd.DataFrame({
+        'builds_with_games': with_games.groupby('model').size(),
+        'distinct_dataset_1': changed,
+        'final_dataset_2_rows': df_replay.groupby('model')['dataset_2_rows'].last(),
+    }).to_string())
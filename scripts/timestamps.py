@@ -0,0 +1,82 @@
+"""
+One representation for every timestamp the pipeline joins or groups on.
+
+start_time, timestamp and date_scraped arrive as strings in several formats.
+They are parsed once, where the data is ingested (picks_parser, results_store,
+the line store loaders), into int64 milliseconds since the Unix epoch (UTC) in
+a '<column>_epoch' column. Joins merge on those integers, and the local dates
+derived from them are computed once per distinct value and stored as columns,
+so no later step parses a date string again.
+
+    df['start_time_epoch'] = to_epoch_ms(df['start_time'])
+    df['date'] = local_dates(df['start_time_epoch'], PACIFIC)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+PACIFIC = 'America/Los_Angeles'
+EASTERN = 'America/New_York'
+
+EPOCH_SUFFIX = '_epoch'
+
+
+def to_epoch_ms(values: pd.Series, naive_tz: str = 'UTC') -> pd.Series:
+    """
+    Parses timestamps (strings in any format, or datetimes) to epoch milliseconds.
+
+    Args:
+        values (pd.Series): Timestamps to convert.
+        naive_tz (str): Time zone assumed for values without an offset.
+
+    Returns:
+        pd.Series: Int64 milliseconds since 1970-01-01 UTC; <NA> where a value couldn't be parsed.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+    else:
+        parsed = pd.to_datetime(values, format='mixed', errors='coerce', utc=naive_tz == 'UTC')
+        if not pd.api.types.is_datetime64_any_dtype(parsed):
+            # Mixed offsets: every value carries its own, so naive_tz doesn't apply
+            parsed = pd.to_datetime(values, format='mixed', errors='coerce', utc=True)
+    if parsed.dt.tz is None:
+        parsed = parsed.dt.tz_localize(naive_tz)
+
+    naive_utc = parsed.dt.tz_convert('UTC').dt.tz_localize(None).astype('datetime64[ns]')
+    epoch = pd.Series(naive_utc.to_numpy().astype(np.int64) // 1_000_000, index=values.index, dtype='Int64')
+    return epoch.mask(parsed.isna())
+
+
+def from_epoch_ms(epoch: pd.Series, tz: str = 'UTC') -> pd.Series:
+    """
+    Epoch milliseconds back to tz-aware datetimes (for display or writing out).
+    """
+    return pd.to_datetime(epoch, unit='ms', utc=True).dt.tz_convert(tz)
+
+
+def local_dates(epoch: pd.Series, tz: str = PACIFIC) -> pd.Series:
+    """
+    The local calendar date of each epoch, converting each distinct value only once.
+
+    Picks for the same game share a start time, so a column usually has far
+    fewer distinct values than rows.
+
+    Returns:
+        pd.Series: datetime.date objects (None where the epoch is missing).
+    """
+    codes, uniques = pd.factorize(epoch, use_na_sentinel=True)
+    unique_dates = from_epoch_ms(pd.Series(uniques, dtype='Int64'), tz).dt.date.to_numpy(dtype=object)
+    dates = np.where(codes >= 0, unique_dates[codes] if len(unique_dates) else None, None)
+    return pd.Series(dates, index=epoch.index, dtype=object)
+
+
+def ensure_epoch(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Adds '<column>_epoch' to a frame that was loaded without it (e.g. from an older CSV).
+    """
+    epoch_column = column + EPOCH_SUFFIX
+    if epoch_column not in df.columns:
+        df = df.copy()
+        df[epoch_column] = to_epoch_ms(df[column]) if column in df.columns else pd.Series(pd.NA, index=df.index, dtype='Int64')
+    return df
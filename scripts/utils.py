@@ -2,6 +2,14 @@ import requests
 import pandas as pd
 import numpy as np
 import os
+from pathlib import Path
+
+import calibration
+import leaderboards
+import picks_ledger
+from picks_parser import parse_picks_file
+from results_store import ResultsStore
+from timestamps import EASTERN, ensure_epoch, local_dates
 
 
 SPORT_INFO = {
@@ -376,45 +384,108 @@ def fetch_and_process_data(url, headers):
 
 
 
-def evaluate_bets(df_picks, df_result):
-    df = df_picks.merge(df_result, on=["game_id", "start_time"], how="inner", suffixes=("", "_res"))
+def payout_multiplier(odds, odds_format: str = 'american') -> np.ndarray:
+    """
+    Profit per unit staked for an array of odds.
 
+    Args:
+        odds (array-like): American odds (+150 / -110) or decimal odds (2.5 / 1.91).
+        odds_format (str): 'american' or 'decimal'.
 
-    # Payout function for both American and Decimal odds
-    def calculate_payout(units, odds):
-        """Calculates the payout based on units and American odds."""
-        if odds > 0:
-            return units * (odds / 100.0)
-        else:
-            return units * (100.0 / abs(odds))
+    Returns:
+        np.ndarray: float64 multipliers; NaN where the odds are missing or invalid
+                    (American odds of 0, decimal odds of 1 or less).
+    """
+    odds = np.asarray(odds, dtype=np.float64)
+    if odds_format == 'american':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            multiplier = np.where(odds > 0, odds / 100.0, 100.0 / np.abs(odds))
+        multiplier[odds == 0] = np.nan
+    elif odds_format == 'decimal':
+        multiplier = np.where(odds > 1, odds - 1.0, np.nan)
+    else:
+        raise ValueError(f"Unknown odds format '{odds_format}', expected 'american' or 'decimal'")
+    return multiplier
 
 
-    status_complete = df['status'] == 'complete'
+def implied_probability(odds, odds_format: str = 'american') -> np.ndarray:
+    """
+    Break-even win probability implied by an array of odds (vig included).
 
+    Returns:
+        np.ndarray: float64 probabilities; NaN where the odds are missing or invalid.
+    """
+    return 1.0 / (1.0 + payout_multiplier(odds, odds_format))
 
+
+def compute_bet_payouts(units, odds, bet_result, odds_format: str = 'american') -> np.ndarray:
+    """
+    Payouts for a whole column of graded bets at once.
+
+    Wins pay units * payout_multiplier(odds), losses cost the units and pushes
+    pay 0. Only the winning rows go through the odds conversion.
+
+    Args:
+        units (array-like): Units staked.
+        odds (array-like): Odds in odds_format.
+        bet_result (array-like): 'win', 'loss' or 'push' per bet.
+        odds_format (str): 'american' or 'decimal'.
+
+    Returns:
+        np.ndarray: float64 payouts.
+    """
+    units = np.asarray(units, dtype=np.float64)
+    odds = np.asarray(odds, dtype=np.float64)
+    bet_result = np.asarray(bet_result)
+    win = bet_result == 'win'
+    loss = bet_result == 'loss'
+
+    payout = np.zeros(units.shape, dtype=np.float64)
+    payout[win] = units[win] * payout_multiplier(odds[win], odds_format)
+    payout[loss] = -units[loss]
+    return payout
+
+
+def evaluate_bets(df_picks, df_result, odds_format='american'):
+    # Integer merge on the epoch columns written at ingestion (see timestamps)
+    df_picks = ensure_epoch(df_picks, 'start_time')
+    df_result = ensure_epoch(df_result, 'start_time')
+    df = df_picks.merge(df_result, on=["game_id", "start_time_epoch"], how="inner", suffixes=("", "_res"))
+
+    # Typed arrays for the grading below
+    status_complete = (df['status'] == 'complete').to_numpy()
     df['home_score'] = pd.to_numeric(df['home_score'])
     df['away_score'] = pd.to_numeric(df['away_score'])
-    df['home_spread'] = pd.to_numeric(df['home_spread'])
-    df['away_spread'] = pd.to_numeric(df['away_spread'])  
+    home_score = df['home_score'].to_numpy(dtype=np.float64)
+    away_score = df['away_score'].to_numpy(dtype=np.float64)
+    home_spread = pd.to_numeric(df['home_spread']).to_numpy(dtype=np.float64)
+    away_spread = pd.to_numeric(df['away_spread']).to_numpy(dtype=np.float64)
+    total_score = pd.to_numeric(df['total_score']).to_numpy(dtype=np.float64)
+
+    bet = {col: status_complete & (df[col].to_numpy() == 1) for col in [
+        'bet_home_ml', 'bet_away_ml', 'bet_home_spread', 'bet_away_spread', 'bet_over', 'bet_under'
+    ]}
+    home_margin = home_score + home_spread - away_score
+    away_margin = away_score + away_spread - home_score
+    combined_score = home_score + away_score
 
     # Conditions for bet_result
     conditions_result = [
         # Moneyline bets
-        (status_complete) & (df['bet_home_ml'] == 1) & (df['home_score'] > df['away_score']),
-        (status_complete) & (df['bet_away_ml'] == 1) & (df['away_score'] > df['home_score']),
-        # (status_complete) & ((df['bet_home_ml'] == 1) | (df['bet_away_ml'] == 1)) & (df['home_score'] == df['away_score']),
+        bet['bet_home_ml'] & (home_score > away_score),
+        bet['bet_away_ml'] & (away_score > home_score),
 
         # Spread bets
-        (status_complete) & (df['bet_home_spread'] == 1) & (df['home_score'] + df['home_spread'] > df['away_score']),
-        (status_complete) & (df['bet_away_spread'] == 1) & (df['away_score'] + df['away_spread'] > df['home_score']),
-        (status_complete) & (df['bet_home_spread'] == 1) & (df['home_score'] + df['home_spread'] == df['away_score']),
-        (status_complete) & (df['bet_away_spread'] == 1) & (df['away_score'] + df['away_spread'] == df['home_score']),
+        bet['bet_home_spread'] & (home_margin > 0),
+        bet['bet_away_spread'] & (away_margin > 0),
+        bet['bet_home_spread'] & (home_margin == 0),
+        bet['bet_away_spread'] & (away_margin == 0),
 
         # Over/Under bets
-        (status_complete) & (df['bet_over'] == 1) & (df['home_score'] + df['away_score'] > df['total_score']),
-        (status_complete) & (df['bet_under'] == 1) & (df['home_score'] + df['away_score'] < df['total_score']),
-        (status_complete) & (df['bet_over'] == 1) & (df['home_score'] + df['away_score'] == df['total_score']),
-        (status_complete) & (df['bet_under'] == 1) & (df['home_score'] + df['away_score'] == df['total_score'])
+        bet['bet_over'] & (combined_score > total_score),
+        bet['bet_under'] & (combined_score < total_score),
+        bet['bet_over'] & (combined_score == total_score),
+        bet['bet_under'] & (combined_score == total_score)
     ]
 
     choices_result = [
@@ -423,33 +494,15 @@ def evaluate_bets(df_picks, df_result):
         'win', 'win', 'push', 'push'
     ]
 
-    
-
     # Apply the conditions to get the bet results
     df['bet_result'] = np.select(conditions_result, choices_result, default='loss')
 
-    # Conditions for bet_payout based on the result
-    conditions_payout = [
-        df['bet_result'] == 'win',
-        df['bet_result'] == 'push',
-        df['bet_result'] == 'loss'
-    ]
-
-    choices_payout = [
-        df.apply(lambda row: calculate_payout(row['units'], row['odds']), axis=1),
-        0.0,
-        -df['units']
-    ]
-
-    # Apply the conditions to calculate the payout
-    df['bet_payout'] = np.select(conditions_payout, choices_payout, default=0.0)
+    # Payouts for every row in one masked pass
+    df['bet_payout'] = compute_bet_payouts(df['units'], df['odds'], df['bet_result'], odds_format)
 
 
     ## create a date field based on the start_time in eastern time zone
-    try:
-        df['date'] = pd.to_datetime(df['start_time']).dt.tz_convert('America/New_York').dt.date
-    except:
-        df['date'] = pd.to_datetime(df['start_time'], utc=True).dt.tz_convert('America/New_York').dt.date
+    df['date'] = local_dates(df['start_time_epoch'], EASTERN)
 
     return df[[
     "rank","model","date","game_id","match","home_score","away_score","pick","odds","units","bet_result","bet_payout"
@@ -926,74 +979,134 @@ def build_consolidator_prompts(df_picks: pd.DataFrame, sport_name: str = "Soccer
     print(f"Prompt successfully written to '{filename}'")
 
 
-def process_and_save_evaluated_bets(df_picks, df_result, sport_name):
+def process_and_save_evaluated_bets(df_picks, df_result, sport_name, load_history=True):
     """
     Processes, evaluates, and saves betting data for a given sport.
     
-    This function evaluates picks, handles duplicates, and saves the results to
-    sport-specific history files.
+    Picks are tracked in the sport's pick ledger (see picks_ledger). Only picks
+    the ledger hasn't seen are appended to the picks history, and only pending
+    picks whose games are now complete are graded and appended to the
+    evaluated history. Returns the newly graded picks and the full evaluated
+    history, or None in its place with load_history=False; totals are in the
+    leaderboards, so callers that only need those can skip reading the history.
     """
     
     normalized_sport_name = sport_name.lower()
     sport_data = SPORT_INFO.get(normalized_sport_name, {'prefix': 'sports'})
     generic_sport_prefix = sport_data['prefix']
 
-    df_evaluated = evaluate_bets(df_picks, df_result)
-    
-    games_left_to_play = pd.merge(df_picks[['game_id', 'match']], df_result[['game_id', 'status']], on='game_id', how='left').sort_values(['game_id']).query('status!="complete"').drop_duplicates()
-
-    print('Games left to play:')
-    # display(games_left_to_play)
-
-    print('Current evaluation summary:')
-    # display(df_evaluated.groupby('model').agg(
-    #     bet_payout=('bet_payout', 'sum'),
-    #     units=('units', 'sum'),
-    #     bets=('game_id', 'count')
-    # ).assign(ROI=lambda x: x['bet_payout'] / x['units'] * 100).sort_values('bet_payout', ascending=False).reset_index())
-
     # Dynamically create filenames based on the sport
     picks_hist_file = f"./data/evaluated/{generic_sport_prefix}_bet_picks.csv"
     evaluated_hist_file = f"./data/evaluated/{generic_sport_prefix}_bet_picks_evaluated.csv"
+    ledger_file = f"./data/evaluated/{generic_sport_prefix}_pick_ledger.csv"
+
+    ledger = picks_ledger.load_ledger(ledger_file, picks_hist_file, evaluated_hist_file)
+
+    ledger, df_new_picks = picks_ledger.register_picks(ledger, df_picks)
+    picks_ledger.append_rows(df_new_picks, picks_hist_file)
+
+    # One result per game, so each pick is graded exactly once
+    df_result = ensure_epoch(df_result, 'start_time').drop_duplicates(subset=['game_id', 'start_time_epoch'], keep='last')
+    df_gradable = picks_ledger.gradable_picks(ledger, df_picks, df_result)
+    df_evaluated = evaluate_bets(df_gradable, df_result)
+    picks_ledger.append_rows(df_evaluated, evaluated_hist_file)
+    # Picks whose start_time doesn't match their game's result aren't graded; they stay pending to retry
+    ledger = picks_ledger.mark_graded(ledger, df_evaluated)
+    picks_ledger.save_ledger(ledger, ledger_file)
+
+    n_pending = (ledger['state'] == picks_ledger.PENDING).sum()
+    n_unmatched = len(df_gradable) - len(picks_ledger.key_frame(df_evaluated).drop_duplicates())
+    print(f"{len(df_new_picks)} new picks, {len(df_evaluated)} newly graded, {n_pending} pending in the ledger")
+    if n_unmatched:
+        print(f"Warning: {n_unmatched} picks of completed games didn't match a result on start_time; left pending")
+
+    # Add the new grades to the stored leaderboards instead of re-aggregating the history
+    leaderboards.update_leaderboards(generic_sport_prefix, df_evaluated, evaluated_hist_file)
+    calibration.update_calibration(generic_sport_prefix, calibration.attach_confidence(df_evaluated, df_gradable),
+                                   picks_hist_file, evaluated_hist_file)
+    df_leaderboard = leaderboards.load_leaderboard(generic_sport_prefix, 'model')
+
+    total_bet_payout = df_leaderboard['units_won'].sum()
+    total_units = df_leaderboard['units_staked'].sum()
+    total_bets = df_leaderboard['bets'].sum()
+
+    print(f"Total Bet Payout: {total_bet_payout}")
+    print(f"Total Units: {total_units}")
+    print(f"Total Bets: {total_bets}")
+    # Nothing graded yet (e.g. only pending picks on scheduled games)
+    if total_units:
+        print(f"Return on Investment (ROI): {total_bet_payout / total_units * 100:.2f}%")
+    else:
+        print("Return on Investment (ROI): n/a")
+
+    print('Historical evaluation summary:')
+    print(df_leaderboard.sort_values('units_won', ascending=False).round(2).to_string(index=False))
+
+    if not load_history:
+        return df_evaluated, None
 
     try:
-        df_picks_hist = pd.read_csv(picks_hist_file)
         df_evaluated_hist = pd.read_csv(evaluated_hist_file)
     except FileNotFoundError:
-        df_picks_hist = pd.DataFrame()
-        df_evaluated_hist = pd.DataFrame()
+        df_evaluated_hist = df_evaluated
 
-    df_picks_hist = pd.concat([df_picks_hist, df_picks], ignore_index=True)
-    df_evaluated_hist = pd.concat([df_evaluated_hist, df_evaluated], ignore_index=True)
+    return df_evaluated, df_evaluated_hist
 
-    df_evaluated_hist = df_evaluated_hist.drop_duplicates(subset=['rank', 'game_id', 'model', 'pick', 'bet_result'])
-    df_picks_hist = df_picks_hist.drop_duplicates(subset=['rank', 'game_id', 'model', 'pick'])
 
-    df_picks_hist.to_csv(picks_hist_file, index=False)
-    df_evaluated_hist.to_csv(evaluated_hist_file, index=False)
+def evaluate_sport_bets(sport, model_list, HEADERS, picks_dir='./data/bets', results_dir='./data/evaluated'):
+    """
+    Evaluates every model's picks for a sport in one pass.
 
-    total_bet_payout = df_evaluated_hist['bet_payout'].sum()
-    total_units = df_evaluated_hist['units'].sum()
-    total_bets = df_evaluated_hist['game_id'].count()
+    All models' picks are loaded first. The results store (see results_store)
+    then fetches each date that is still missing for any of them once, skipping
+    dates already known to be complete, and everything is graded and saved with
+    a single process_and_save_evaluated_bets call. Adding a model adds its
+    picks file to read, not another round of fetching and rewriting.
 
-    roi = (total_bet_payout / total_units) * 100
+    Args:
+        sport (str): The sport prefix (e.g. 'nba').
+        model_list (list): Models whose data/bets/<sport>_bets_<model>.txt files to evaluate.
+        HEADERS (dict): The HTTP headers to use for the API request.
+        picks_dir (str or Path): Directory with the picks files.
+        results_dir (str or Path): Directory with <sport>_game_results.csv.
 
-    print(f"Total Bet Payout: {total_bet_payout}")
-    print(f"Total Units: {total_units}")
-    print(f"Total Bets: {total_bets}")
-    print(f"Return on Investment (ROI): {roi:.2f}%")
+    Returns:
+        pd.DataFrame: The sport's per-model leaderboard (leaderboards.load_leaderboard),
+                      or None if no picks file could be loaded.
+    """
+    picks_dir = Path(picks_dir)
 
-    print('Historical evaluation summary:')
-    try:
-        display(df_evaluated_hist.groupby('model').agg(
-            bet_payout=('bet_payout', 'sum'),
-            units=('units', 'sum'),
-            bets=('game_id', 'count')
-        ).assign(ROI=lambda x: x['bet_payout'] / x['units'] * 100).sort_values('bet_payout', ascending=False).reset_index())
-    except:
-        pass
+    # === 1. Load every model's picks ===
+    frames = []
+    for model_name in model_list:
+        picks_file = picks_dir / f'{sport}_bets_{model_name}.txt'
+        try:
+            df_model_picks, _ = parse_picks_file(picks_file, model_name)
+        except FileNotFoundError:
+            print(f"Error: Picks file not found at {picks_file}")
+            continue
+        print(f"Loaded {len(df_model_picks)} picks for {model_name}")
+        frames.append(df_model_picks)
 
-    return df_evaluated, df_evaluated_hist
+    if not frames:
+        return None
+    df_picks = pd.concat(frames, ignore_index=True)
+
+    # === 2. Fetch each missing date once ===
+    store = ResultsStore.load(sport, results_dir)
+    date_str_list = store.missing_dates(df_picks)
+    if date_str_list:
+        print(f"Found missing results for {len(date_str_list)} dates. Fetching...")
+        store.update(date_str_list, lambda date: fetch_all_games_data(sport, [date], HEADERS))
+    else:
+        print("No missing game results found. All picks are up-to-date.")
+    store.save()
+
+    # === 3. Evaluate all models at once against their games' results ===
+    df_result = store.results_for(df_picks['game_id'])
+    process_and_save_evaluated_bets(df_picks, df_result, sport, load_history=False)
+
+    return leaderboards.load_leaderboard(SPORT_INFO.get(sport.lower(), {'prefix': 'sports'})['prefix'], 'model')
 
 
 def generate_evaluated_hist_data(df_evaluated_hist, sport):
@@ -0,0 +1,41 @@
+import numpy as np
+
+from backtest import _day_totals, simulate_paths, stake_arrays
+
+
+def test_day_totals():
+    stakes = np.array([[1.0, 2.0, 3.0, 4.0, 0.0],
+                       [5.0, 5.0, 1.0, 0.0, 0.0]])
+    day = np.array([[1, 1, 2, 3, 3],
+                    [7, 8, 8, -1, -1]])
+
+    assert _day_totals(stakes, day).tolist() == [[3, 3, 3, 4, 4],
+                                                 [5, 6, 6, 0, 0]]
+
+
+def test_daily_cap_scales_a_day_down_to_the_cap():
+    units = np.array([[4.0, 4.0, 2.0, 0.0]])
+    day = np.array([[1, 1, 2, -1]])
+    valid = np.array([[True, True, True, False]])
+
+    stakes, _ = stake_arrays(units, np.full_like(units, np.nan), np.full_like(units, -110), day, valid,
+                             {'units_capped': {'stake': 'units', 'daily_cap': 6}})
+
+    # Day 1 staked 8 units, scaled to 6; day 2 is under the cap
+    assert stakes[0].tolist() == [[3, 3, 2, 0]]
+
+
+def test_ruined_paths_freeze():
+    returns = np.array([-1.0, -1.0, 1.0, 1.0])
+    # A fixed 50-unit stake and a 95% bankroll fraction, from a bankroll of 100
+    stakes = np.array([[50.0] * 4, [0.95] * 4])
+
+    paths, staked, ruined = simulate_paths(returns, stakes, np.array([False, True]), ruin_level=0.1)
+
+    # Fixed: 100 -> 50 -> 0, ruined, and the two wins after that are never bet
+    assert paths[0].tolist() == [100, 50, 0, 0, 0]
+    assert staked[0].tolist() == [50, 50, 0, 0]
+    # Proportional: 100 -> 5, ruined at once
+    np.testing.assert_allclose(paths[1], [100, 5, 5, 5, 5])
+    np.testing.assert_allclose(staked[1], [95, 0, 0, 0])
+    assert ruined.tolist() == [[False, True, True, True], [True, True, True, True]]
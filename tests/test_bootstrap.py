@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from bootstrap import bootstrap_ci
+
+
+def _picks(n=120):
+    rng = np.random.default_rng(7)
+    result = rng.choice(['win', 'loss', 'push'], size=n, p=[0.5, 0.45, 0.05])
+    units = rng.integers(1, 4, size=n).astype(float)
+    return pd.DataFrame({
+        'sport': 'nba',
+        'model': np.where(np.arange(n) % 2, 'claude', 'gemini'),
+        'bet_type': np.where(np.arange(n) % 3, 'spread', 'total'),
+        'confidence_bucket': '(70, 80]',
+        'date': pd.Timestamp('2025-11-01') + pd.to_timedelta(np.arange(n) // 6, unit='D'),
+        'units': units,
+        'bet_result': result,
+        'bet_payout': np.select([result == 'win', result == 'loss'], [units * 100 / 110, -units], 0.0),
+    })
+
+
+def test_results_do_not_depend_on_the_worker_count():
+    df = _picks()
+    slices = [['sport'], ['sport', 'model'], ['sport', 'model', 'bet_type']]
+
+    df_one = bootstrap_ci(df, slices, n_resamples=200, seed=3, max_workers=1)
+    df_two = bootstrap_ci(df, slices, n_resamples=200, seed=3, max_workers=2)
+
+    pd.testing.assert_frame_equal(df_one, df_two)
+    assert len(df_one) == 7 * 2 * 3  # slices x methods x metrics
+    assert not bootstrap_ci(df, slices, n_resamples=200, seed=4, max_workers=2).equals(df_one)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from calibration import attach_confidence, bin_stats, load_calibration, update_calibration
+
+
+def _graded(n, seed):
+    rng = np.random.default_rng(seed)
+    df_picks = pd.DataFrame({
+        'rank': range(1, n + 1),
+        'game_id': seed * 1000 + np.arange(n),
+        'model': rng.choice(['claude', 'gemini'], n),
+        'pick': rng.choice(['B ML', 'B -3.5', 'Over 220.5'], n),
+        'confidence_pct': rng.integers(45, 101, n),
+    })
+    df_evaluated = df_picks.drop(columns='confidence_pct').assign(
+        bet_result=rng.choice(['win', 'loss', 'push'], n))
+    return df_picks, df_evaluated
+
+
+def test_incremental_updates_equal_a_rebuild(tmp_path):
+    picks_file = tmp_path / 'nba_bet_picks.csv'
+    hist_file = tmp_path / 'nba_bet_picks_evaluated.csv'
+
+    for seed in range(3):
+        df_picks, df_evaluated = _graded(50, seed)
+        df_picks.to_csv(picks_file, mode='a', header=not picks_file.exists(), index=False)
+        df_evaluated.to_csv(hist_file, mode='a', header=not hist_file.exists(), index=False)
+        update_calibration('nba', attach_confidence(df_evaluated, df_picks), picks_file, hist_file, tmp_path)
+
+    rebuilt = bin_stats(attach_confidence(pd.read_csv(hist_file), pd.read_csv(picks_file))).reset_index()
+    pd.testing.assert_frame_equal(load_calibration('nba', tmp_path), rebuilt, check_exact=False)
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from clv import compute_clv
+from pick_validation import SNAPSHOT_COLUMNS, load_line_store
+
+
+def _line_store(tmp_path):
+    rows = [
+        # When the picks were made
+        {'date_scraped': '2025-01-01 18:00:00', 'home_money_line': 150, 'away_money_line': -170,
+         'home_spread': -3.5, 'home_spread_odds': -110, 'away_spread': 3.5, 'away_spread_odds': -110},
+        # The close: the market moved toward the home side
+        {'date_scraped': '2025-01-01 23:55:00', 'home_money_line': 130, 'away_money_line': -150,
+         'home_spread': -5.5, 'home_spread_odds': -110, 'away_spread': 5.5, 'away_spread_odds': -110},
+        # After the start, not the close
+        {'date_scraped': '2025-01-02 00:30:00', 'home_money_line': 300, 'away_money_line': -400,
+         'home_spread': -9.5, 'home_spread_odds': -110, 'away_spread': 9.5, 'away_spread_odds': -110},
+    ]
+    df = pd.DataFrame(rows).reindex(columns=['game_id', 'date_scraped'] + SNAPSHOT_COLUMNS)
+    df['game_id'], df['home_team'], df['away_team'] = 41, 'Celtics', 'Knicks'
+    (tmp_path / 'nba_bets_db.csv').write_text(df.to_csv(index=False))
+    return load_line_store('nba', tmp_path)
+
+
+def _pick(rank, pick, odds, bet):
+    row = {
+        'rank': rank, 'game_id': 41, 'model': 'claude', 'start_time': '2025-01-02T00:00:00.000Z',
+        'match': 'Celtics vs Knicks', 'pick': pick, 'odds': odds, 'units': 1,
+        'timestamp': '2025-01-01T18:00:00Z',
+        'bet_home_ml': 0, 'bet_away_ml': 0, 'bet_home_spread': 0, 'bet_away_spread': 0,
+        'bet_over': 0, 'bet_under': 0,
+    }
+    row[bet] = 1
+    return row
+
+
+def test_clv_sign_on_a_known_line_move(tmp_path):
+    df_lines = _line_store(tmp_path)
+    df_picks = pd.DataFrame([
+        _pick(1, 'Celtics ML', 150, 'bet_home_ml'),
+        _pick(2, 'Knicks ML', -170, 'bet_away_ml'),
+        _pick(3, 'Celtics -3.5', -110, 'bet_home_spread'),
+    ])
+
+    df = compute_clv(df_picks, df_lines)
+
+    assert df['close_odds'].tolist() == [130, -150, -110]
+    # Celtics +150 closing +130: 40% -> 43.5%, the market moved toward the pick
+    assert df['clv_prob'].iloc[0] > 0
+    assert df['clv_prob'].iloc[1] < 0
+    # The spread moved two points toward the pick at the same price: only clv_points sees it
+    assert df['clv_points'].iloc[2] == 2
+    assert df['clv_prob'].iloc[2] == 0
+    assert df['beat_close'].tolist() == [1, 0, 1]
@@ -0,0 +1,60 @@
+import pandas as pd
+
+import picks_ledger
+from utils import process_and_save_evaluated_bets
+
+
+def _picks(start_times):
+    rows = []
+    for i, start_time in enumerate(start_times, start=1):
+        rows.append({
+            'rank': 1, 'model': 'claude', 'game_id': i, 'start_time': start_time,
+            'match': f'Away{i} @ Home{i}', 'pick': f'Home{i} ML', 'odds': -110, 'units': 1,
+            'confidence_pct': 60, 'bet_home_ml': 1, 'bet_away_ml': 0, 'bet_home_spread': 0,
+            'bet_away_spread': 0, 'bet_over': 0, 'bet_under': 0,
+            'home_spread': -3.5, 'away_spread': 3.5, 'total_score': 220.5,
+        })
+    return pd.DataFrame(rows)
+
+
+def _results(start_times):
+    return pd.DataFrame({
+        'game_id': range(1, len(start_times) + 1),
+        'start_time': start_times,
+        'status': 'complete',
+        'home_score': 110,
+        'away_score': 100,
+    })
+
+
+def test_pick_with_mismatched_start_time_stays_pending(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'evaluated').mkdir(parents=True)
+    df_picks = _picks(['2026-01-01T00:00:00.000Z', '2026-01-02T00:00:00.000Z'])
+    # Game 2 was rescheduled, so its result doesn't match the pick's start_time
+    df_result = _results(['2026-01-01T00:00:00.000Z', '2026-01-02T03:00:00.000Z'])
+
+    df_evaluated, _ = process_and_save_evaluated_bets(df_picks, df_result, 'nba')
+
+    assert df_evaluated['game_id'].tolist() == [1]
+    ledger = picks_ledger.load_ledger('./data/evaluated/nba_pick_ledger.csv',
+                                      './data/evaluated/nba_bet_picks.csv',
+                                      './data/evaluated/nba_bet_picks_evaluated.csv')
+    states = ledger.set_index('game_id')['state']
+    assert states[1] == picks_ledger.GRADED
+    assert states[2] == picks_ledger.PENDING
+
+    # Once the result matches, the pick is graded on the next run
+    df_evaluated, _ = process_and_save_evaluated_bets(df_picks, _results(df_picks['start_time'].tolist()), 'nba')
+    assert df_evaluated['game_id'].tolist() == [2]
+
+
+def test_nothing_graded_yet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'evaluated').mkdir(parents=True)
+    df_picks = _picks(['2026-01-01T00:00:00.000Z'])
+    df_result = _results(['2026-01-01T00:00:00.000Z']).assign(status='scheduled')
+
+    df_evaluated, _ = process_and_save_evaluated_bets(df_picks, df_result, 'nba')
+
+    assert df_evaluated.empty
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from leaderboards import VIEWS, load_leaderboard, rebuild_leaderboards, update_leaderboards
+from prompt_shards import compact_history
+
+
+def _evaluated(n, seed):
+    rng = np.random.default_rng(seed)
+    result = rng.choice(['win', 'loss', 'push'], n)
+    units = rng.choice([1, 2, 3], n)
+    return pd.DataFrame({
+        'rank': range(1, n + 1),
+        'model': rng.choice(['claude', 'gemini'], n),
+        'date': rng.choice(['2026-01-01', '2026-01-02', '2026-01-03'], n),
+        'match': 'A @ B',
+        'pick': rng.choice(['B ML', 'B -3.5', 'Over 220.5'], n),
+        'odds': -110,
+        'units': units,
+        'bet_result': result,
+        'bet_payout': np.select([result == 'win', result == 'loss'], [units * 100 / 110, -units], 0.0),
+    })
+
+
+def test_incremental_updates_equal_a_rebuild(tmp_path):
+    hist_file = tmp_path / 'nba_bet_picks_evaluated.csv'
+    batches = [_evaluated(40, seed) for seed in range(3)]
+
+    for df_new in batches:
+        df_new.to_csv(hist_file, mode='a', header=not hist_file.exists(), index=False)
+        update_leaderboards('nba', df_new, hist_file, tmp_path / 'incremental')
+    rebuild_leaderboards('nba', pd.read_csv(hist_file), tmp_path / 'rebuilt')
+
+    for view in VIEWS:
+        pd.testing.assert_frame_equal(load_leaderboard('nba', view, tmp_path / 'incremental'),
+                                      load_leaderboard('nba', view, tmp_path / 'rebuilt'))
+
+
+def test_compact_history_reads_the_stored_leaderboards(tmp_path):
+    df_hist = _evaluated(40, 0)
+    rebuild_leaderboards('nba', df_hist, tmp_path)
+    df_model = df_hist.loc[df_hist['model'] == 'claude']
+
+    from_store = compact_history(df_model, sport='nba', leaderboard_dir=tmp_path)
+    assert from_store == compact_history(df_model)
+
+    # The stored tables are used as they are, not recomputed from df_hist
+    assert compact_history(df_model.iloc[:5], sport='nba', leaderboard_dir=tmp_path).split('Most recent')[0] == \
+        from_store.split('Most recent')[0]
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from prompt_manifest import lines_fingerprint
+
+
+def _games(**overrides):
+    row = {
+        'game_id': 1, 'home_team': 'Home', 'away_team': 'Away', 'start_time': '2026-01-02T00:00:00Z',
+        'home_money_line_last': -150, 'home_ml_ticket_pct_last': 61, 'home_ml_money_pct_last': 70,
+        'ml_money_vs_tickets': 9, 'home_money_line_avg': -148.04,
+    }
+    row.update(overrides)
+    return pd.DataFrame([row, {**row, 'game_id': 2, 'home_money_line_last': 120}])
+
+
+def test_changes_below_the_rendered_precision_are_ignored():
+    base = lines_fingerprint(_games())
+    assert lines_fingerprint(_games(home_ml_ticket_pct_last=62, ml_money_vs_tickets=8)) == base
+    assert lines_fingerprint(_games(home_money_line_avg=-148.01)) == base
+
+
+def test_rendered_changes_are_fingerprinted():
+    base = lines_fingerprint(_games())
+    # A ticket share moving into the next rounding step shows in Dataset 1
+    assert lines_fingerprint(_games(home_ml_ticket_pct_last=68)) != base
+    assert lines_fingerprint(_games(home_money_line_last=-155)) != base
+    assert lines_fingerprint(_games(home_money_line_avg=-148.5)) != base
+
+
+def test_csv_mode_fingerprints_every_value():
+    assert lines_fingerprint(_games(), compact_dataset=False) != \
+        lines_fingerprint(_games(home_ml_ticket_pct_last=62), compact_dataset=False)
@@ -0,0 +1,18 @@
+from llm_batch import export_batch, fake_batch_results, find_pending_prompts, import_batch_results
+
+
+def test_prompts_stay_pending_until_imported(tmp_path):
+    prompts_dir, batch_dir, picks_dir = tmp_path / 'prompts', tmp_path / 'batches', tmp_path / 'bets'
+    export_log = batch_dir / 'exported.json'
+    prompts_dir.mkdir()
+    (prompts_dir / 'nba_prompt_claude.txt').write_text('prompt')
+
+    written = export_batch('run1', prompts_dir, batch_dir, export_log)
+    assert [p['request_id'] for p in find_pending_prompts(prompts_dir, export_log)] == ['nba__claude']
+
+    results = fake_batch_results(written['claude'], batch_dir / 'run1' / 'results.jsonl')
+    import_batch_results(results, batch_dir=batch_dir, picks_dir=picks_dir, export_log=export_log)
+    assert find_pending_prompts(prompts_dir, export_log) == []
+
+    df_report = import_batch_results(results, batch_dir=batch_dir, picks_dir=picks_dir, export_log=export_log)
+    assert df_report.empty
@@ -0,0 +1,50 @@
+import itertools
+
+import llm_cache
+from llm_cache import ResponseCache, cache_key
+
+
+PARAMS = {'max_tokens': 8000, 'temperature': 0.2}
+
+
+def test_hit_and_miss_on_the_request_key(tmp_path):
+    cache = ResponseCache(tmp_path, bypass=False)
+    key = cache_key('anthropic:https://api.anthropic.com', 'claude-sonnet-4-5', 'prompt', PARAMS)
+    cache.put(key, 'response')
+
+    assert ResponseCache(tmp_path, bypass=False).get(key) == 'response'
+    for other in [
+        cache_key('openai:https://api.openai.com/v1', 'claude-sonnet-4-5', 'prompt', PARAMS),
+        cache_key('anthropic:https://api.anthropic.com', 'claude-opus-4-1', 'prompt', PARAMS),
+        cache_key('anthropic:https://api.anthropic.com', 'claude-sonnet-4-5', 'prompt!', PARAMS),
+        cache_key('anthropic:https://api.anthropic.com', 'claude-sonnet-4-5', 'prompt', {**PARAMS, 'temperature': 0}),
+    ]:
+        assert cache.get(other) is None
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, monkeypatch):
+    clock = itertools.count(1)
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: next(clock))
+    cache = ResponseCache(tmp_path, bypass=False)
+    cache.put('aa1', 'first response')
+    cache.put('bb2', 'other response')
+    cache.get('aa1')
+
+    cache.max_bytes = cache.size_bytes() + 5
+    cache.put('cc3', 'third response')
+
+    assert cache.get('bb2') is None
+    assert cache.get('aa1') == 'first response'
+    assert cache.get('cc3') == 'third response'
+    assert not (tmp_path / 'bb' / 'bb2.txt.gz').exists()
+
+
+def test_bypass_skips_lookups_but_stores(tmp_path, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_BYPASS', '1')
+    cache = ResponseCache(tmp_path)
+    cache.put('aa1', 'old response')
+    assert cache.get('aa1') is None
+
+    cache.put('aa1', 'new response')
+    assert ResponseCache(tmp_path, bypass=False).get('aa1') == 'new response'
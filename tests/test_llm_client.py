@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_client import retry_delay, stream_completion, submit_prompts
+from llm_mock_server import start_mock_server
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    servers = []
+
+    def start(**kwargs):
+        server, base_url = start_mock_server(**kwargs)
+        servers.append(server)
+        monkeypatch.setenv('LLM_BASE_URL', base_url)
+        for env in ['ANTHROPIC_API_KEY', 'OPENAI_API_KEY', 'GEMINI_API_KEY']:
+            monkeypatch.setenv(env, 'test')
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('model', ['claude', 'chatgpt', 'gemini'])
+def test_response_is_streamed_in_chunks(mock_api, model):
+    mock_api(responder=lambda prompt: f'echo: {prompt}', chunk_size=4)
+
+    chunks = []
+    text = stream_completion(model, 'pick some games', on_text=chunks.append)
+
+    assert text == 'echo: pick some games'
+    assert len(chunks) > 1 and ''.join(chunks) == text
+
+
+def test_concurrency_is_capped_per_model(mock_api, tmp_path):
+    lock = threading.Lock()
+    in_flight, peak = [0], [0]
+
+    def responder(prompt):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.2)
+        with lock:
+            in_flight[0] -= 1
+        return prompt
+
+    mock_api(responder=responder)
+    jobs = [{'request_id': f'nba__claude__{i:02d}', 'model': 'claude', 'prompt': f'prompt {i}'} for i in range(6)]
+    limits = {'claude': {'concurrency': 2, 'min_interval': 0.0}}
+
+    responses = asyncio.run(submit_prompts(jobs, tmp_path, limits=limits))
+
+    assert peak[0] == 2
+    assert responses == {job['request_id']: job['prompt'] for job in jobs}
+    assert (tmp_path / 'nba__claude__03.txt').read_text() == 'prompt 3'
+
+
+@pytest.mark.parametrize('retry_after', ['0', 'Wed, 21 Oct 2015 07:28:00 GMT'])
+def test_rate_limited_request_is_retried(mock_api, retry_after):
+    mock_api(responder=lambda prompt: 'ok', rate_limited=1, retry_after=retry_after)
+
+    assert stream_completion('claude', 'prompt') == 'ok'
+
+
+def test_retry_delay():
+    assert retry_delay('3', 2) == 3
+    assert retry_delay(None, 2) == 2
+    assert retry_delay('soon', 2) == 2
+    # An HTTP-date in the past means retry now
+    assert retry_delay('Wed, 21 Oct 2015 07:28:00 GMT', 2) == 0
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from pick_validation import SNAPSHOT_COLUMNS, load_line_store, validate_picks
+
+
+def _line_store(tmp_path):
+    rows = [
+        # game_id, date_scraped, home_money_line, away_money_line
+        (41, '2025-01-01 12:00:00', -150, 130),
+        (41, '2025-01-01 18:00:00', -170, 145),
+        (41, '2025-01-02 01:00:00', -200, 170),  # after the game started
+    ]
+    df = pd.DataFrame(rows, columns=['game_id', 'date_scraped', 'home_money_line', 'away_money_line'])
+    df = df.reindex(columns=['game_id', 'date_scraped'] + SNAPSHOT_COLUMNS)
+    df['home_team'], df['away_team'] = 'Celtics', 'Knicks'
+    (tmp_path / 'nba_bets_db.csv').write_text(df.to_csv(index=False))
+    return load_line_store('nba', tmp_path)
+
+
+def _pick(pick, odds, timestamp, **bets):
+    return {
+        'game_id': 41, 'start_time': '2025-01-02T00:00:00.000Z', 'match': 'Celtics vs Knicks',
+        'pick': pick, 'odds': odds, 'units': 1, 'timestamp': timestamp,
+        'bet_home_ml': 0, 'bet_away_ml': 0, 'bet_home_spread': 0, 'bet_away_spread': 0,
+        'bet_over': 0, 'bet_under': 0, **bets,
+    }
+
+
+def test_known_good_and_known_bad_picks(tmp_path):
+    df_lines = _line_store(tmp_path)
+    df_picks = pd.DataFrame([
+        # Timestamped hours before the 18:00 snapshot it quotes
+        _pick('Celtics ML', -170, '2025-01-01T10:00:00Z', bet_home_ml=1),
+        # At the latest snapshot before its timestamp
+        _pick('Knicks ML', 130, '2025-01-01T13:00:00Z', bet_away_ml=1),
+        # Odds no snapshot before the start ever showed
+        _pick('Celtics ML', -200, '2025-01-01T20:00:00Z', bet_home_ml=1),
+    ])
+
+    df = validate_picks(df_picks, df_lines)
+
+    assert df['hallucinated'].tolist() == [False, False, True]
+    assert df['odds_mismatch'].tolist() == [False, False, True]
+    assert df['snapshot_odds'].tolist() == [-170, 130, -170]
+
+
+def test_snapshot_outside_the_tolerance_is_not_used(tmp_path):
+    df_lines = _line_store(tmp_path)
+    df_picks = pd.DataFrame([_pick('Celtics ML', -170, '2025-01-01T02:00:00Z', bet_home_ml=1)])
+
+    df = validate_picks(df_picks, df_lines, snapshot_tolerance=pd.Timedelta(hours=12))
+
+    assert df['no_snapshot'].tolist() == [False]
+    assert df['odds_mismatch'].tolist() == [True]
+    assert df['snapshot_odds'].tolist() == [-150]
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from picks_checkpoint import drop_checkpoint, read_picks_checkpointed
+from picks_parser import parse_picks_file
+
+
+def _write_picks(path, picks):
+    lines = ['rank,pick,units'] + [f'{i},{pick},1' for i, pick in enumerate(picks, start=1)]
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def test_appended_rows_are_read(tmp_path):
+    picks_file = tmp_path / 'nba_bets_claude.txt'
+    _write_picks(picks_file, ['A ML', 'B ML'])
+    read_picks_checkpointed(picks_file, tmp_path / 'checkpoints')
+
+    with open(picks_file, 'a') as f:
+        f.write('3,C ML,1\n')
+    df = read_picks_checkpointed(picks_file, tmp_path / 'checkpoints')
+
+    assert df['pick'].tolist() == ['A ML', 'B ML', 'C ML']
+
+
+def test_rewrite_in_the_middle_of_the_file_invalidates(tmp_path):
+    picks_file = tmp_path / 'nba_bets_claude.txt'
+    picks = [f'Team{i:04d} ML' for i in range(500)]
+    _write_picks(picks_file, picks)
+    read_picks_checkpointed(picks_file, tmp_path / 'checkpoints')
+
+    # Same size, changed far from both ends of the file
+    picks[250] = 'Other000 ML'
+    _write_picks(picks_file, picks)
+    df = read_picks_checkpointed(picks_file, tmp_path / 'checkpoints')
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(picks_file))
+
+
+def test_drop_checkpoint(tmp_path):
+    picks_file = tmp_path / 'nba_bets_claude.txt'
+    _write_picks(picks_file, ['A ML'])
+    read_picks_checkpointed(picks_file, tmp_path / 'checkpoints')
+
+    assert drop_checkpoint(picks_file, tmp_path / 'checkpoints')
+    assert not list((tmp_path / 'checkpoints').glob('*.pkl'))
+    assert not drop_checkpoint(picks_file, tmp_path / 'checkpoints')
+
+
+def test_same_named_files_in_different_directories(tmp_path):
+    first, second = tmp_path / 'a' / 'nba_bets_claude.txt', tmp_path / 'b' / 'nba_bets_claude.txt'
+    for picks_file, pick in [(first, 'A ML'), (second, 'B ML')]:
+        picks_file.parent.mkdir()
+        _write_picks(picks_file, [pick])
+        read_picks_checkpointed(picks_file, tmp_path / 'checkpoints')
+
+    assert read_picks_checkpointed(first, tmp_path / 'checkpoints')['pick'].tolist() == ['A ML']
+    assert read_picks_checkpointed(second, tmp_path / 'checkpoints')['pick'].tolist() == ['B ML']
+
+
+def test_parsed_picks_are_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    picks_file = tmp_path / 'nba_bets_claude.txt'
+    header = 'rank,game_id,start_time,pick,odds,units,timestamp'
+    picks_file.write_text(f'{header}\n1,41,2025-01-01T00:00:00Z,A ML,+150,1,2024-12-31 18:00:00\n')
+    parse_picks_file(picks_file, 'claude')
+
+    with open(picks_file, 'a') as f:
+        f.write(f'{header}\n2,42,2025-01-02T00:00:00Z,B ML,-110,2,2025-01-01 18:00:00\n3,43,,C ML,-110,1,\n')
+    df_picks, df_rejected = parse_picks_file(picks_file, 'claude')
+    df_full, df_full_rejected = parse_picks_file(picks_file, 'claude', checkpoint=False)
+
+    pd.testing.assert_frame_equal(df_picks, df_full)
+    pd.testing.assert_frame_equal(df_rejected, df_full_rejected)
+    assert df_picks['odds'].tolist() == [150, -110]
+    assert df_rejected['game_id'].tolist() == ['43']
@@ -0,0 +1,27 @@
+import warnings
+
+import pandas as pd
+
+from picks_ledger import LEDGER_COLUMNS, PENDING, register_picks
+
+
+def _picks(*picks):
+    return pd.DataFrame([
+        {'rank': rank, 'game_id': 40 + rank, 'model': 'claude', 'pick': pick, 'start_time': '2025-01-01T00:00:00.000Z'}
+        for rank, pick in enumerate(picks, start=1)
+    ])
+
+
+def test_register_picks_without_concat_warnings(tmp_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        ledger, df_new = register_picks(pd.DataFrame(columns=LEDGER_COLUMNS), _picks('A ML'))
+
+        # As read back from disk: graded_at is all NaN until something is graded
+        ledger.to_csv(tmp_path / 'ledger.csv', index=False)
+        ledger = pd.read_csv(tmp_path / 'ledger.csv')
+        ledger, df_new = register_picks(ledger, _picks('A ML', 'B ML'))
+
+    assert ledger['pick'].tolist() == ['A ML', 'B ML']
+    assert ledger['state'].tolist() == [PENDING, PENDING]
+    assert df_new['pick'].tolist() == ['B ML']
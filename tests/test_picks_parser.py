@@ -0,0 +1,16 @@
+from llm_response import parse_pick_block
+from picks_parser import read_picks_raw
+
+
+def test_split_reason_is_rejoined_the_same_way(tmp_path):
+    header = 'rank,game_id,pick,reason,units'
+    rows = '1,41,A ML,Rested,1\n2,42,B ML,Rested,healthy, and at home,1'
+
+    picks_file = tmp_path / 'nba_bets_claude.txt'
+    picks_file.write_text(f'{header}\n{rows}\n')
+    df_file = read_picks_raw(picks_file)
+    df_response = parse_pick_block(f'```\n{header}\n{rows}\n```\n')
+
+    assert df_file['reason'].tolist() == ['Rested', 'Rested, healthy, and at home']
+    assert df_response['reason'].tolist() == df_file['reason'].tolist()
+    assert df_file['units'].tolist() == ['1', '1']
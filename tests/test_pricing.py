@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from pricing import add_fair_prices, fair_american_odds, remove_vig
+from utils import implied_probability
+
+
+def test_two_way_market():
+    implied = implied_probability(np.array([[-110.0, -110.0], [-200.0, 170.0]]))
+    fair, hold = remove_vig(implied, np.array([True, True]))
+
+    np.testing.assert_allclose(fair.sum(axis=1), 1.0)
+    np.testing.assert_allclose(fair[0], [0.5, 0.5])
+    np.testing.assert_allclose(hold[0], 1 - 1 / (2 * 110 / 210))
+    # The fair odds price each leg at exactly its no-vig probability
+    odds = fair_american_odds(fair[1])
+    assert odds[0] < -100 < 100 < odds[1]
+    np.testing.assert_allclose(implied_probability(odds), fair[1])
+
+
+def test_three_way_market_and_missing_draw():
+    implied = implied_probability(np.array([[150.0, 180.0, 230.0], [150.0, 180.0, np.nan]]))
+    fair, hold = remove_vig(implied, np.array([True, True, False]))
+
+    overround = 1 / 2.5 + 1 / 2.8 + 1 / 3.3
+    np.testing.assert_allclose(fair[0], [1 / 2.5, 1 / 2.8, 1 / 3.3] / np.float64(overround))
+    np.testing.assert_allclose(hold[0], 1 - 1 / overround)
+    # Without the draw the two legs add up to less than 100%: not priced
+    assert np.isnan(fair[1]).all() and np.isnan(hold[1])
+
+
+def test_missing_required_leg_is_not_priced():
+    implied = implied_probability(np.array([[-110.0, np.nan]]))
+    fair, hold = remove_vig(implied, np.array([True, True]))
+    assert np.isnan(fair).all() and np.isnan(hold).all()
+
+
+def test_add_fair_prices_columns():
+    df = add_fair_prices(pd.DataFrame({'over_odds_last': [-110], 'under_odds_last': [-110]}))
+    assert df[['over_fair_prob_last', 'under_fair_prob_last', 'total_hold_last']].iloc[0].tolist() == [50.0, 50.0, 4.5]
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from prompt_format import compact_dataset_csv
+
+
+def _games():
+    return pd.DataFrame([
+        {'game_id': 1, 'home_team': 'Celtics', 'away_team': 'Knicks', 'start_time': '2026-01-02T00:00:00Z',
+         'home_money_line_first': -150.0, 'home_money_line_avg': -152.3333, 'home_money_line_last': -155.0,
+         'home_spread_last': -3.5, 'total_score_avg': 221.25, 'tie_money_line_last': None, 'num_bets_last': 5000},
+        {'game_id': 2, 'home_team': 'Lakers', 'away_team': 'Suns', 'start_time': '2026-01-02T00:00:00Z',
+         'home_money_line_first': 120.0, 'home_money_line_avg': 118.06, 'home_money_line_last': 115.0,
+         'home_spread_last': 2.5, 'total_score_avg': 230.75, 'tie_money_line_last': None, 'num_bets_last': 5000},
+    ])
+
+
+def test_compact_dataset_csv():
+    text = compact_dataset_csv(_games())
+    lines = text.splitlines()
+    header = lines.index('game_id,home_team,away_team,hml_f,hml_a,hml_l,hsp_l,tot_a')
+
+    # _first/_last exact, _avg rounded to one decimal
+    assert lines[header + 2] == '1,Celtics,Knicks,-150,-152.3,-155,-3.5,221.2'
+    assert lines[header + 3] == '2,Lakers,Suns,120,118.1,115,2.5,230.8'
+    # The shared start time is printed once, above its games
+    assert lines[header + 1] == 'start_time=2026-01-02T00:00:00.000Z'
+
+    # Constant columns are hoisted into one legend line; empty ones are listed as unavailable
+    assert text.count('bets_l=5000') == 1
+    assert 'Same for every game: bets_l=5000' in lines
+    assert 'Not available for these games: tie_money_line_last' in lines
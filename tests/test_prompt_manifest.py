@@ -0,0 +1,20 @@
+from prompt_manifest import manifest_path, record_prompt_unchanged
+
+
+def test_unchanged_prompt_does_not_rewrite_manifest(tmp_path):
+    record_prompt_unchanged('nba', 'claude', 'inputs unchanged', manifest_dir=tmp_path)
+    path = manifest_path('nba', 'claude', tmp_path)
+    content = path.read_text()
+
+    before = path.stat().st_mtime_ns
+    record_prompt_unchanged('nba', 'claude', 'inputs unchanged', manifest_dir=tmp_path)
+
+    assert path.stat().st_mtime_ns == before
+    assert path.read_text() == content
+
+
+def test_new_reason_is_recorded(tmp_path):
+    record_prompt_unchanged('nba', 'claude', 'inputs unchanged', manifest_dir=tmp_path)
+    manifest = record_prompt_unchanged('nba', 'claude', 'no games', manifest_dir=tmp_path)
+    assert manifest['change_reason'] == 'no games'
+    assert 'no games' in manifest_path('nba', 'claude', tmp_path).read_text()
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from llm_response import PICK_COLUMNS
+from prompt_manifest import load_prompt_manifest, manifest_path
+from prompt_shards import merge_shard_responses, shard_prompt_path, write_prompt_shards
+
+
+def _games(n):
+    return pd.DataFrame({
+        'game_id': range(1, n + 1),
+        'start_time': pd.date_range('2026-01-01 00:00', periods=n, freq='h', tz='UTC').astype(str),
+    })
+
+
+def test_sharded_build_removes_stale_prompts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shard_dir = tmp_path / 'shards'
+    prompt_file = tmp_path / 'nba_prompt_claude.txt'
+    prompt_file.write_text('old unsharded prompt')
+    render = lambda d1, d2: d1
+
+    write_prompt_shards('nba', 'claude', _games(3), pd.DataFrame(), render, shard_dir=shard_dir, prompt_file=prompt_file)
+    paths = write_prompt_shards('nba', 'claude', _games(2), pd.DataFrame(), render, shard_dir=shard_dir, prompt_file=prompt_file)
+
+    assert not prompt_file.exists()
+    assert sorted(shard_dir.iterdir()) == sorted(paths)
+    assert not shard_prompt_path('nba', 'claude', 3, shard_dir).exists()
+    assert not manifest_path('nba', 'claude_03').exists()
+    assert manifest_path('nba', 'claude_02').exists()
+
+
+def test_unchanged_shards_are_not_rendered_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rendered = []
+
+    def render(d1, d2):
+        rendered.append(d1)
+        return d1
+
+    df_games = _games(2)
+    write_prompt_shards('nba', 'claude', df_games, pd.DataFrame(), render, shard_dir=tmp_path, template_version='v1')
+    df_games.loc[1, 'start_time'] = '2026-01-01 05:00:00+00:00'
+    write_prompt_shards('nba', 'claude', df_games, pd.DataFrame(), render, shard_dir=tmp_path, template_version='v1')
+
+    assert len(rendered) == 3
+    assert load_prompt_manifest('nba', 'claude_01')['change_reason'] == 'inputs unchanged'
+    assert load_prompt_manifest('nba', 'claude_02')['change_reason'] == 'changed: upcoming_lines'
+
+
+def test_merge_reads_str_paths(tmp_path):
+    row = dict.fromkeys(PICK_COLUMNS, '')
+    row.update(rank=1, game_id=1, match='A @ B', pick='B ML', odds=-110, units=1, confidence_pct=60)
+    response = tmp_path / 'response.txt'
+    response.write_text('```csv\n' + pd.DataFrame([row]).to_csv(index=False) + '```\n')
+
+    df = merge_shard_responses('nba', 'claude', [str(response)], picks_dir=tmp_path)
+
+    assert df['pick'].tolist() == ['B ML']
+    assert (tmp_path / 'nba_bets_claude.txt').exists()
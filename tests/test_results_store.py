@@ -0,0 +1,46 @@
+import pandas as pd
+
+from results_store import ResultsStore
+
+
+def _games(date, statuses):
+    return pd.DataFrame({
+        'game_id': [int(date) * 10 + i for i in range(len(statuses))],
+        'start_time': f'{date[:4]}-{date[4:6]}-{date[6:]}T23:00:00Z',
+        'home_team': 'Home', 'away_team': 'Away', 'home_score': 100, 'away_score': 90,
+        'status': statuses,
+    })
+
+
+def _picks(*game_ids):
+    return pd.DataFrame({'game_id': game_ids, 'date': [str(g // 10) for g in game_ids]})
+
+
+def test_complete_dates_are_not_fetched_again(tmp_path):
+    slate = {
+        '20251105': _games('20251105', ['complete', 'postponed']),
+        '20251106': _games('20251106', ['complete', 'scheduled']),
+    }
+    fetched = []
+
+    def fetch_date(date):
+        fetched.append(date)
+        return slate[date]
+
+    store = ResultsStore('nba', results_dir=tmp_path)
+    picks = _picks(202511050, 202511051, 202511060, 202511061)
+    store.update(store.missing_dates(picks), fetch_date)
+    store.save()
+
+    # Every game of the 5th is final (one was postponed); the 6th still has a game to play
+    store = ResultsStore.load('nba', tmp_path)
+    assert store.complete_dates() == {'20251105'}
+    assert store.missing_dates(picks) == ['20251106']
+    assert store.is_complete(picks['game_id']).tolist() == [True, False, True, False]
+
+    slate['20251106'] = _games('20251106', ['complete', 'complete'])
+    store.update(store.missing_dates(picks), fetch_date)
+
+    assert fetched == ['20251105', '20251106', '20251106']
+    assert store.missing_dates(picks) == []
+    assert store.results_for(picks['game_id'])['game_id'].tolist() == [202511050, 202511060, 202511061]
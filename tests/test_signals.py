@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from signals import compute_signals, update_signals
+
+
+def _lines(game_ids, snapshots, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for game_id in game_ids:
+        for i in range(snapshots):
+            rows.append({
+                'game_id': game_id,
+                'date_scraped': pd.Timestamp('2026-01-01 12:00') + pd.Timedelta(minutes=20 * i),
+                'start_time': '2026-01-02T00:00:00Z',
+                'home_money_line': rng.choice([-150, -130, -110, 105]),
+                'home_ml_ticket_pct': rng.integers(0, 101),
+                'home_ml_money_pct': rng.integers(0, 101),
+                'home_spread': rng.choice([-4.5, -3.5, -2.5, -1.0]),
+                'home_spread_ticket_pct': rng.integers(0, 101),
+                'home_spread_money_pct': rng.integers(0, 101),
+                'total_score': rng.choice([218.5, 220.5, 222.5]),
+                'over_ticket_pct': rng.integers(0, 101),
+                'over_money_pct': rng.integers(0, 101),
+            })
+    return pd.DataFrame(rows)
+
+
+def test_cached_signals_equal_a_full_computation(tmp_path):
+    df_lines = _lines([1, 2, 3], 4)
+    update_signals('nba', df_lines, tmp_path)
+
+    # Game 1 gets a new snapshot, game 3 drops out of the line store, game 4 is new
+    df_lines = pd.concat([df_lines.loc[df_lines['game_id'] != 3], _lines([1], 5, seed=1).tail(1),
+                          _lines([4], 3, seed=2)], ignore_index=True)
+    df_signals = update_signals('nba', df_lines, tmp_path)
+
+    expected = compute_signals(df_lines)
+    pd.testing.assert_frame_equal(df_signals, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'nba_signals.csv', dtype={'game_id': 'Int64'}),
+                                  expected, check_dtype=False)
+
+
+def test_no_bets_placeholder_is_not_an_even_split():
+    df_lines = _lines([1], 2)
+    df_lines[['home_ml_ticket_pct', 'home_ml_money_pct']] = [[0, 0], [80, 60]]
+    df_lines['home_money_line'] = [-110, 120]
+
+    df_signals = compute_signals(df_lines)
+
+    assert np.isnan(df_signals['ml_money_vs_tickets'].iloc[0])
+    assert df_signals['ml_money_vs_tickets'].iloc[1] == -20
+    assert df_signals['ml_rlm'].tolist() == [0, 1]
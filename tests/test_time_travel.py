@@ -0,0 +1,43 @@
+import pandas as pd
+
+from time_travel import METRIC_COLUMNS, SnapshotStore, _epoch
+
+
+def _lines():
+    rows = [
+        # game_id, date_scraped, home_money_line
+        (41, '2025-01-01 12:00:00', -150),
+        (41, '2025-01-01 18:00:00', -170),
+        (41, '2025-01-01 21:00:00', -190),  # scraped after T
+        (42, '2025-01-01 20:00:00', 120),   # first seen after T
+    ]
+    df = pd.DataFrame(rows, columns=['game_id', 'date_scraped', 'home_money_line'])
+    df = df.reindex(columns=['game_id', 'home_team', 'away_team', 'start_time', 'date_scraped'] + METRIC_COLUMNS)
+    df[[c for c in METRIC_COLUMNS if c != 'home_money_line']] = 0
+    df['home_team'], df['away_team'] = 'Celtics', 'Knicks'
+    df['start_time'] = '2025-01-02T00:00:00Z'
+    return df
+
+
+def _history():
+    return pd.DataFrame({
+        'model': 'claude',
+        'pick': ['A ML', 'B ML'],
+        'available_at': [_epoch('2025-01-01 10:00'), _epoch('2025-01-01 20:00')],
+    })
+
+
+def test_as_of_lookup_excludes_later_snapshots():
+    store = SnapshotStore('nba', _lines(), _history())
+
+    df_games, df_hist = store.datasets('2025-01-01 19:00', 'claude', hours_ahead=6)
+
+    assert df_games['game_id'].tolist() == [41]
+    assert df_games['home_money_line_first'].tolist() == [-150]
+    assert df_games['home_money_line_last'].tolist() == [-170]
+    assert df_games['home_money_line_avg'].tolist() == [-160]
+    assert df_hist['pick'].tolist() == ['A ML']
+
+    df_games, df_hist = store.datasets('2025-01-01 21:00', 'claude', hours_ahead=6)
+    assert df_games['home_money_line_last'].tolist() == [-190, 120]
+    assert df_hist['pick'].tolist() == ['A ML', 'B ML']
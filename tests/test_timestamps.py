@@ -0,0 +1,26 @@
+import datetime
+
+import pandas as pd
+
+from timestamps import EASTERN, from_epoch_ms, local_dates, to_epoch_ms
+
+
+def test_epoch_ms_round_trip():
+    values = pd.Series(['2025-11-06T00:30:00.000Z', '2025-11-05 19:30:00-05:00', '2025-11-06 00:30:00', 'n/a'])
+
+    epoch = to_epoch_ms(values)
+
+    assert epoch.dtype == 'Int64'
+    assert epoch.iloc[:3].tolist() == [1762389000000] * 3
+    assert epoch.isna().tolist() == [False, False, False, True]
+    assert from_epoch_ms(epoch).iloc[0] == pd.Timestamp('2025-11-06T00:30:00Z')
+    assert to_epoch_ms(from_epoch_ms(epoch)).equals(epoch)
+
+
+def test_naive_values_and_local_dates():
+    epoch = to_epoch_ms(pd.Series(['2025-11-05 19:30:00']), naive_tz=EASTERN)
+
+    assert epoch.tolist() == [1762389000000]
+    assert local_dates(epoch, EASTERN).tolist() == [datetime.date(2025, 11, 5)]
+    assert local_dates(epoch).tolist() == [datetime.date(2025, 11, 5)]
+    assert local_dates(epoch, 'UTC').tolist() == [datetime.date(2025, 11, 6)]